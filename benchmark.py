@@ -0,0 +1,288 @@
+# These are functions used to benchmark the speed of pyDERCalc and check its DERs against md-eval.pl
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import pyDERCalc
+
+
+def generateRttms(oracleRttmFile, diarizedRttmFile, hours, nSpkrs=4, overlapRatio=0.1, nClusters=None, seed=0):
+    """
+    This function writes a synthetic ground truth RTTM file and a matching diarization system RTTM file for one
+    recording.  The ground truth is a conversation of speaker turns with short pauses, with a share of the turns
+    overlapped by another speaker.  The diarization system output follows the ground truth turns with jittered
+    boundaries, labels each turn with the cluster its speaker is assigned to (or now and then a wrong cluster), drops
+    some turns and adds some false alarms in the pauses, with no two clusters output at the same time.
+
+    Inputs:
+    - oracleRttmFile: path + filename of the ground truth RTTM file to write, form "bench/ref_1h.rttm"
+    - diarizedRttmFile: path + filename of the diarization system RTTM file to write, form "bench/hyp_1h.rttm"
+    - hours: length of the recording in hours, form "1" or "0.1"
+    - nSpkrs: number of ground truth speakers, default "4"
+    - overlapRatio: share of turns overlapped by another speaker, default "0.1"
+    - nClusters: number of diarization system clusters, default "None" for the same as nSpkrs
+    - seed: random seed, default "0"
+
+    Outputs:
+    - nSegs: tuple of the number of ground truth and diarization system segments written, form: "(1227, 1164)"
+    """
+    rng = random.Random(seed)
+    nClusters = nClusters or nSpkrs
+    rec = "SYNTH_{:g}h_{}".format(hours, seed)
+    line = "SPEAKER {} 1 {:.3f} {:.3f} <NA> <NA> {} <NA> <NA>\n"
+    end = hours * 3600
+
+    oracleSegs = []
+    spkr = 0
+    t = 0.5
+    while t < end:
+        tdur = min(rng.expovariate(1 / 3), 20) + 0.2
+        oracleSegs.append((t, tdur, spkr))
+        if nSpkrs > 1 and rng.random() < overlapRatio:
+            other = rng.choice([s for s in range(nSpkrs) if s != spkr])
+            oracleSegs.append((t + rng.uniform(0, 0.8) * tdur, rng.uniform(0.2, 1.5), other))
+        t += tdur + rng.expovariate(1 / 0.5)
+        if nSpkrs > 1:
+            spkr = rng.choice([s for s in range(nSpkrs) if s != spkr])
+
+    diarizedSegs = []
+    for tbeg, tdur, spkr in oracleSegs:
+        if rng.random() < 0.03:
+            continue
+        cluster = spkr % nClusters if rng.random() < 0.9 else rng.randrange(nClusters)
+        hypBeg = max(0, tbeg + rng.gauss(0, 0.1))
+        hypEnd = max(hypBeg + 0.05, tbeg + tdur + rng.gauss(0, 0.1))
+        diarizedSegs.append((hypBeg, hypEnd - hypBeg, cluster))
+        if rng.random() < 0.02:
+            diarizedSegs.append((hypEnd + 0.05, rng.uniform(0.1, 0.5), rng.randrange(nClusters)))
+
+    # Like most diarization systems, only one cluster is output at a time, and as md-eval.pl only scores from the
+    # first to the last ground truth time when there is no UEM file, nothing is output outside them
+    lastEnd = round(oracleSegs[0][0], 3)
+    lastTime = round(max(tbeg + tdur for tbeg, tdur, _ in oracleSegs), 3)
+    nonOverlapping = []
+    for tbeg, tdur, cluster in sorted(diarizedSegs):
+        tbeg, tend = max(round(tbeg, 3), lastEnd), min(round(tbeg + tdur, 3), lastTime)
+        if tend - tbeg >= 0.01:
+            nonOverlapping.append((tbeg, tend - tbeg, cluster))
+            lastEnd = tend
+    diarizedSegs = nonOverlapping
+
+    with open(oracleRttmFile, "w") as f:
+        for tbeg, tdur, spkr in sorted(oracleSegs):
+            f.write(line.format(rec, tbeg, tdur, "spkr_{}".format(spkr)))
+    with open(diarizedRttmFile, "w") as f:
+        for tbeg, tdur, cluster in diarizedSegs:
+            f.write(line.format(rec, tbeg, tdur, "clu_{}".format(cluster)))
+    return len(oracleSegs), len(diarizedSegs)
+
+
+def timeStages(oracleRttmFile, diarizedRttmFile, collars, columnar=False):
+    """
+    This function runs the pyDERCalc pipeline one step at a time and times each step.
+
+    Inputs:
+    - oracleRttmFile: path + filename of the ground truth RTTM file, form "bench/ref_1h.rttm"
+    - diarizedRttmFile: path + filename of the diarization system RTTM file, form "bench/hyp_1h.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - columnar: a Boolean option to run the pipeline on SegTables, default "False"
+
+    Outputs:
+    - timings: dictionary of the time in seconds taken by each step, form: "{'getSegs': 0.21, ...}"
+    - dfErrors: a dataframe of the errors, in the same form as from pyDERCalc.getAllErrors(...)
+    """
+    timings = {}
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = round(time.perf_counter() - start, 4)
+        return result
+
+    oracleSegs, diarizedSegs = stage('getSegs', lambda: (pyDERCalc.getSegs(oracleRttmFile, True),
+                                                         pyDERCalc.getSegs(diarizedRttmFile, False)))
+    if columnar:
+        oracleSegs, diarizedSegs = stage('SegTable.fromSegs', lambda: (pyDERCalc.SegTable.fromSegs(oracleSegs),
+                                                                       pyDERCalc.SegTable.fromSegs(diarizedSegs)))
+    oracleSplitSegs, comboSplitSegs = stage('getComboSplitSegs', pyDERCalc.getComboSplitSegs, oracleSegs, diarizedSegs)
+    lstOracleSpkrs = stage('getSpkrs', pyDERCalc.getSpkrs, comboSplitSegs, 'oname')
+    lstDiarizedSpkrs = pyDERCalc.getSpkrs(comboSplitSegs, 'dname')
+    dfSpkrTimes = stage('getSpkrTimes', pyDERCalc.getSpkrTimes, lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs)
+    mapSpkrs = stage('getMapSpkrs', pyDERCalc.getMapSpkrs, lstOracleSpkrs, dfSpkrTimes)
+    newSegsIgnore = stage('getNewSegsIgnore', lambda: pyDERCalc.getNewSegsIgnore(
+        pyDERCalc.getSegsIgnore(oracleSplitSegs, collars), collars))
+    revisedComboSplitSegs = stage('getRevisedComboSplitSegs', lambda: [
+        pyDERCalc.getRevisedComboSplitSegs(comboSplitSegs, segsIgnore) for segsIgnore in newSegsIgnore])
+    _, dfErrors = stage('getErrors', pyDERCalc.getErrors, revisedComboSplitSegs, mapSpkrs, collars)
+    stage('getCollarTimes', pyDERCalc.getCollarTimes, comboSplitSegs, newSegsIgnore, mapSpkrs)
+    stage('getAllErrors', pyDERCalc.getAllErrors, oracleRttmFile, diarizedRttmFile, collars, columnar)
+    return timings, dfErrors
+
+
+def timeOverheads(oracleRttmFile, diarizedRttmFile, collars, nCalls=20):
+    """
+    This function measures the fixed costs of scoring rather than the time that grows with the recording length.
+    The cold start is a fresh Python process importing pyDERCalc and scoring once, either with the NumPy core,
+    pyDERCalc.getScoringResult(...), or with the dataframes of pyDERCalc.getAllErrors(...), so it includes the import
+    of pandas only where that needs it.  The time per call is the average of repeated calls in this process once
+    everything is imported.
+
+    Inputs:
+    - oracleRttmFile: path + filename of the ground truth RTTM file, best a short one, form "bench/ref_0.1h.rttm"
+    - diarizedRttmFile: path + filename of the diarization system RTTM file, form "bench/hyp_0.1h.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - nCalls: number of calls to average the time per call over, default "20"
+
+    Outputs:
+    - overheads: dictionary of times in seconds, form: "{'coldStartCore': 0.21, 'coldStartDataFrames': 0.64,
+                 'callCore': 0.012, 'callDataFrames': 0.014, 'coreImportsPandas': False}"
+    """
+    script = ("import sys, time\n"
+              "start = time.perf_counter()\n"
+              "import pyDERCalc\n"
+              "args = (sys.argv[2], sys.argv[3], {!r})\n"
+              "if sys.argv[1] == 'core':\n"
+              "    pyDERCalc.getScoringResult(*args).getErrors()\n"
+              "else:\n"
+              "    pyDERCalc.getAllErrors(*args)\n"
+              "print(time.perf_counter() - start, 'pandas' in sys.modules)\n").format(collars)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(pyDERCalc.__file__)),
+                                                      env.get('PYTHONPATH')]))
+    overheads = {}
+    for name, api in (('Core', 'core'), ('DataFrames', 'dataframes')):
+        output = subprocess.run([sys.executable, "-c", script, api, oracleRttmFile, diarizedRttmFile],
+                                stdout=subprocess.PIPE, universal_newlines=True, env=env, check=True).stdout.split()
+        overheads['coldStart' + name] = round(float(output[0]), 4)
+        if api == 'core':
+            overheads['coreImportsPandas'] = output[1] == 'True'
+
+    for name, func in (('Core', lambda: pyDERCalc.getScoringResult(oracleRttmFile, diarizedRttmFile,
+                                                                   collars).getErrors()),
+                       ('DataFrames', lambda: pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, collars))):
+        func()
+        start = time.perf_counter()
+        for _ in range(nCalls):
+            func()
+        overheads['call' + name] = round((time.perf_counter() - start) / nCalls, 4)
+    return overheads
+
+
+def getMdEvalDERs(oracleRttmFile, diarizedRttmFile, collars, mdEval=None):
+    """
+    This function runs md-eval.pl for each collar and reads the overall DER from its output.  md-eval.pl only takes
+    one collar size used on both sides, so only the start collar size of each collar is passed on.
+
+    Inputs:
+    - oracleRttmFile: path + filename of the ground truth RTTM file, form "bench/ref_1h.rttm"
+    - diarizedRttmFile: path + filename of the diarization system RTTM file, form "bench/hyp_1h.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - mdEval: path to md-eval.pl, default "None" for the copy next to this file
+
+    Outputs:
+    - ders: list of the DER (%) for each collar, form: "[20.03, 8.79]"
+    """
+    mdEval = mdEval or os.path.join(os.path.dirname(os.path.abspath(__file__)), "md-eval.pl")
+    ders = []
+    for collar in collars:
+        output = subprocess.run(["perl", mdEval, "-r", oracleRttmFile, "-s", diarizedRttmFile, "-c", str(collar[0])],
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
+                                check=True).stdout
+        match = re.search(r"OVERALL SPEAKER DIARIZATION ERROR = *([0-9.]+) percent", output)
+        if match is None:
+            raise RuntimeError("No DER in md-eval.pl output for {}:\n{}".format(diarizedRttmFile, output))
+        ders.append(float(match.group(1)))
+    return ders
+
+
+def main(argv=None):
+    """
+    Generates synthetic RTTM files of each size, times the pipeline on them and compares the DERs against md-eval.pl,
+    either by running it and saving the results as a baseline or by reading a baseline saved before.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark pyDERCalc on synthetic RTTM files.")
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.1, 1, 10],
+                        help="recording lengths in hours (default: 0.1 1 10)")
+    parser.add_argument("--spkrs", type=int, default=4, help="number of ground truth speakers (default: 4)")
+    parser.add_argument("--overlap", type=float, default=0,
+                        help="share of overlapped turns, which md-eval.pl scores differently (default: 0)")
+    parser.add_argument("--clusters", type=int, default=None, help="number of system clusters (default: --spkrs)")
+    parser.add_argument("--collars", type=float, nargs="+", default=[0, 0.05, 0.1, 0.25],
+                        help="collar sizes in seconds (default: 0 0.05 0.1 0.25)")
+    parser.add_argument("--columnar", action="store_true", help="run the pipeline on SegTables")
+    parser.add_argument("--dir", default="bench", help="folder for the RTTM files (default: bench)")
+    parser.add_argument("--save-baseline", metavar="JSON", help="run md-eval.pl and save its DERs to this file")
+    parser.add_argument("--baseline", metavar="JSON", help="compare against md-eval.pl DERs saved in this file")
+    parser.add_argument("--output", metavar="JSON", help="save the timings and DERs to this file")
+    parser.add_argument("--overheads", action="store_true",
+                        help="also time the cold start and time per call on the shortest recording")
+    args = parser.parse_args(argv)
+
+    # Imported up front so that their import time is not counted in the first stages timed
+    import numpy
+    import pandas
+
+    os.makedirs(args.dir, exist_ok=True)
+    collars = [[collar, collar] for collar in args.collars]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    mismatches = 0
+    for hours in args.hours:
+        key = "{:g}h_{}spkrs_{:g}overlap_{}clusters".format(hours, args.spkrs, args.overlap,
+                                                          args.clusters or args.spkrs)
+        oracleRttmFile = os.path.join(args.dir, "ref_{}.rttm".format(key))
+        diarizedRttmFile = os.path.join(args.dir, "hyp_{}.rttm".format(key))
+        nSegs = generateRttms(oracleRttmFile, diarizedRttmFile, hours, args.spkrs, args.overlap, args.clusters)
+        timings, dfErrors = timeStages(oracleRttmFile, diarizedRttmFile, collars, args.columnar)
+        ders = dfErrors["DER (%)"].tolist()
+        results[key] = {'segments': nSegs, 'timings': timings, 'ders': ders}
+
+        print("{} ({} + {} segments)".format(key, *nSegs))
+        for name, seconds in timings.items():
+            print("  {:<26}{:>10.3f} s".format(name, seconds))
+        print("  DER (%)                   " + "  ".join("{:.2f}".format(der) for der in ders))
+
+        if args.save_baseline:
+            baseline[key] = {'collars': args.collars, 'ders': getMdEvalDERs(oracleRttmFile, diarizedRttmFile, collars)}
+        if key in baseline:
+            if baseline[key]['collars'] != args.collars:
+                print("  md-eval.pl baseline was saved for other collars")
+                continue
+            mdEvalDERs = baseline[key]['ders']
+            results[key]['mdEvalDERs'] = mdEvalDERs
+            diffs = [round(der - mdEvalDER, 2) for der, mdEvalDER in zip(ders, mdEvalDERs)]
+            mismatches += any(diffs)
+            print("  md-eval.pl DER (%)        " + "  ".join("{:.2f}".format(der) for der in mdEvalDERs)
+                  + ("" if any(diffs) else "  (match)"))
+
+    if args.overheads:
+        key = "{:g}h_{}spkrs_{:g}overlap_{}clusters".format(min(args.hours), args.spkrs, args.overlap,
+                                                          args.clusters or args.spkrs)
+        overheads = timeOverheads(os.path.join(args.dir, "ref_{}.rttm".format(key)),
+                                  os.path.join(args.dir, "hyp_{}.rttm".format(key)), collars)
+        results['overheads'] = overheads
+        print("overheads ({})".format(key))
+        for name, value in overheads.items():
+            print("  {:<26}{:>10}".format(name, str(value) if isinstance(value, bool) else "{:.3f} s".format(value)))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,70 @@
 # These are functions used in the calculation of speaker diarization error rates (DERs)
 
-def getSegs(rttmFile, oracle):
+import collections
+import contextlib
+import dataclasses
+import typing
+
+RttmRecord = collections.namedtuple('RttmRecord', ['file', 'chnl', 'tbeg', 'tdur', 'ortho', 'stype', 'name', 'conf',
+                                                   'slat'])
+RttmRecord.__doc__ = """
+One SPEAKER line of an RTTM file, with tbeg and tdur as floats, conf and slat as floats or None for "<NA>" (slat is
+also None for 9-field lines) and the other fields as strings.
+"""
+
+
+class RttmFormatError(ValueError):
+    """
+    Raised when a line of an RTTM file cannot be read, giving the file and line number.
+    """
+
+
+def iterRttm(rttmFile):
+    """
+    This function reads an RTTM file one line at a time and yields a typed record for each SPEAKER line, so that a
+    large file never has to be held in memory as text.  Blank lines, comment lines starting with ";;" or "#" and
+    lines of any other type (SPKR-INFO, LEXEME, ...) are skipped.  Both the 9-field and the standard 10-field
+    versions of SPEAKER lines are accepted.
+
+    Inputs:
+    - rttmFile: path + filename of RTTM file in standard NIST format, form "AMI_20050204-1206.rttm", or an open text
+                stream of RTTM lines, e.g. io.StringIO(text)
+
+    Outputs:
+    - records: generator of RttmRecord, form: "RttmRecord(file='AMI_20050204-1206', chnl='1', tbeg=1270.39,
+               tdur=4.49, ortho='<NA>', stype='<NA>', name='FEE029', conf=None, slat=None)"
+    """
+    if hasattr(rttmFile, 'read'):
+        # A stream is left open for whoever opened it
+        stream = contextlib.nullcontext(rttmFile)
+        rttmFile = getattr(rttmFile, 'name', '<stream>')
+    else:
+        stream = open(str(rttmFile), "r")
+    with stream as f:
+        for lineNum, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith(';;') or fields[0].startswith('#') or fields[0] != 'SPEAKER':
+                continue
+            if len(fields) not in (9, 10):
+                raise RttmFormatError("{}:{}: SPEAKER lines must have 9 or 10 fields, not {}."
+                                      .format(rttmFile, lineNum, len(fields)))
+            try:
+                tbeg = float(fields[3])
+                tdur = float(fields[4])
+                conf, slat = [None if x == '<NA>' else float(x) for x in (fields[8:] + ['<NA>'])[:2]]
+            except ValueError as e:
+                raise RttmFormatError("{}:{}: {}".format(rttmFile, lineNum, e)) from None
+            yield RttmRecord(fields[1], fields[2], tbeg, tdur, fields[5], fields[6], fields[7], conf, slat)
+
+
+def _getTicks(time, timeScale):
+    """
+    Converts a time in seconds to the nearest whole number of ticks of 1/timeScale seconds.
+    """
+    return int(round(time * timeScale))
+
+
+def getSegs(rttmFile, oracle, cache=None, timeScale=None, spkrIds=None):
     """
     This function gets the segment start times, segment end times, segment durations and identified/allocated speakers
     from an RTTM file and returns it as a list of segments.  Used for obtaining both ground truth segments and
@@ -8,29 +72,569 @@ def getSegs(rttmFile, oracle):
 
     Inputs:
     -rttmFile: path + filename of RTTM file in standard NIST format, form "AMI_20050204-1206.rttm"
+    - oracle: a Boolean showing whether the RTTM file has ground truth (True) or diarization system (False) segments
+    - cache: None to parse the text, True to keep a binary cache next to the RTTM file or a folder to keep it in, see
+             getRttmArrays(rttmFile, cache), default "None"
+    - timeScale: None to give the times in seconds, or a number of ticks per second, e.g. 1000 for milliseconds or
+                 16000 for sample indices at 16 kHz, to give them as whole numbers of ticks, default "None"
+    - spkrIds: a dictionary to intern the speakers into while parsing, giving each new speaker the next integer ID,
+               so that the segments hold the IDs rather than the names and scoring can carry them through, see
+               getRecTimes(...), default "None" to hold the names
 
     Outputs:
     - segs: list of segments, where each segment is in dictionary format, form 
       "[{start time 1, end time 1, duration 1, {oracle speaker 1, diarization speaker 1}}, {...}]"
+
+    Raises RttmFormatError if the RTTM file is not in the right format.
     """
-    import sys
-    segs = []
-    try:
-        with open(str(rttmFile), "r") as f:
-            for line in f:
-                type, file, chnl, tbeg, tdur, ortho, stype, name, conf = line.split()
-                if oracle:
-                    segs.append({'tbeg': float(tbeg), 'tend': round(float(tbeg) + float(tdur), 3),
-                                 'name': {'oname': [name], 'dname': []}})
-                else:
-                    segs.append({'tbeg': float(tbeg), 'tend': round(float(tbeg) + float(tdur), 3),
-                                 'name': {'oname': [], 'dname': [name]}})
+    segs = [seg for _, seg in _iterRttmSegs(rttmFile, oracle, cache, timeScale, spkrIds)]
+    segs.sort(key=lambda x:x['tbeg'])
+    return segs
+
+
+def _iterRttmSegs(rttmFile, oracle, cache, timeScale=None, spkrIds=None):
+    """
+    Yields the recording ID and the segment in dictionary format for each SPEAKER line of an RTTM file, reading from
+    the binary cache if one is used.  The end times are rounded to 3 decimal places, while with a timeScale the ticks
+    are worked out from the start times and durations as parsed, so they are not rounded to milliseconds first.
+    Speakers are interned as they are read, so all the segments of a speaker share one name, or its integer ID from
+    spkrIds.
+    """
+    nameType = 'oname' if oracle else 'dname'
+    otherType = 'dname' if oracle else 'oname'
+    interned = {} if spkrIds is None else spkrIds
+    if cache is None:
+        lines = ((record.file, record.tbeg, record.tdur, record.name) for record in iterRttm(rttmFile))
+    else:
+        arrays = getRttmArrays(rttmFile, cache)
+        recs = arrays['recs'].tolist()
+        spkrs = arrays['spkrs'].tolist()
+        lines = ((recs[rec], tbeg, tdur, spkrs[spkr])
+                 for rec, tbeg, tdur, spkr in zip(arrays['rec'].tolist(), arrays['tbeg'].tolist(),
+                                                  arrays['tdur'].tolist(), arrays['spkr'].tolist()))
+    for rec, tbeg, tdur, spkr in lines:
+        if timeScale is None:
+            tend = round(tbeg + tdur, 3)
+        else:
+            tbeg, tend = _getTicks(tbeg, timeScale), _getTicks(tbeg + tdur, timeScale)
+        spkr = interned.setdefault(spkr, spkr if spkrIds is None else len(interned))
+        yield rec, {'tbeg': tbeg, 'tend': tend, 'name': {nameType: [spkr], otherType: []}}
+
+
+def getRecSegs(rttmFile, oracle, cache=None, timeScale=None, spkrIds=None):
+    """
+    This function is the same as getSegs(rttmFile, oracle) but keeps the recordings in an RTTM file apart, so that a
+    single RTTM file can hold a whole test set.  Recordings are identified by the file column of each line.
+
+    Inputs:
+    - rttmFile: path + filename of RTTM file in standard NIST format, form "AMI_20050204-1206.rttm"
+    - oracle: a Boolean showing whether the RTTM file has ground truth (True) or diarization system (False) segments
+    - cache: None to parse the text, True to keep a binary cache next to the RTTM file or a folder to keep it in, see
+             getRttmArrays(rttmFile, cache), default "None"
+    - timeScale: None to give the times in seconds, or a number of ticks per second, e.g. 1000 for milliseconds or
+                 16000 for sample indices at 16 kHz, to give them as whole numbers of ticks, default "None"
+    - spkrIds: a dictionary to intern the speakers of all the recordings into while parsing, as for
+               getSegs(rttmFile, oracle, spkrIds=spkrIds), default "None" to hold the names
+
+    Outputs:
+    - recSegs: dictionary with the recording IDs as the keys, in order of first appearance, and their lists of
+               segments as the values, form: "{'AMI_20050204-1206': [{start time 1, end time 1, ...}, {...}], ...}"
+
+    Raises RttmFormatError if the RTTM file is not in the right format.
+    """
+    recSegs = {}
+    for file, seg in _iterRttmSegs(rttmFile, oracle, cache, timeScale, spkrIds):
+        recSegs.setdefault(file, []).append(seg)
+    for segs in recSegs.values():
         segs.sort(key=lambda x:x['tbeg'])
-        return segs
-    except Exception as e:
-        print("You must use RTTM files in the right format.")
-        print(e)
-        sys.exit(1)
+    return recSegs
+
+
+def getRttmArrays(rttmFile, cache=True):
+    """
+    This function returns the SPEAKER lines of an RTTM file as compact NumPy arrays, with recording IDs and speaker
+    names replaced by integer IDs.  With a cache, the arrays are saved to a binary ".npz" sidecar file together with
+    the modification time, size and SHA-1 hash of the RTTM file.  The sidecar is used as long as the modification
+    time and size are unchanged, or the hash still matches if they are not, so scoring the same ground truth against
+    many diarization system outputs only parses its text once.
+
+    Inputs:
+    - rttmFile: path + filename of RTTM file in standard NIST format, form "AMI_20050204-1206.rttm"
+    - cache: True to keep the sidecar next to the RTTM file as "AMI_20050204-1206.rttm.npz", a folder to keep it in,
+             or None/False not to use a sidecar at all, default "True"
+
+    Outputs:
+    - arrays: dictionary of NumPy arrays, form: "{'rec': recording ID of each line, 'recs': recording IDs,
+              'tbeg': start times, 'tdur': durations, 'tend': end times rounded to 3 decimal places,
+              'spkr': speaker ID of each line, 'spkrs': speaker names}"
+    """
+    import hashlib
+    import os
+    import numpy as np
+
+    def getHash():
+        sha1 = hashlib.sha1()
+        with open(str(rttmFile), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha1.update(block)
+        return sha1.hexdigest()
+
+    cacheFile = None
+    if cache:
+        cacheDir = os.path.dirname(str(rttmFile)) if cache is True else str(cache)
+        cacheFile = os.path.join(cacheDir, os.path.basename(str(rttmFile)) + ".npz")
+    stat = os.stat(str(rttmFile))
+
+    if cacheFile is not None and os.path.isfile(cacheFile):
+        with np.load(cacheFile, allow_pickle=False) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+        # Sidecars from before the durations were kept are parsed again
+        current = 'tdur' in arrays
+        if current and int(arrays['mtime']) == stat.st_mtime_ns and int(arrays['size']) == stat.st_size:
+            return arrays
+        if current and int(arrays['size']) == stat.st_size and str(arrays['sha1']) == getHash():
+            arrays['mtime'] = np.array(stat.st_mtime_ns)
+            _saveRttmArrays(cacheFile, arrays)
+            return arrays
+
+    recIds = {}
+    spkrIds = {}
+    rec = []
+    tbeg = []
+    tdur = []
+    tend = []
+    spkr = []
+    for record in iterRttm(rttmFile):
+        rec.append(recIds.setdefault(record.file, len(recIds)))
+        tbeg.append(record.tbeg)
+        tdur.append(record.tdur)
+        tend.append(round(record.tbeg + record.tdur, 3))
+        spkr.append(spkrIds.setdefault(record.name, len(spkrIds)))
+    arrays = {'rec': np.array(rec, dtype=np.int32), 'recs': np.array(list(recIds), dtype=str),
+              'tbeg': np.array(tbeg, dtype=np.float64), 'tdur': np.array(tdur, dtype=np.float64),
+              'tend': np.array(tend, dtype=np.float64), 'spkr': np.array(spkr, dtype=np.int32),
+              'spkrs': np.array(list(spkrIds), dtype=str)}
+
+    if cacheFile is not None:
+        arrays.update(mtime=np.array(stat.st_mtime_ns), size=np.array(stat.st_size), sha1=np.array(getHash()))
+        _saveRttmArrays(cacheFile, arrays)
+    return arrays
+
+
+def _saveRttmArrays(cacheFile, arrays):
+    """
+    Writes the arrays from getRttmArrays(rttmFile, cache) to a sidecar file, replacing any old one in a single step.
+    """
+    import os
+    import numpy as np
+    tmpFile = "{}.{}.tmp".format(cacheFile, os.getpid())
+    with open(tmpFile, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmpFile, cacheFile)
+
+
+class UemFormatError(ValueError):
+    """
+    Raised when a line of a UEM file cannot be read, giving the file and line number.
+    """
+
+
+def getUem(uemFile, timeScale=None):
+    """
+    This function reads an unpartitioned evaluation map (UEM) file, which sets out the regions of each recording to
+    be scored as lines of "file chnl tbeg tend", and merges the regions of each recording into a sorted,
+    non-overlapping list.  Comment lines starting with ";;" or "#" and blank lines are skipped.
+
+    Inputs:
+    - uemFile: path + filename of UEM file in standard NIST format, form "AMI_20050204-1206.uem"
+    - timeScale: None to give the regions in seconds, or a number of ticks per second to give them as whole numbers
+                 of ticks, as for getSegs(...), default "None"
+
+    Outputs:
+    - uem: dictionary with the recording IDs as the keys, in order of first appearance, and their merged lists of
+           regions to score as the values, form: "{'AMI_20050204-1206': [[1270.0, 1830.5], [1835.2, 2575.9]], ...}"
+
+    Raises UemFormatError if the UEM file is not in the right format.
+    """
+    regions = {}
+    with open(str(uemFile), "r") as f:
+        for lineNum, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith(';;') or fields[0].startswith('#'):
+                continue
+            if len(fields) != 4:
+                raise UemFormatError("{}:{}: UEM lines must have 4 fields, not {}.".format(uemFile, lineNum, len(fields)))
+            try:
+                tbeg = float(fields[2])
+                tend = float(fields[3])
+            except ValueError as e:
+                raise UemFormatError("{}:{}: {}".format(uemFile, lineNum, e)) from None
+            if tend < tbeg:
+                raise UemFormatError("{}:{}: region ends before it begins.".format(uemFile, lineNum))
+            if timeScale is not None:
+                tbeg, tend = _getTicks(tbeg, timeScale), _getTicks(tend, timeScale)
+            regions.setdefault(fields[0], []).append([tbeg, tend])
+    # Overlapping regions are merged the same way as overlapping collars
+    return {rec: getNewSegsIgnore([recRegions], [None])[0] for rec, recRegions in regions.items()}
+
+
+def _getPooledUem(uemFile, timeScale=None):
+    """
+    Returns the regions of all the recordings in a UEM file merged together, for getAllErrors(...), which takes all
+    the lines of its RTTM files as one recording.
+    """
+    return getNewSegsIgnore([[region for regions in getUem(uemFile, timeScale).values() for region in regions]],
+                            [None])[0]
+
+
+def getUemIgnore(uemRegions):
+    """
+    This function returns the complement of the merged regions to score of one recording, i.e. the segments to ignore
+    outside the UEM, in the same form as from getNewSegsIgnore(segsIgnore, collars) so that the segments can be cut
+    to the UEM with getRevisedComboSplitSegs(comboSplitSegs, newSegsIgnore).
+
+    Inputs:
+    - uemRegions: sorted, non-overlapping list of regions to score, form: "[[1270.0, 1830.5], [1835.2, 2575.9]]"
+
+    Outputs:
+    - uemIgnore: the non-overlapping list of segments to ignore, form: "[[-inf, 1270.0], [1830.5, 1835.2], ...]"
+    """
+    uemIgnore = []
+    last = float('-inf')
+    for tbeg, tend in uemRegions:
+        if tbeg > last:
+            uemIgnore.append([last, tbeg])
+        last = max(last, tend)
+    uemIgnore.append([last, float('inf')])
+    return uemIgnore
+
+
+class SpkrCounts:
+    """
+    This class holds how many times each speaker is active in each row of a SegTable as sparse entries, one for each
+    speaker active in a row, rather than as a dense array with a column for every speaker.  Only a few speakers are
+    active at any one time, so a table takes memory in proportion to the speakers actually active in its rows however
+    many speakers, e.g. diarization system clusters, the recording has.
+
+    Attributes:
+    - rows: int64 array of the row of each entry, sorted, form: "[0, 1, 1, 2, ...]"
+    - spkrs: int32 array of the speaker column of each entry, sorted within each row, form: "[0, 0, 2, 1, ...]"
+    - counts: int16 array of how many times the speaker is active in the row, never zero, form: "[1, 1, 1, 2, ...]"
+    - nRows: number of rows
+    - nSpkrs: number of speaker columns
+    """
+
+    def __init__(self, rows, spkrs, counts, nRows, nSpkrs):
+        import numpy as np
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.spkrs = np.asarray(spkrs, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int16)
+        self.nRows = int(nRows)
+        self.nSpkrs = int(nSpkrs)
+
+    def __len__(self):
+        return self.nRows
+
+    @classmethod
+    def fromEntries(cls, rows, spkrs, counts, nRows, nSpkrs):
+        """
+        Builds the counts from entries in any order, adding up the counts of entries for the same row and speaker and
+        dropping those that come to zero.
+        """
+        import numpy as np
+        keys = np.asarray(rows, dtype=np.int64) * max(nSpkrs, 1) + np.asarray(spkrs, dtype=np.int64)
+        keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(sums, inverse.reshape(-1), np.asarray(counts, dtype=np.int64))
+        keep = sums != 0
+        keys = keys[keep]
+        return cls(keys // max(nSpkrs, 1), keys % max(nSpkrs, 1), sums[keep], nRows, nSpkrs)
+
+    @classmethod
+    def fromDense(cls, dense):
+        """
+        Builds the counts from an array size nRows x nSpkrs.
+        """
+        import numpy as np
+        dense = np.asarray(dense)
+        rows, spkrs = np.nonzero(dense)
+        return cls(rows, spkrs, dense[rows, spkrs], dense.shape[0], dense.shape[1])
+
+    def toDense(self):
+        """
+        Returns the counts as an int16 array size nRows x nSpkrs.
+        """
+        import numpy as np
+        dense = np.zeros((self.nRows, self.nSpkrs), dtype=np.int16)
+        dense[self.rows, self.spkrs] = self.counts
+        return dense
+
+    def getRowPtr(self):
+        """
+        Returns the position of the first entry of each row, with the number of entries at the end.
+        """
+        import numpy as np
+        return np.searchsorted(self.rows, np.arange(self.nRows + 1))
+
+    def getRowTotals(self):
+        """
+        Returns the number of speakers active in each row, counting a speaker once for each time it is active.
+        """
+        import numpy as np
+        return np.bincount(self.rows, weights=self.counts, minlength=self.nRows).astype(np.int64)
+
+    def getSpkrTotals(self):
+        """
+        Returns the number of times each speaker is active over all the rows.
+        """
+        import numpy as np
+        return np.bincount(self.spkrs, weights=self.counts, minlength=self.nSpkrs).astype(np.int64)
+
+    def take(self, index):
+        """
+        Returns the counts of the rows selected by an index array or Boolean mask.
+        """
+        import numpy as np
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.nonzero(index)[0]
+        rowPtr = self.getRowPtr()
+        owner, entries = _getRaggedIndex(rowPtr[index], rowPtr[index + 1])
+        return SpkrCounts(owner, self.spkrs[entries], self.counts[entries], len(index), self.nSpkrs)
+
+    def spread(self, first, last, nRows):
+        """
+        Returns counts of nRows rows in which each row i of these counts is active in rows first[i] to last[i] - 1,
+        adding up the counts where the rows of several overlap.
+        """
+        import numpy as np
+        owner, rows = _getRaggedIndex(np.asarray(first)[self.rows], np.asarray(last)[self.rows])
+        return SpkrCounts.fromEntries(rows, self.spkrs[owner], self.counts[owner], nRows, self.nSpkrs)
+
+    def getNames(self, lstSpkrs):
+        """
+        Returns the list of speakers active in each row, with a speaker repeated for each time it is active.
+        """
+        names = [[] for _ in range(self.nRows)]
+        for row, spkr, count in zip(self.rows.tolist(), self.spkrs.tolist(), self.counts.tolist()):
+            names[row].extend([lstSpkrs[spkr]] * count)
+        return names
+
+    def getPatterns(self):
+        """
+        Returns the distinct combinations of speakers active in the rows, each as a sorted tuple of speaker columns,
+        and the index of the combination of each row.
+        """
+        import numpy as np
+        if self.nRows == 0:
+            return [], np.zeros(0, dtype=np.int64)
+        rowPtr = self.getRowPtr()
+        padded = np.full((self.nRows, int(np.diff(rowPtr).max())), -1, dtype=np.int32)
+        padded[self.rows, np.arange(len(self.rows)) - rowPtr[self.rows]] = self.spkrs
+        patterns, index = np.unique(padded, axis=0, return_inverse=True)
+        return [tuple(spkr for spkr in pattern if spkr >= 0) for pattern in patterns.tolist()], index.reshape(-1)
+
+
+class SegTable:
+    """
+    This class is an array-backed alternative to the list of segment dictionaries.  Instead of one dictionary per
+    segment, the start and end times are held as NumPy arrays and the speakers as SpkrCounts, sparse entries of how
+    many times each speaker is active in each segment.  Ground truth and diarization system speakers are kept apart
+    so that getSplitSegs(segs), getSpkrTimes(...), getTotalTime(segs), getMissedTime(segs), getFalarmTime(segs) and
+    getErrorTime(segs, mapSpkrs) can work on whole arrays at once.
+
+    Attributes:
+    - tbeg: float64 array of segment start times, or int64 if they are whole ticks, form: "[1270.39, 1275.195, ...]"
+    - tend: float64 array of segment end times, or int64 if they are whole ticks, form: "[1274.88, 1278.265, ...]"
+    - oname: SpkrCounts of the ground truth speakers in each segment, with columns labelled by lstOracleSpkrs
+    - dname: SpkrCounts of the diarization system speakers in each segment, with columns labelled by lstDiarizedSpkrs
+    - lstOracleSpkrs: list of ground truth speakers labelling the columns of oname
+    - lstDiarizedSpkrs: list of diarization system speakers labelling the columns of dname
+    """
+
+    def __init__(self, tbeg, tend, oname, dname, lstOracleSpkrs, lstDiarizedSpkrs):
+        import numpy as np
+        tbeg = np.asarray(tbeg)
+        tend = np.asarray(tend)
+        # Times in whole ticks stay integers so that durations and sums are exact
+        dtype = np.int64 if tbeg.dtype.kind in 'iu' and tend.dtype.kind in 'iu' else np.float64
+        self.tbeg = tbeg.astype(dtype, copy=False)
+        self.tend = tend.astype(dtype, copy=False)
+        # Dense arrays size len(tbeg) x len(lstSpkrs) of speaker counts are also taken
+        self.oname = oname if isinstance(oname, SpkrCounts) else SpkrCounts.fromDense(
+            np.asarray(oname).reshape(len(self.tbeg), len(lstOracleSpkrs)))
+        self.dname = dname if isinstance(dname, SpkrCounts) else SpkrCounts.fromDense(
+            np.asarray(dname).reshape(len(self.tbeg), len(lstDiarizedSpkrs)))
+        self.lstOracleSpkrs = list(lstOracleSpkrs)
+        self.lstDiarizedSpkrs = list(lstDiarizedSpkrs)
+
+    def __len__(self):
+        return len(self.tbeg)
+
+    @classmethod
+    def fromSegs(cls, segs, lstOracleSpkrs=None, lstDiarizedSpkrs=None):
+        """
+        Builds a table from a list of segments in dictionary format.  Speaker columns are in order of first
+        appearance unless the speaker lists are given.
+        """
+        import numpy as np
+        cols = {}
+        for name_type, lstSpkrs in (('oname', lstOracleSpkrs), ('dname', lstDiarizedSpkrs)):
+            if lstSpkrs is None:
+                lstSpkrs = list(dict.fromkeys(name for seg in segs for name in seg['name'][name_type]))
+            index = {spkr: i for i, spkr in enumerate(lstSpkrs)}
+            rows = [i for i, seg in enumerate(segs) for name in seg['name'][name_type]]
+            spkrs = [index[name] for seg in segs for name in seg['name'][name_type]]
+            cols[name_type] = (SpkrCounts.fromEntries(rows, spkrs, np.ones(len(rows), dtype=np.int16), len(segs),
+                                                      len(lstSpkrs)), lstSpkrs)
+        return cls([seg['tbeg'] for seg in segs], [seg['tend'] for seg in segs], cols['oname'][0], cols['dname'][0],
+                   cols['oname'][1], cols['dname'][1])
+
+    def toSegs(self):
+        """
+        Converts the table back into a list of segments in dictionary format.
+        """
+        return [{'tbeg': tbeg, 'tend': tend, 'name': {'oname': onames, 'dname': dnames}}
+                for tbeg, tend, onames, dnames in zip(self.tbeg.tolist(), self.tend.tolist(),
+                                                      self.oname.getNames(self.lstOracleSpkrs),
+                                                      self.dname.getNames(self.lstDiarizedSpkrs))]
+
+    def take(self, index):
+        """
+        Returns a new table with the rows selected by an index array or Boolean mask.
+        """
+        return SegTable(self.tbeg[index], self.tend[index], self.oname.take(index), self.dname.take(index),
+                        self.lstOracleSpkrs, self.lstDiarizedSpkrs)
+
+    def sort(self):
+        """
+        Returns a new table stably sorted by start time, matching segs.sort(key=lambda x:x['tbeg']).
+        """
+        import numpy as np
+        return self.take(np.argsort(self.tbeg, kind='stable'))
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Stacks tables row-wise, aligning their speaker columns on the union of their speakers.
+        """
+        import numpy as np
+        offsets = np.cumsum([0] + [len(table) for table in tables])
+        names = []
+        for name_type, lst_type in (('oname', 'lstOracleSpkrs'), ('dname', 'lstDiarizedSpkrs')):
+            index = {spkr: i for i, spkr in enumerate(dict.fromkeys(s for table in tables for s in getattr(table,
+                                                                                                        lst_type)))}
+            entries = []
+            for offset, table in zip(offsets.tolist(), tables):
+                counts = getattr(table, name_type)
+                cols = np.array([index[spkr] for spkr in getattr(table, lst_type)] + [-1], dtype=np.int64)
+                entries.append((counts.rows + offset, cols[counts.spkrs], counts.counts))
+            rows, spkrs, counts = (np.concatenate([entry[i] for entry in entries] + [np.zeros(0, dtype=np.int64)])
+                                   for i in range(3))
+            names.append((SpkrCounts.fromEntries(rows, spkrs, counts, offsets[-1], len(index)), list(index)))
+        return cls(np.concatenate([table.tbeg for table in tables]), np.concatenate([table.tend for table in tables]),
+                   names[0][0], names[1][0], names[0][1], names[1][1])
+
+
+class ScoringReport:
+    """
+    This class records how long each stage of scoring takes, how much memory it uses at most and the sizes it works
+    on, such as the number of segments and segments to ignore, so that slow scoring can be put down to parsing,
+    splitting, mapping or collar processing.  Pass one as the report to getAllErrors(...), getRecTimes(...) or
+    getCorpusErrors(...) and read it afterwards with toDict().
+
+    Attributes:
+    - stages: list of the stages recorded in order, each a dictionary, form: "{'stage': 'getComboSplitSegs',
+              'wallTime': 0.0153, 'peakMemory': 1843200, 'sizes': {'comboSplitSegs': 2511}}"
+    - traceMemory: a Boolean option to measure the peak memory of each stage with tracemalloc, which slows scoring
+                   down, default "False" for peakMemory to be None
+    - callback: function called with each stage's dictionary as soon as the stage ends, default "None"
+    """
+
+    def __init__(self, traceMemory=False, callback=None):
+        self.stages = []
+        self.traceMemory = traceMemory
+        self.callback = callback
+
+    @contextlib.contextmanager
+    def stage(self, name, **sizes):
+        """
+        Context manager that times the code within it as a stage called name, yielding the dictionary of sizes so
+        that sizes only known at the end of the stage can be added to it.
+        """
+        import time
+        import tracemalloc
+        startTracing = self.traceMemory and not tracemalloc.is_tracing()
+        if startTracing:
+            tracemalloc.start()
+        if self.traceMemory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield sizes
+        finally:
+            wallTime = time.perf_counter() - start
+            peakMemory = tracemalloc.get_traced_memory()[1] if self.traceMemory else None
+            if startTracing:
+                tracemalloc.stop()
+            record = {'stage': name, 'wallTime': round(wallTime, 6), 'peakMemory': peakMemory, 'sizes': sizes}
+            self.stages.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def getTotals(self):
+        """
+        Returns the wall time, largest peak memory and number of times run of each stage, adding up stages that are
+        run more than once, e.g. once per recording.
+        """
+        totals = {}
+        for record in self.stages:
+            total = totals.setdefault(record['stage'], {'wallTime': 0, 'peakMemory': None, 'count': 0})
+            total['wallTime'] += record['wallTime']
+            if record['peakMemory'] is not None:
+                total['peakMemory'] = max(total['peakMemory'] or 0, record['peakMemory'])
+            total['count'] += 1
+        return totals
+
+    def toDict(self):
+        """
+        Returns the report as a dictionary that can be saved as JSON.
+        """
+        return {'stages': self.stages, 'totals': self.getTotals(),
+                'wallTime': sum(record['wallTime'] for record in self.stages)}
+
+
+def _getStage(report, name, **sizes):
+    """
+    Returns report.stage(name, **sizes), or a context manager that does nothing if there is no report.
+    """
+    if report is None:
+        return contextlib.nullcontext(sizes)
+    return report.stage(name, **sizes)
+
+
+def _sequentialSum(values):
+    """
+    Adds up an array from left to right, as a running Python total would, so that the SegTable reductions give
+    exactly the same floating point results as the loops over segment dictionaries.  Integer arrays give an int.
+    """
+    import numpy as np
+    if len(values) == 0:
+        return 0
+    return np.cumsum(values)[-1].item()
+
+
+def _getRaggedIndex(first, last):
+    """
+    Expands the half-open ranges [first, last) into one flat index array, returning the position of each range
+    alongside the expanded index.
+    """
+    import numpy as np
+    counts = np.maximum(last - first, 0)
+    owner = np.repeat(np.arange(len(first)), counts)
+    offsets = np.cumsum(counts) - counts
+    index = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(offsets, counts)
+    return owner, index
 
 
 def countOverlaps(array):
@@ -63,12 +667,31 @@ def getSplitSegs(segs):
 
     Inputs:
     - segs: list of segments, where each segment is in dictionary format, form 
-      "[{start time 1, end time 1, duration 1, {oracle speaker 1, diarization speaker 1}}, {...}]"
+      "[{start time 1, end time 1, duration 1, {oracle speaker 1, diarization speaker 1}}, {...}]", or a SegTable
 
     Outputs:
     - splitSegs: revised list of segments that over one pass splits consecutive overlapping rows into multiple rows with
-                 a constant number of speakers in each segment
+                 a constant number of speakers in each segment, as a SegTable if segs is a SegTable
     """
+    if isinstance(segs, SegTable):
+        import numpy as np
+        times = np.empty(2*len(segs), dtype=segs.tbeg.dtype)
+        times[0::2] = segs.tbeg
+        times[1::2] = segs.tend
+        order = np.argsort(times, kind='stable')
+        sign = np.where(order % 2 == 0, 1, -1)
+        # Segments are only output between events while at least one input segment is active
+        active = np.cumsum(sign)[:-1] > 0
+        keep = np.nonzero(active)[0]
+        times = times[order]
+        # Each input segment is active in the output segments from its start event up to its end event
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        outputRow = np.concatenate([[0], np.cumsum(active)])
+        first = outputRow[position[0::2]]
+        last = np.maximum(outputRow[position[1::2]], first)
+        return SegTable(times[keep], times[keep + 1], segs.oname.spread(first, last, len(keep)),
+                        segs.dname.spread(first, last, len(keep)), segs.lstOracleSpkrs, segs.lstDiarizedSpkrs)
 
     events = []
     for index, seg in enumerate(segs):
@@ -100,19 +723,103 @@ def getSplitSegs(segs):
 
     return splitSegs
 
+def getComboSplitSegs(oracleSegs, diarizedSegs):
+    """
+    This function does the work of getSplitSegs(segs) on the ground truth segments, on the diarization system segments
+    and then on the two sets of split segments combined, in a single sweep over one sorted list of the start and end
+    times of both.  The ground truth and diarization system speakers active at each point are kept as counts of each
+    speaker, so each combined segment is emitted directly from the counts rather than by adding up name lists.
+
+    Inputs:
+    - oracleSegs: list of ground truth segments from getSegs(rttmFile, True), or a SegTable
+    - diarizedSegs: list of diarization system segments from getSegs(rttmFile, False), or a SegTable
+
+    Outputs:
+    - oracleSplitSegs: the ground truth split segments, the same as from getSplitSegs(oracleSegs)
+    - comboSplitSegs: list of ground truth and diarization segments reduced to non-overlapping segments with a
+                      constant number of speakers in each segment.  The segments of positive duration are the same as
+                      from splitting the combined split segments with getSplitSegs(segs), and a segment of zero
+                      duration is only kept where a segment of zero duration is in the inputs.
+
+    If the inputs are SegTables, both outputs are SegTables.
+    """
+    if isinstance(oracleSegs, SegTable):
+        # Speaker counts simply add up, so the combined segments come straight from one sweep over both tables
+        return getSplitSegs(oracleSegs), getSplitSegs(SegTable.concat([oracleSegs, diarizedSegs]))
+
+    # Events at the same time keep the order getSplitSegs(segs) would give them within each input
+    events = []
+    for stream, segs in enumerate((oracleSegs, diarizedSegs)):
+        for index, seg in enumerate(segs):
+            events.append((seg['tbeg'], stream, 2*index, seg))
+            events.append((seg['tend'], stream, 2*index + 1, seg))
+    events.sort(key=lambda e: e[:3])
+
+    oracleSplitSegs = []
+    comboSplitSegs = []
+    active = ({}, {})
+    nActive = [0, 0]
+    lastOracleTime = None
+    lastTime = None
+    i = 0
+    while i < len(events):
+        time = events[i][0]
+        if lastTime is not None and lastTime < time and (nActive[0] or nActive[1]):
+            comboSplitSegs.append({'tbeg': lastTime, 'tend': time,
+                                   'name': {'oname': [spkr for spkr, n in active[0].items() for _ in range(n)],
+                                            'dname': [spkr for spkr, n in active[1].items() for _ in range(n)]}})
+        zeroSegs = []
+        while i < len(events) and events[i][0] == time:
+            _, stream, order, seg = events[i]
+            if stream == 0 and nActive[0]:
+                oracleSplitSegs.append({'tbeg': lastOracleTime, 'tend': time,
+                                        'name': {'oname': [spkr for spkr, n in active[0].items() for _ in range(n)],
+                                                 'dname': []}})
+            if stream == 0:
+                lastOracleTime = time
+            counts = active[stream]
+            names = seg['name']['oname'] + seg['name']['dname']
+            if order % 2 == 0:
+                for spkr in names:
+                    counts[spkr] = counts.get(spkr, 0) + 1
+                nActive[stream] += len(names)
+                if seg['tend'] == time:
+                    zeroSegs.append(seg)
+            else:
+                for spkr in names:
+                    counts[spkr] -= 1
+                    if counts[spkr] == 0:
+                        del counts[spkr]
+                nActive[stream] -= len(names)
+            i += 1
+        # Segments of zero duration are kept so that their speakers are still seen
+        if zeroSegs:
+            comboSplitSegs.append({'tbeg': time, 'tend': time,
+                                   'name': {name_type: sum([seg['name'][name_type] for seg in zeroSegs], []) for
+                                            name_type in ['oname', 'dname']}})
+        lastTime = time
+
+    return oracleSplitSegs, comboSplitSegs
+
+
 def getSpkrs(comboSplitSegs, name_type):
     """
     This function returns the list of ground truth speakers.
 
     Inputs:
     - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
-                      non-overlapping segments with a constant number of speakers in each segment
+                      non-overlapping segments with a constant number of speakers in each segment, or a SegTable
 
     Outputs:
     - lstOracleSpkrs: list of ground truth speakers, form: "['FEE029', 'FEE030', 'MEE031', 'FEE032']"
     """
 
-    lstSpkrs =list(set(sum([x['name'][name_type] for x in comboSplitSegs], [])))
+    if isinstance(comboSplitSegs, SegTable):
+        counts = getattr(comboSplitSegs, name_type).getSpkrTotals()
+        lstSpkrs = [spkr for spkr, count in zip(getattr(comboSplitSegs, 'lstOracleSpkrs' if name_type == 'oname' else
+                                                        'lstDiarizedSpkrs'), counts) if count > 0]
+    else:
+        lstSpkrs = list({name for x in comboSplitSegs for name in x['name'][name_type]})
     lstSpkrs.sort(key=lambda x:x[-2:])
 
     return lstSpkrs
@@ -121,7 +828,7 @@ def getSpkrs(comboSplitSegs, name_type):
 def getSpkrTimes(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs):
     """
     This function returns a dataframe that matches the ground truth speaker times with the diarization
-    system times.
+    system times, from getSpkrTimesArray(...).
 
     Inputs:
     - lstOracleSpkrs: list of ground truth speakers, form: "['FEE029', 'FEE030', 'MEE031', 'FEE032']"
@@ -129,7 +836,7 @@ def getSpkrTimes(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs):
                            form: "['AMI_20050204-1206_spkr_0', 'AMI_20050204-1206_spkr_1', 'AMI_20050204-1206_spkr_3',
                         'AMI_20050204-1206_spkr_5', 'AMI_20050204-1206_spkr_6', 'AMI_20050204-1206_spkr_9']"
     - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
-                      non-overlapping segments with a constant number of speakers in each segment
+                      non-overlapping segments with a constant number of speakers in each segment, or a SegTable
 
     Outputs:
     - dfSpkrTimes: a Pandas dataframe size len(lstOracleSpkrs) x len(lstDiarizedSpeakrs) that shows how the
@@ -140,23 +847,82 @@ def getSpkrTimes(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs):
                     MEE031	6.445	0.570	106.655	5.105	0.000	5.020
                     FEE032	9.655	1.445	4.985	7.280	0.815	138.520"
     """
-    import numpy as np
     import pandas as pd
-
-    spkrTimes = np.zeros((len(lstOracleSpkrs), len(lstDiarizedSpkrs)))
-    for row in comboSplitSegs:
-        for OracleSpkr in row['name']['oname']:
-            for DiarizedSpkr in row['name']['dname']:
-                spkrTimes[lstOracleSpkrs.index(OracleSpkr)][lstDiarizedSpkrs.index(DiarizedSpkr)] += round(row['tend'] - row['tbeg'], 3)
-
+    spkrTimes = getSpkrTimesArray(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs)
     dfSpkrTimes = pd.DataFrame(spkrTimes, index=lstOracleSpkrs, columns=lstDiarizedSpkrs)
     return dfSpkrTimes
 
 
-def getMapSpkrs(lstOracleSpkrs, dfSpkrTimes):
+def getSpkrTimesArray(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs):
+    """
+    This function returns the times that the ground truth speakers and diarization system speakers are active
+    together as a NumPy array rather than a dataframe, for getArrayMapSpkrs(...) without pandas.
+
+    Inputs:
+    - lstOracleSpkrs: list of ground truth speakers labelling the rows, form: "['FEE029', 'FEE030', 'MEE031', 'FEE032']"
+    - lstDiarizedSpkrs: list of diarization system speakers labelling the columns
+    - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
+                      non-overlapping segments with a constant number of speakers in each segment, or a SegTable
+
+    Outputs:
+    - spkrTimes: NumPy array size len(lstOracleSpkrs) x len(lstDiarizedSpkrs) of the overlap times, the same values
+                 as in the dataframe from getSpkrTimes(...)
+    """
+    import numpy as np
+
+    spkrTimes = np.zeros((len(lstOracleSpkrs), len(lstDiarizedSpkrs)))
+    if isinstance(comboSplitSegs, SegTable):
+        table = comboSplitSegs
+        oIndex = {spkr: i for i, spkr in enumerate(lstOracleSpkrs)}
+        dIndex = {spkr: i for i, spkr in enumerate(lstDiarizedSpkrs)}
+        oCols = np.array([oIndex.get(spkr, -1) for spkr in table.lstOracleSpkrs] + [-1], dtype=np.int64)
+        dCols = np.array([dIndex.get(spkr, -1) for spkr in table.lstDiarizedSpkrs] + [-1], dtype=np.int64)
+        # One entry per speaker occurrence, in segment order
+        oRows, oSpkrs = np.repeat(table.oname.rows, table.oname.counts), np.repeat(table.oname.spkrs, table.oname.counts)
+        dRows, dSpkrs = np.repeat(table.dname.rows, table.dname.counts), np.repeat(table.dname.spkrs, table.dname.counts)
+        # Pair every ground truth occurrence with every diarization occurrence in the same segment
+        owner, dEntries = _getRaggedIndex(np.searchsorted(dRows, oRows, 'left'), np.searchsorted(dRows, oRows, 'right'))
+        oPairs = oCols[oSpkrs[owner]]
+        dPairs = dCols[dSpkrs[dEntries]]
+        valid = (oPairs >= 0) & (dPairs >= 0)
+        durations = np.round(table.tend - table.tbeg, 3)[oRows[owner]]
+        np.add.at(spkrTimes, (oPairs[valid], dPairs[valid]), durations[valid])
+    else:
+        # One pass lists the speaker occurrences of the segments with speakers on both sides, then every ground truth
+        # occurrence is paired with the diarization occurrences of its segment as in the SegTable version above
+        oIndex = {spkr: i for i, spkr in enumerate(lstOracleSpkrs)}
+        dIndex = {spkr: i for i, spkr in enumerate(lstDiarizedSpkrs)}
+        oRows = []
+        oCols = []
+        dCounts = []
+        dCols = []
+        durations = []
+        for row in comboSplitSegs:
+            onames = row['name']['oname']
+            dnames = row['name']['dname']
+            if onames and dnames:
+                oRows.extend([len(durations)] * len(onames))
+                oCols.extend([oIndex[spkr] for spkr in onames])
+                dCounts.append(len(dnames))
+                dCols.extend([dIndex[spkr] for spkr in dnames])
+                durations.append(round(row['tend'] - row['tbeg'], 3))
+        oRows = np.array(oRows, dtype=np.int64)
+        dCounts = np.array(dCounts, dtype=np.int64)
+        dEnds = np.cumsum(dCounts)
+        owner, dEntries = _getRaggedIndex((dEnds - dCounts)[oRows], dEnds[oRows])
+        np.add.at(spkrTimes, (np.array(oCols, dtype=np.int64)[owner], np.array(dCols, dtype=np.int64)[dEntries]),
+                  np.array(durations, dtype=np.float64)[oRows[owner]])
+
+    return spkrTimes
+
+
+def getMapSpkrs(lstOracleSpkrs, dfSpkrTimes, mapping='greedy'):
     """
     This function maps ground truth speakers to diarization system speakers on the assumption that
-    the maximum time overlaps in dfSpkrTimes reflect the intended mapping.
+    the maximum time overlaps in dfSpkrTimes reflect the intended mapping.  The default greedy mapping takes the
+    diarization system speaker with the most overlap for each ground truth speaker on its own, so two ground truth
+    speakers can be mapped to the same diarization system speaker.  The optimal mapping instead finds the one-to-one
+    mapping with the most overlap in total, as md-eval.pl does, using the Hungarian algorithm on the overlap matrix.
 
     Inputs:
     - lstOracleSpkrs: list of ground truth speakers, form: "['FEE029', 'FEE030', 'MEE031', 'FEE032']"
@@ -167,6 +933,7 @@ def getMapSpkrs(lstOracleSpkrs, dfSpkrTimes):
                     FEE030	9.920	9.110	4.465	67.645	1.760	7.745
                     MEE031	6.445	0.570	106.655	5.105	0.000	5.020
                     FEE032	9.655	1.445	4.985	7.280	0.815	138.520"
+    - mapping: either "greedy" or "optimal", default "greedy"
 
     Outputs:
     - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
@@ -175,18 +942,127 @@ def getMapSpkrs(lstOracleSpkrs, dfSpkrTimes):
                         'FEE030': ['AMI_20050204-1206_spkr_5', 67.645, 67.2],
                         'MEE031': ['AMI_20050204-1206_spkr_3', 106.655, 86.2],
                         'FEE032': ['AMI_20050204-1206_spkr_9', 138.52, 85.1]}"
+                Ground truth speakers left without a diarization system speaker, or that no diarization system
+                speaker overlaps at all, are mapped to "[None, 0.0, 0.0]" with either mapping.
+    """
+    import numpy as np
+    index = {spkr: i for i, spkr in enumerate(dfSpkrTimes.index)}
+    spkrTimes = dfSpkrTimes.to_numpy(dtype=np.float64)[[index[spkr] for spkr in lstOracleSpkrs]]
+    return getArrayMapSpkrs(lstOracleSpkrs, list(dfSpkrTimes.columns), spkrTimes, mapping)
+
+
+def getArrayMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs, spkrTimes, mapping='greedy'):
     """
+    This function is getMapSpkrs(lstOracleSpkrs, dfSpkrTimes, mapping) on a NumPy array of the overlap times rather
+    than a dataframe, so the speakers can be mapped without pandas.
+
+    Inputs:
+    - lstOracleSpkrs: list of ground truth speakers, one for each row of spkrTimes
+    - lstDiarizedSpkrs: list of diarization system speakers, one for each column of spkrTimes
+    - spkrTimes: NumPy array size len(lstOracleSpkrs) x len(lstDiarizedSpkrs) of the overlap times, as from
+                 getSpkrTimesArray(...)
+    - mapping: either "greedy" or "optimal", default "greedy"
+
+    Outputs:
+    - mapSpkrs: a dictionary of the mapped speakers, in the same form as from getMapSpkrs(...)
+    """
+    import numpy as np
+    spkrTimes = np.asarray(spkrTimes, dtype=np.float64).reshape(len(lstOracleSpkrs), len(lstDiarizedSpkrs))
+    if mapping == 'optimal':
+        return _getOptimalMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs, spkrTimes)
+    if mapping != 'greedy':
+        raise ValueError("mapping must be 'greedy' or 'optimal', not {!r}.".format(mapping))
+
     mapSpkrs = {}
 
-    for spkr in lstOracleSpkrs:
-        dSpkr = dfSpkrTimes.loc[spkr].idxmax()
-        topTime = dfSpkrTimes.loc[spkr].max()
-        sumTime = sum(dfSpkrTimes.loc[spkr])
-        mapSpkrs[spkr] = [dSpkr, round(topTime, 3), round(100*topTime/sumTime, 1)]
+    for spkr, times in zip(lstOracleSpkrs, spkrTimes):
+        if len(lstDiarizedSpkrs) == 0:
+            # Nothing to map to if the diarization system output has no speakers
+            mapSpkrs[spkr] = [None, 0.0, 0.0]
+            continue
+        col = int(times.argmax())
+        topTime = times[col]
+        sumTime = sum(times)
+        if sumTime == 0:
+            # No diarization system speaker overlaps this one, so it is left unmapped as in the optimal mapping
+            mapSpkrs[spkr] = [None, 0.0, 0.0]
+            continue
+        mapSpkrs[spkr] = [lstDiarizedSpkrs[col], round(topTime, 3), round(100*topTime/sumTime, 1)]
+
+    return mapSpkrs
+
 
+def _getOptimalMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs, spkrTimes):
+    """
+    Optimal one-to-one version of getArrayMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs, spkrTimes).
+    """
+    mapCols = _getMaxAssignment(spkrTimes)
+    sumTimes = spkrTimes.sum(axis=1)
+    mapSpkrs = {}
+    for row, (spkr, col) in enumerate(zip(lstOracleSpkrs, mapCols.tolist())):
+        # A ground truth speaker with no overlap at all is left unmapped rather than given an arbitrary speaker
+        if col < 0 or spkrTimes[row, col] <= 0:
+            mapSpkrs[spkr] = [None, 0.0, 0.0]
+        else:
+            topTime = spkrTimes[row, col]
+            mapSpkrs[spkr] = [lstDiarizedSpkrs[col], round(topTime, 3), round(100*topTime/sumTimes[row], 1)]
     return mapSpkrs
 
 
+def _getMaxAssignment(matrix):
+    """
+    Finds the one-to-one assignment of rows to columns with the largest total using the Hungarian algorithm with
+    potentials and shortest augmenting paths, O(n^2 m) for n rows and m >= n columns, each step vectorized over the
+    columns.  Returns the column assigned to each row, or -1 for rows left over when there are more rows than columns.
+    """
+    import numpy as np
+    matrix = np.asarray(matrix, dtype=np.float64)
+    nRows, nCols = matrix.shape
+    if nRows == 0 or nCols == 0:
+        return np.full(nRows, -1, dtype=np.int64)
+    if nRows > nCols:
+        rowsForCols = _getMaxAssignment(matrix.T)
+        mapCols = np.full(nRows, -1, dtype=np.int64)
+        mapCols[rowsForCols] = np.arange(nCols)
+        return mapCols
+
+    # Minimise the negated times; row 0 and column 0 are the dummy start of each augmenting path
+    cost = -matrix
+    u = np.zeros(nRows + 1)
+    v = np.zeros(nCols + 1)
+    rowOfCol = np.zeros(nCols + 1, dtype=np.int64)
+    way = np.zeros(nCols + 1, dtype=np.int64)
+    for row in range(1, nRows + 1):
+        rowOfCol[0] = row
+        col0 = 0
+        minv = np.full(nCols + 1, np.inf)
+        used = np.zeros(nCols + 1, dtype=bool)
+        while True:
+            used[col0] = True
+            row0 = rowOfCol[col0]
+            reduced = cost[row0 - 1] - u[row0] - v[1:]
+            better = ~used[1:] & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = col0
+            col1 = int(np.argmin(np.where(used[1:], np.inf, minv[1:]))) + 1
+            delta = minv[col1]
+            u[rowOfCol[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            col0 = col1
+            if rowOfCol[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            rowOfCol[col0] = rowOfCol[col1]
+            col0 = col1
+
+    mapCols = np.full(nRows, -1, dtype=np.int64)
+    assigned = np.nonzero(rowOfCol[1:])[0]
+    mapCols[rowOfCol[1:][assigned] - 1] = assigned
+    return mapCols
+
+
 def getSegsIgnore(oracleSplitSegs, collars):
     """
     This function returns a list of the segment times to ignore based on the input collar sizes.  Note that
@@ -201,12 +1077,16 @@ def getSegsIgnore(oracleSplitSegs, collars):
     - segsIgnore: the list of segment times to ignore, form: "[[1270.14, 1270.64], [1274.63, 1275.88], ...]"
     """
     import numpy as np
+    if isinstance(oracleSplitSegs, SegTable):
+        bounds = list(zip(oracleSplitSegs.tbeg.tolist(), oracleSplitSegs.tend.tolist()))
+    else:
+        bounds = [(row['tbeg'], row['tend']) for row in oracleSplitSegs]
     segsIgnore = []
     for index, collar in enumerate(collars):
         segsIgnore.append([])
-        for row in oracleSplitSegs:
-            segsIgnore[index].append([row['tbeg'] - collar[0], row['tbeg'] + collar[1]])
-            segsIgnore[index].append([row['tend'] - collar[0], row['tend'] + collar[1]])
+        for tbeg, tend in bounds:
+            segsIgnore[index].append([tbeg - collar[0], tbeg + collar[1]])
+            segsIgnore[index].append([tend - collar[0], tend + collar[1]])
     return segsIgnore
 
 
@@ -253,6 +1133,154 @@ def getNewSegsIgnore(segsIgnore, collars):
     return newSegsIgnore
 
 
+def getRevisedAndCollarSegs(comboSplitSegs, newSegsIgnore):
+    """
+    This function splits the non-overlapping list of ground truth and diarization segments into the portions outside
+    the segments to ignore and the portions within them in a single pass.  As both inputs are sorted and
+    non-overlapping, the segments to ignore are merged against the segments like a sweep line rather than every
+    segment to ignore being checked against every segment.
+
+    Inputs:
+    - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
+                      non-overlapping segments with a constant number of speakers in each segment
+    - newSegsIgnore: the non-overlapping list of segments to ignore, form: "[[1270.14, 1270.64], [1274.63, 1275.88], ..."
+
+    Outputs:
+    - segs: the revised list of ground truth and diarization segments after removing segments within the collars
+    - collarSegs: list of segments within the collars, form: "[[1270.35, 1270.45], [1275.084, 1275.184], ...]"
+
+    If comboSplitSegs is a SegTable, both outputs are SegTables.
+    """
+    if isinstance(comboSplitSegs, SegTable):
+        return _getRevisedAndCollarSegTables(comboSplitSegs, newSegsIgnore)
+
+    segs = []
+    collarSegs = []
+
+    first = 0
+    for seg in comboSplitSegs:
+        tbeg = seg['tbeg']
+        tend = seg['tend']
+
+        # Segments to ignore that end before this segment starts cannot touch any later segment either
+        while first < len(newSegsIgnore) and newSegsIgnore[first][1] < tbeg:
+            first += 1
+
+        cursor = tbeg
+        cut = False
+        removed = False
+        j = first
+        while j < len(newSegsIgnore) and newSegsIgnore[j][0] <= tend:
+            row = newSegsIgnore[j]
+            if row[0] <= tbeg and row[1] >= tend:
+                # Whole segment is within the collar
+                collarSegs.append((tbeg, j, seg))
+                removed = True
+            elif row[0] < tend and row[1] > tbeg:
+                # Part of the segment is within the collar
+                collarSegs.append((max(row[0], tbeg), j, {'tbeg': max(row[0], tbeg), 'tend': min(row[1], tend),
+                                                          'name': seg['name']}))
+                if row[0] > cursor:
+                    segs.append({'tbeg': cursor, 'tend': row[0], 'name': seg['name']})
+                cursor = max(cursor, row[1])
+                cut = True
+            j += 1
+
+        if removed:
+            continue
+        if not cut:
+            segs.append(seg)
+        elif tend > cursor:
+            segs.append({'tbeg': cursor, 'tend': tend, 'name': seg['name']})
+
+    # Order the collar segments as if each segment to ignore had been taken in turn
+    collarSegs.sort(key=lambda x:x[:2])
+    collarSegs = [x[2] for x in collarSegs]
+
+    return segs, collarSegs
+
+
+def _getIgnoreArray(newSegsIgnore, dtype):
+    """
+    Returns the segments to ignore as an array size len(newSegsIgnore) x 2 of the same type as the segment times,
+    passing an array that already is one straight through.
+    """
+    import numpy as np
+    if isinstance(newSegsIgnore, np.ndarray) and newSegsIgnore.dtype == dtype:
+        return newSegsIgnore.reshape(-1, 2)
+    ignore = np.asarray(newSegsIgnore, dtype=np.float64).reshape(-1, 2)
+    if np.dtype(dtype).kind == 'i':
+        # Keep whole ticks as integers, with the unbounded ends of the segments to ignore outside a UEM brought in
+        ignore = np.clip(ignore, -2**62, 2**62).astype(np.int64)
+    return ignore
+
+
+def _getCollarPieces(tbeg, tend, newSegsIgnore):
+    """
+    Finds the pieces of each segment outside and within the segments to ignore with binary searches, giving the same
+    pieces in the same order as getRevisedAndCollarSegs(comboSplitSegs, newSegsIgnore).
+
+    Inputs:
+    - tbeg, tend: float64 or int64 arrays of the start and end times of sorted, non-overlapping segments
+    - newSegsIgnore: the non-overlapping list of segments to ignore, form: "[[1270.14, 1270.64], [1274.63, 1275.88], ...",
+                     or an array of them from _getIgnoreArray(newSegsIgnore, dtype)
+
+    Outputs:
+    - outside: tuple of arrays (segment row, piece start, piece end) for the pieces outside the collars
+    - inside: tuple of arrays (segment row, piece start, piece end) for the pieces within the collars
+    """
+    import numpy as np
+    ignore = _getIgnoreArray(newSegsIgnore, tbeg.dtype)
+    edge = 2**62 if tbeg.dtype.kind == 'i' else np.inf
+
+    # Pieces within the collars: every segment to ignore that contains the segment or overlaps it by a positive time
+    rows, j = _getRaggedIndex(np.searchsorted(ignore[:, 1], tbeg, 'left'), np.searchsorted(ignore[:, 0], tend, 'right'))
+    contained = (ignore[j, 0] <= tbeg[rows]) & (ignore[j, 1] >= tend[rows])
+    overlaps = (ignore[j, 0] < tend[rows]) & (ignore[j, 1] > tbeg[rows])
+    inside = contained | overlaps
+    rows, j, contained, overlaps = rows[inside], j[inside], contained[inside], overlaps[inside]
+    collarBeg = np.maximum(ignore[j, 0], tbeg[rows])
+    collarEnd = np.minimum(ignore[j, 1], tend[rows])
+    order = np.lexsort((j, collarBeg))
+    inside = (rows[order], collarBeg[order], collarEnd[order])
+
+    # Pieces outside the collars: segments left alone are kept whole, cut segments keep their positive gaps
+    removed = np.zeros(len(tbeg), dtype=bool)
+    removed[rows[contained]] = True
+    cut = np.zeros(len(tbeg), dtype=bool)
+    cut[rows[overlaps & ~contained]] = True
+    cut &= ~removed
+    whole = np.nonzero(~removed & ~cut)[0]
+    cutRows = np.nonzero(cut)[0]
+    gapBeg = np.concatenate([[-edge], ignore[:, 1]])
+    gapEnd = np.concatenate([ignore[:, 0], [edge]])
+    owner, gaps = _getRaggedIndex(np.searchsorted(gapEnd, tbeg[cutRows], 'right'),
+                                  np.searchsorted(gapBeg, tend[cutRows], 'left'))
+    pieceRows = cutRows[owner]
+    pieceBeg = np.maximum(gapBeg[gaps], tbeg[pieceRows])
+    pieceEnd = np.minimum(gapEnd[gaps], tend[pieceRows])
+    positive = pieceBeg < pieceEnd
+    rows = np.concatenate([whole, pieceRows[positive]])
+    order = np.argsort(rows, kind='stable')
+    outside = (rows[order], np.concatenate([tbeg[whole], pieceBeg[positive]])[order],
+               np.concatenate([tend[whole], pieceEnd[positive]])[order])
+
+    return outside, inside
+
+
+def _getRevisedAndCollarSegTables(table, newSegsIgnore):
+    """
+    SegTable version of getRevisedAndCollarSegs(comboSplitSegs, newSegsIgnore).
+    """
+    tables = []
+    for rows, pieceBeg, pieceEnd in _getCollarPieces(table.tbeg, table.tend, newSegsIgnore):
+        pieces = table.take(rows)
+        pieces.tbeg = pieceBeg
+        pieces.tend = pieceEnd
+        tables.append(pieces)
+    return tables[0], tables[1]
+
+
 def getRevisedComboSplitSegs(comboSplitSegs, newSegsIgnore):
     """
     This function removes the segments to ignore from the non-overlapping list of ground truth and diarization
@@ -266,28 +1294,7 @@ def getRevisedComboSplitSegs(comboSplitSegs, newSegsIgnore):
     Outputs:
     - segs: the revised list of ground truth and diarization segments after removing segments within the collars
     """
-    segs = comboSplitSegs.copy()
-    newRows = []
-
-    for row in newSegsIgnore:
-        for j in range(len(segs)):
-            if row[0] <= segs[j]['tbeg'] and row[1] >= segs[j]['tend']:
-                segs[j] = {'tbeg': 0, 'tend': 0, 'name': {'oname': [], 'dname': []}}
-            elif row[0] <= segs[j]['tbeg'] and row[1] > segs[j]['tbeg'] and row[1] < segs[j]['tend']:
-                segs[j] = {'tbeg': row[1], 'tend': segs[j]['tend'], 'name': segs[j]['name']}
-            elif row[0] > segs[j]['tbeg'] and row[0] < segs[j]['tend'] and row[1] >= segs[j]['tend']:
-                segs[j] = {'tbeg': segs[j]['tbeg'], 'tend': row[0], 'name': segs[j]['name']}
-            elif row[0] > segs[j]['tbeg'] and row[0] < segs[j]['tend'] and row[1] < segs[j]['tend']:
-                segs[j] = {'tbeg': segs[j]['tbeg'], 'tend': row[0], 'name': segs[j]['name']}
-                newRows.append({'tbeg': row[1], 'tend': segs[j]['tend'], 'name': segs[j]['name']})
-
-    segs = segs + newRows
-    segs.sort(key=lambda x:x['tbeg'])
-
-    for i in reversed(range(len(segs))):
-        if segs[i] == {'tbeg': 0, 'tend': 0, 'name': {'oname': [], 'dname': []}}:
-            del segs[i]
-
+    segs, _ = getRevisedAndCollarSegs(comboSplitSegs, newSegsIgnore)
     return segs
 
 
@@ -297,7 +1304,8 @@ def getTotalTime(segs, countMultipleSpkrs=True):
     speaker time to be double counted or not.
 
     Inputs:
-    - segs: the list of ground truth and diarization segments after removing segments within the collars
+    - segs: the list of ground truth and diarization segments after removing segments within the collars, or a
+            SegTable
     - countMultipleSpeakers: a Boolean option to double count overlapping ground truth speaker time (i.e. all time
                              spoken by ground truth speakers v. time in which ground truth speakers are speaking),
                              default "True"
@@ -305,6 +1313,12 @@ def getTotalTime(segs, countMultipleSpkrs=True):
     Outputs:
     - time: aggregate ground truth speaker time in seconds, form: "408.565" (multiple on) or "400.01" (multiple off)
     """
+    if isinstance(segs, SegTable):
+        durations = segs.tend - segs.tbeg
+        if countMultipleSpkrs == False:
+            return _sequentialSum(durations)
+        return _sequentialSum(durations * segs.oname.getRowTotals())
+
     time = 0
     for row in segs:
         if countMultipleSpkrs == False:
@@ -320,11 +1334,23 @@ def getMissedTime(segs):
     This function calculates the aggregate time missed by the speaker diarization system.
 
     Inputs:
-    - segs: the list of ground truth and diarization segments after removing segments within the collars
+    - segs: the list of ground truth and diarization segments after removing segments within the collars, or a
+            SegTable
 
     Outputs:
     - missedTime: aggregate time missed by the speaker diarization system in seconds, form: "8.555"
     """
+    if isinstance(segs, SegTable):
+        import numpy as np
+        durations = segs.tend - segs.tbeg
+        oCounts = segs.oname.getRowTotals()
+        dCounts = segs.dname.getRowTotals()
+        # Interleave the two contributions of each segment so they are added in the same order as below
+        missed = np.zeros((len(segs), 2), dtype=durations.dtype)
+        missed[:, 0] = np.where((oCounts > 0) & (dCounts == 0), durations, 0)
+        missed[:, 1] = np.where(oCounts > 1, (oCounts - 1) * durations, 0)
+        return _sequentialSum(missed.ravel())
+
     missedTime = 0
     for row in segs:
         # No speaker identified
@@ -343,11 +1369,17 @@ def getFalarmTime(segs):
     This function calculates the aggregate false alarm time generated by the speaker diarization system.
 
     Inputs:
-    - segs: the list of ground truth and diarization segments after removing segments within the collars
+    - segs: the list of ground truth and diarization segments after removing segments within the collars, or a
+            SegTable
 
     Outputs:
     - falarmTime: the aggregate false alarm time generated by the speaker diarization system in seconds, form: "0"
     """
+    if isinstance(segs, SegTable):
+        import numpy as np
+        falarm = (segs.oname.getRowTotals() == 0) & (segs.dname.getRowTotals() > 0)
+        return _sequentialSum(np.where(falarm, segs.tend - segs.tbeg, 0))
+
     falarmTime = 0
     for row in segs:
         if row['name']['oname'] == [] and row['name']['dname'] != []:
@@ -363,7 +1395,8 @@ def getErrorTime(segs, mapSpkrs):
     are mapped to the speaker diarization system speaker, that time will be counted as error time.
 
     Inputs:
-    - segs: the list of ground truth and diarization segments after removing segments within the collars
+    - segs: the list of ground truth and diarization segments after removing segments within the collars, or a
+            SegTable
     - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
                 the mapped speaker, the mapped speaker time and the percentage of time correctly mapped to that speaker,
                 form: "{'FEE029': ['AMI_20050204-1206_spkr_0', 194.48, 79.6],
@@ -374,6 +1407,11 @@ def getErrorTime(segs, mapSpkrs):
     Outputs:
     - errorTime: the aggregate speaker error time generated by the speaker diarization system in seconds, form: "27.37"
     """
+    if isinstance(segs, SegTable):
+        import numpy as np
+        error = (segs.oname.getRowTotals() > 0) & (segs.dname.getRowTotals() > 0) & ~_getHits(segs, mapSpkrs)
+        return _sequentialSum(np.where(error, segs.tend - segs.tbeg, 0))
+
     errorTime = 0
     for row in segs:
         # Ignore rows where no speakers identified by either ground truth and diarization system
@@ -405,25 +1443,31 @@ def getCollarSegs(comboSplitSegs, newSegsIgnore):
     Outputs:
     - collarSegs: list of segments within the collars, form: "[[1270.35, 1270.45], [1275.084, 1275.184], ...]"
     """
-    segs = comboSplitSegs.copy()
-    collarSegs = []
-
-    # Using newSegsIgnore as before, but this time taking the portions within them
-    for row in newSegsIgnore:
-        for j in range(len(segs)):
-            if row[0] <= segs[j]['tbeg'] and row[1] >= segs[j]['tend']:
-                collarSegs.append(segs[j])
-            elif row[0] <= segs[j]['tbeg'] and row[1] > segs[j]['tbeg'] and row[1] < segs[j]['tend']:
-                collarSegs.append({'tbeg': segs[j]['tbeg'], 'tend': row[1], 'name': segs[j]['name']})
-            elif row[0] > segs[j]['tbeg'] and row[0] < segs[j]['tend'] and row[1] >= segs[j]['tend']:
-                collarSegs.append({'tbeg': row[0], 'tend': segs[j]['tend'], 'name': segs[j]['name']})
-            elif row[0] > segs[j]['tbeg'] and row[0] < segs[j]['tend'] and row[1] < segs[j]['tend']:
-                collarSegs.append({'tbeg': row[0], 'tend': row[1], 'name': segs[j]['name']})
-
-    collarSegs.sort(key=lambda x:x['tbeg'])
+    _, collarSegs = getRevisedAndCollarSegs(comboSplitSegs, newSegsIgnore)
     return collarSegs
 
 
+def _getErrorRates(totalTime, missedTime, falarmTime, errorTime):
+    """
+    Converts aggregate times in seconds to the MISS, FALARM, ERROR and DER percentages, rounded to 2 decimal places.
+    """
+    return [round(100*missedTime/totalTime, 2),
+            round(100*falarmTime/totalTime, 2),
+            round(100*errorTime/totalTime, 2),
+            round(100*(missedTime + falarmTime + errorTime)/totalTime, 2)]
+
+
+def _getDfErrors(matErrors, collars, derColumn):
+    """
+    Puts a list of lists of error percentages into a dataframe indexed by collar in milliseconds.
+    """
+    import pandas as pd
+    dfErrors = pd.DataFrame(matErrors, index=["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000) for collar in collars],
+                            columns=["MISS (%)", "FALARM (%)", "ERROR (%)", derColumn])
+    dfErrors.index.name = "Collars [-ms, +ms]"
+    return dfErrors
+
+
 def getErrors(revisedComboSplitSegs, mapSpkrs, collars):
     """
     This function returns a list of lists of all the errors and a dataframe.
@@ -454,21 +1498,15 @@ def getErrors(revisedComboSplitSegs, mapSpkrs, collars):
                                                     [200, 200]	14.16	0.24	6.37	20.78
                                                     [250, 250]	13.12	0.22	6.05	19.39"
     """
-    import pandas as pd
     matErrors = []
     for index, collar in enumerate(collars):
         totalTime = getTotalTime(revisedComboSplitSegs[index], True)
         missedTime = getMissedTime(revisedComboSplitSegs[index])
         falarmTime = getFalarmTime(revisedComboSplitSegs[index])
         errorTime = getErrorTime(revisedComboSplitSegs[index], mapSpkrs)
-        matErrors.append([round(100*missedTime/totalTime, 2),\
-                          round(100*falarmTime/totalTime, 2),\
-                         round(100*errorTime/totalTime, 2),\
-                          round(100*(missedTime + falarmTime + errorTime)/totalTime, 2)])
+        matErrors.append(_getErrorRates(totalTime, missedTime, falarmTime, errorTime))
 
-    dfErrors = pd.DataFrame(matErrors, index=["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000) for collar in collars],\
-                            columns=["MISS (%)", "FALARM (%)", "ERROR (%)", "DER (%)"])
-    dfErrors.index.name = "Collars [-ms, +ms]"
+    dfErrors = _getDfErrors(matErrors, collars, "DER (%)")
 
     return matErrors, dfErrors
 
@@ -501,7 +1539,6 @@ def getSBDERs(allCollarSegs, mapSpkrs, collars):
                                                     [200, 200]	39.64	3.07	13.66	56.36
                                                     [250, 250]	38.39	2.69	13.35	54.43"
     """
-    import pandas as pd
     matSBDERs = []
     for index, collar in enumerate(collars):
         if collar[0] != 0 and collar[1] != 0: # Meaningless to do this if no collar
@@ -509,76 +1546,2470 @@ def getSBDERs(allCollarSegs, mapSpkrs, collars):
             missedTime = getMissedTime(allCollarSegs[index])
             falarmTime = getFalarmTime(allCollarSegs[index])
             errorTime = getErrorTime(allCollarSegs[index], mapSpkrs)
-            matSBDERs.append([round(100*missedTime/totalTime, 2),\
-                             round(100*falarmTime/totalTime, 2),\
-                             round(100*errorTime/totalTime, 2),\
-                             round(100*(missedTime + falarmTime + errorTime)/totalTime, 2)])
+            matSBDERs.append(_getErrorRates(totalTime, missedTime, falarmTime, errorTime))
     
-    dfSBDERs = pd.DataFrame(matSBDERs, index=["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000) for collar in collars[1:]],\
-                            columns=["MISS (%)", "FALARM (%)", "ERROR (%)", "SBDER (%)"])
-    dfSBDERs.index.name = "Collars [-ms, +ms]"
+    dfSBDERs = _getDfErrors(matSBDERs, _getSBDERCollars(collars), "SBDER (%)")
     
     return matSBDERs, dfSBDERs
 
 
-def getAllErrors(oracleRttmFile, diarizedRttmFile, collars):
+def getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs):
     """
-    Single function that takes the input RTTM files and list of collars and gives the errors dataframe as well as the
-    segment boundary errors dataframe.
+    This function scores every collar at once.  The speaker counts and the MISS, FALARM and ERROR conditions of each
+    segment do not depend on the collar, so they are worked out once, and each collar then only needs the durations
+    of the pieces of each segment outside and within its segments to ignore.  The sums are added up in the same
+    order as getTotalTime(segs), getMissedTime(segs), getFalarmTime(segs) and getErrorTime(segs, mapSpkrs), so the
+    times are exactly the same as scoring the segments from getRevisedAndCollarSegs(comboSplitSegs, newSegsIgnore).
 
     Inputs:
-    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm"
-    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/AMI_20050204-1206.rttm"
-    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
+                      non-overlapping segments with a constant number of speakers in each segment, or a SegTable
+    - newSegsIgnore: the revised list of segments to ignore for each collar, form:
+                     "[[[1270.14, 1270.64], [1274.63, 1275.88], ...], [...]]"
+    - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
+                the mapped speaker, the mapped speaker time and the percentage of time correctly mapped to that speaker,
+                form: "{'FEE029': ['AMI_20050204-1206_spkr_0', 194.48, 79.6], ...}"
+
     Outputs:
-    - dfErrors: a dataframe of the errors, form: "	            MISS	FALARM	ERROR	DER
-                                                    [0, 0]	    20.15	0.91	8.09	29.14
-                                                    [50, 50]	18.40	0.46	7.63	26.48
-                                                    [100, 100]	16.86	0.32	7.16	24.34
-                                                    [150, 150]	15.46	0.28	6.72	22.45
-                                                    [200, 200]	14.16	0.24	6.37	20.78
-                                                    [250, 250]	13.12	0.22	6.05	19.39"
-    - dfSBDERs: a dataframe of the errors, form: "	            MISS	FALARM	ERROR	DER
-                                                    [50, 50]	43.94	7.00	14.24	65.18
-                                                    [100, 100]	42.19	4.88	14.29	61.36
-                                                    [150, 150]	40.76	3.68	14.09	58.54
-                                                    [200, 200]	39.64	3.07	13.66	56.36
-                                                    [250, 250]	38.39	2.69	13.35	54.43"
-    
+    - timesOutside: NumPy array size len(newSegsIgnore) x 4 of the ground truth, missed, false alarm and speaker error
+                    times in seconds outside the collars, or in whole ticks as int64 if the segment times are
+    - timesInside: NumPy array size len(newSegsIgnore) x 4 of the same times within the collars
     """
+    import numpy as np
+    tbeg, tend = _getSegTimes(comboSplitSegs)
+    weights = _getSegWeights(comboSplitSegs, mapSpkrs)
 
-    import pandas as pd
-    oracleSegs = getSegs(oracleRttmFile, True)
-    diarizedSegs = getSegs(diarizedRttmFile, False)
+    timesOutside = np.zeros((len(newSegsIgnore), 4), dtype=tbeg.dtype)
+    timesInside = np.zeros((len(newSegsIgnore), 4), dtype=tbeg.dtype)
+    for index, segsIgnore in enumerate(newSegsIgnore):
+        for times, (rows, pieceBeg, pieceEnd) in zip((timesOutside[index], timesInside[index]),
+                                                     _getCollarPieces(tbeg, tend, segsIgnore)):
+            terms = (pieceEnd - pieceBeg)[:, None] * weights[rows]
+            times[0] = _sequentialSum(terms[:, 0])
+            times[1] = _sequentialSum(terms[:, 1:3].ravel())
+            times[2] = _sequentialSum(terms[:, 3])
+            times[3] = _sequentialSum(terms[:, 4])
 
-    oracleSplitSegs = getSplitSegs(oracleSegs)
-    diarizedSplitSegs = getSplitSegs(diarizedSegs)
+    return timesOutside, timesInside
 
-    comboSegs = oracleSplitSegs + diarizedSplitSegs
-    comboSegs.sort(key=lambda x:x['tbeg'])
 
-    comboSplitSegs = getSplitSegs(comboSegs)
+def _getSegTimes(segs):
+    """
+    Returns the start and end times of a SegTable or a list of segments as arrays, int64 if they are whole ticks and
+    float64 otherwise, as a SegTable holds them.
+    """
+    import numpy as np
+    if isinstance(segs, SegTable):
+        return segs.tbeg, segs.tend
+    tbeg = np.array([seg['tbeg'] for seg in segs])
+    tend = np.array([seg['tend'] for seg in segs])
+    dtype = np.int64 if tbeg.dtype.kind in 'iu' and tend.dtype.kind in 'iu' else np.float64
+    return tbeg.astype(dtype, copy=False), tend.astype(dtype, copy=False)
 
-    dfComboSplitSegs = pd.DataFrame(comboSplitSegs, columns=["Start Time", "End Time", "Oracle Speaker(s)", "Diarized Speaker(s)"])
 
-    lstOracleSpkrs = getSpkrs(comboSplitSegs, 'oname')
-    lstDiarizedSpkrs = getSpkrs(comboSplitSegs, 'dname')
-    dfSpkrTimes = getSpkrTimes(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs)
-    mapSpkrs = getMapSpkrs(lstOracleSpkrs, dfSpkrTimes)
+def _getSegWeights(segs, mapSpkrs):
+    """
+    Returns the weight of each segment's duration in the ground truth, MISS, FALARM and ERROR sums as an int64 array
+    size len(segs) x 5, the two MISS terms being kept apart as in getMissedTime(segs).  A list of segments is gone
+    through once rather than built into a SegTable.
+    """
+    import numpy as np
+    if isinstance(segs, SegTable):
+        oCounts = segs.oname.getRowTotals()
+        dCounts = segs.dname.getRowTotals()
+        hit = _getHits(segs, mapSpkrs)
+    else:
+        oCounts = np.array([len(seg['name']['oname']) for seg in segs], dtype=np.int64)
+        dCounts = np.array([len(seg['name']['dname']) for seg in segs], dtype=np.int64)
+        hit = np.array([any(spkr in mapSpkrs and mapSpkrs[spkr][0] in seg['name']['dname']
+                            for spkr in seg['name']['oname']) for seg in segs], dtype=bool)
+
+    weights = np.zeros((len(segs), 5), dtype=np.int64)
+    weights[:, 0] = oCounts
+    weights[:, 1] = (oCounts > 0) & (dCounts == 0)
+    weights[:, 2] = np.maximum(oCounts - 1, 0)
+    weights[:, 3] = (oCounts == 0) & (dCounts > 0)
+    weights[:, 4] = (oCounts > 0) & (dCounts > 0) & ~hit
+    return weights
+
+
+def _getHits(table, mapSpkrs):
+    """
+    Returns a Boolean array of whether the diarization system speaker mapped to any of the ground truth speakers of
+    each segment of a SegTable is active in it.
+    """
+    import numpy as np
+    dIndex = {spkr: i for i, spkr in enumerate(table.lstDiarizedSpkrs)}
+    mapCols = np.array([dIndex.get(mapSpkrs[spkr][0], -1) if spkr in mapSpkrs else -1
+                        for spkr in table.lstOracleSpkrs] + [-1], dtype=np.int64)
+    cols = mapCols[table.oname.spkrs]
+    mapped = cols >= 0
+    # Both sets of entries are sorted by row and speaker, so their keys are too
+    nSpkrs = max(len(table.lstDiarizedSpkrs), 1)
+    keys = table.oname.rows[mapped] * nSpkrs + cols[mapped]
+    dKeys = table.dname.rows * nSpkrs + table.dname.spkrs
+    position = np.searchsorted(dKeys, keys)
+    found = position < len(dKeys)
+    found[found] = dKeys[position[found]] == keys[found]
+    hit = np.zeros(len(table), dtype=bool)
+    hit[table.oname.rows[mapped][found]] = True
+    return hit
+
+
+def getCollarCurveTimes(comboSplitSegs, oracleSplitSegs, mapSpkrs, collarSizes):
+    """
+    This function scores a whole sweep of collar sizes from one sort of the segment boundaries, rather than building
+    and cutting out the segments to ignore for each collar.  As every ground truth boundary is also a boundary of the
+    segments, only the nearest ground truth boundaries before and after a segment, L and R, can reach into it, so
+    with a collar of c seconds either side the time scored outside the collars is
+    max(0, min(tend, R - c) - max(tbeg, L + c)).  This is piecewise linear in c with at most three kinks per segment,
+    so the kinks of all the segments are sorted once and the times for every collar size are read off cumulative
+    sums of the slopes.  Each collar size is evaluated exactly from these sums rather than interpolated, so the
+    times are those from getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs) for collars [c, c].  With the
+    times in whole ticks and integer collar sizes everything is worked out in integers and the times are exactly
+    the same.  In seconds they agree up to the floating point rounding of the boundary arithmetic, of the order of
+    1e-10 seconds, which only changes a DER rounded to 2 decimal places, by 0.01, when it lies right on a rounding
+    boundary.
 
-    segsIgnore = getSegsIgnore(oracleSplitSegs, collars)
-    newSegsIgnore = getNewSegsIgnore(segsIgnore, collars)
+    Inputs:
+    - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
+                      non-overlapping segments with a constant number of speakers in each segment, or a SegTable
+    - oracleSplitSegs: ground truth split segments the collars are placed around, as a list of segments or a SegTable
+    - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
+                the mapped speaker, the mapped speaker time and the percentage of time correctly mapped to that speaker,
+                form: "{'FEE029': ['AMI_20050204-1206_spkr_0', 194.48, 79.6], ...}"
+    - collarSizes: list of collar sizes in seconds, each used as both the start and the end collar,
+                   form: "[0, 0.005, 0.01, ..., 0.5]", or in whole ticks if the segment times are
 
-    revisedComboSplitSegs = []
-    for index, collar in enumerate(collars):
-        revisedComboSplitSegs.append(getRevisedComboSplitSegs(comboSplitSegs, newSegsIgnore[index]))
+    Outputs:
+    - timesOutside: NumPy array size len(collarSizes) x 4 of the ground truth, missed, false alarm and speaker error
+                    times in seconds outside the collars, or in whole ticks as int64 if the segment times and collar
+                    sizes are
+    - timesInside: NumPy array size len(collarSizes) x 4 of the same times within the collars
+    """
+    import numpy as np
+    if isinstance(oracleSplitSegs, SegTable):
+        bounds = np.concatenate([oracleSplitSegs.tbeg, oracleSplitSegs.tend])
+    else:
+        bounds = np.array([row[key] for row in oracleSplitSegs for key in ('tbeg', 'tend')], dtype=np.float64)
+    bounds = np.unique(bounds)
+    tbeg, tend = _getSegTimes(comboSplitSegs)
+    collarSizes = np.asarray(collarSizes)
+    # Whole ticks and collar sizes are swept in integers, with a very large gap standing in for no boundary at all
+    ticks = tbeg.dtype.kind == 'i' and collarSizes.dtype.kind in 'iu'
+    dtype = np.int64 if ticks else np.float64
+    collarSizes = collarSizes.astype(dtype)
+    bounds = bounds.astype(dtype)
+    noGap = 2**60 if ticks else np.inf
+
+    weights = _getSegWeights(comboSplitSegs, mapSpkrs)
+    weights = np.stack([weights[:, 0], weights[:, 1] + weights[:, 2], weights[:, 3], weights[:, 4]], axis=1)
+    durations = tend - tbeg
+    keep = durations > 0
+    tbeg, tend, durations, weights = tbeg[keep], tend[keep], durations[keep], weights[keep]
+
+    # Distances from each segment to the nearest ground truth boundaries before and after it
+    before = np.searchsorted(bounds, tbeg, 'right') - 1
+    after = np.searchsorted(bounds, tend, 'left')
+    gapBefore = np.full(len(tbeg), noGap, dtype=dtype)
+    gapBefore[before >= 0] = tbeg[before >= 0] - bounds[before[before >= 0]]
+    gapAfter = np.full(len(tend), noGap, dtype=dtype)
+    gapAfter[after < len(bounds)] = bounds[after[after < len(bounds)]] - tend[after < len(bounds)]
+    lo = np.minimum(gapBefore, gapAfter)
+    hi = np.maximum(gapBefore, gapAfter)
+
+    # The scored time is durations - relu(c - lo) - relu(c - hi) until it reaches 0 at c = zero, after which it
+    # stays at 0, i.e. slope kinks of -1 at lo, -1 at hi unless zero comes first, and +1 or +2 at zero.  Each kink
+    # adds slope * (c - kink) once c is past it, and slope * kink is -lo, -hi, lo + durations or durations + lo + hi,
+    # so the offsets stay exact even where zero falls half way between two ticks, which is why the kinks of the
+    # integer sweep are sorted in half ticks
+    oneSided = lo + durations <= hi
+    products = np.concatenate([-lo, -hi, np.where(oneSided, lo + durations, durations + lo + hi)])
+    slopes = np.concatenate([np.full(len(lo), -1), np.full(len(hi), -1), np.where(oneSided, 1, 2)]).astype(dtype)
+    if ticks:
+        half = 2
+        kinks = np.concatenate([2*lo, 2*hi, np.where(oneSided, 2*(lo + durations), durations + lo + hi)])
+    else:
+        half = 1
+        kinks = np.concatenate([lo, hi, np.where(oneSided, lo + durations, (durations + lo + hi) / 2)])
+    # Segments with no ground truth boundary on a side are never reached by a collar from that side
+    scored = np.concatenate([lo < noGap, (hi < noGap) & ~oneSided, lo < noGap])
+    allWeights = np.concatenate([weights, weights, weights])[scored]
+    kinks, slopes, products = kinks[scored], slopes[scored], products[scored]
+    order = np.argsort(kinks, kind='stable')
+    kinks, slopes, products, allWeights = kinks[order], slopes[order], products[order], allWeights[order]
+    slopeSums = np.concatenate([np.zeros((1, 4), dtype=dtype), np.cumsum(allWeights * slopes[:, None], axis=0)])
+    offsetSums = np.concatenate([np.zeros((1, 4), dtype=dtype), np.cumsum(allWeights * products[:, None], axis=0)])
+
+    timesFull = (durations[:, None] * weights).sum(axis=0)
+    index = np.searchsorted(kinks, half*collarSizes, 'left')
+    timesOutside = timesFull + collarSizes[:, None] * slopeSums[index] - offsetSums[index]
+    timesOutside = np.maximum(timesOutside, 0)
+    timesInside = np.maximum(timesFull - timesOutside, 0)
+    return timesOutside, timesInside
+
+
+def getBatchErrors(comboSplitSegs, newSegsIgnore, mapSpkrs, collars):
+    """
+    This function returns the same errors as getErrors(revisedComboSplitSegs, mapSpkrs, collars) and
+    getSBDERs(allCollarSegs, mapSpkrs, collars), but scores all the collars together with
+    getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs) instead of cutting and looping over the segments
+    once per collar.
 
-    matErrors, dfErrors = getErrors(revisedComboSplitSegs, mapSpkrs, collars)
-    
-    allCollarSegs = []
-    for index, collar in enumerate(collars):
-        allCollarSegs.append(getCollarSegs(comboSplitSegs, newSegsIgnore[index]))
-    
-    matSBDERs, dfSBDERs = getSBDERs(allCollarSegs, mapSpkrs, collars)
-    
-    return mapSpkrs, dfErrors, dfSBDERs
+    Inputs:
+    - comboSplitSegs: list of ground truth and diarization segments after all iterations have reduced it to
+                      non-overlapping segments with a constant number of speakers in each segment, or a SegTable
+    - newSegsIgnore: the revised list of segments to ignore for each collar, form:
+                     "[[[1270.14, 1270.64], [1274.63, 1275.88], ...], [...]]"
+    - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
+                the mapped speaker, the mapped speaker time and the percentage of time correctly mapped to that speaker,
+                form: "{'FEE029': ['AMI_20050204-1206_spkr_0', 194.48, 79.6], ...}"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+
+    Outputs:
+    - matErrors: a list of lists of the errors, as from getErrors(revisedComboSplitSegs, mapSpkrs, collars)
+    - dfErrors: a dataframe of the errors, as from getErrors(revisedComboSplitSegs, mapSpkrs, collars)
+    - matSBDERs: a list of lists of the errors within the collars, as from getSBDERs(allCollarSegs, mapSpkrs, collars)
+    - dfSBDERs: a dataframe of the errors within the collars, as from getSBDERs(allCollarSegs, mapSpkrs, collars)
+    """
+    timesOutside, timesInside = getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs)
+    return _getErrorsFromTimes(timesOutside, timesInside, collars)
+
+
+def _getErrorsFromTimes(timesOutside, timesInside, collars):
+    """
+    Turns the times from getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs) into matErrors, dfErrors,
+    matSBDERs and dfSBDERs.
+    """
+    matErrors, matSBDERs = _getMatErrors(timesOutside, timesInside, collars)
+
+    return (matErrors, _getDfErrors(matErrors, collars, "DER (%)"), matSBDERs,
+            _getDfErrors(matSBDERs, _getSBDERCollars(collars), "SBDER (%)"))
+
+
+def _getSBDERCollars(collars):
+    """
+    Returns the collars that the SBDERs are worked out and labelled for, those with both a start and an end collar,
+    as it is meaningless to score within a collar that is not there.
+    """
+    return [collar for collar in collars if collar[0] != 0 and collar[1] != 0]
+
+
+def _getMatErrors(timesOutside, timesInside, collars):
+    """
+    Turns the times from getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs) into matErrors and matSBDERs, lists of
+    lists of error percentages, without pandas.
+    """
+    matErrors = [_getErrorRates(*times) for times in timesOutside.tolist()]
+    matSBDERs = [_getErrorRates(*times) for collar, times in zip(collars, timesInside.tolist())
+                 if collar[0] != 0 and collar[1] != 0] # Meaningless to do this if no collar
+    return matErrors, matSBDERs
+
+
+@dataclasses.dataclass
+class ScoringResult:
+    """
+    This class holds the result of scoring one recording as plain Python lists and NumPy arrays, from
+    getScoringResult(...), so that scoring does not need pandas at all.  Only toDataFrames() imports pandas, to give
+    the dataframes of getAllErrors(...).
+
+    Attributes:
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - mapSpkrs: dictionary of the speaker mapping, in the same form as from getMapSpkrs(...)
+    - timesOutside: NumPy array size len(collars) x 4 of the ground truth, missed, false alarm and speaker error times
+                    outside the collars, in seconds, or in whole ticks as int64 with a timeScale
+    - timesInside: NumPy array size len(collars) x 4 of the same times within the collars
+    """
+    collars: list
+    mapSpkrs: dict
+    timesOutside: object
+    timesInside: object
+
+    def getErrors(self):
+        """
+        Returns matErrors, a list of the MISS, FALARM, ERROR and DER percentages for each collar.
+        """
+        return _getMatErrors(self.timesOutside, self.timesInside, self.collars)[0]
+
+    def getSBDERs(self):
+        """
+        Returns matSBDERs, a list of the MISS, FALARM, ERROR and SBDER percentages within each collar that is not
+        zero.
+        """
+        return _getMatErrors(self.timesOutside, self.timesInside, self.collars)[1]
+
+    def toDict(self):
+        """
+        Returns the mapping and the errors as a dictionary that can be encoded as JSON, with the errors in the same
+        form as the dataframes from toDataFrames() converted with to_dict(orient='index').  Any NaN is given as None,
+        so the JSON is valid.
+        """
+        import math
+
+        def getValue(value):
+            return None if isinstance(value, float) and math.isnan(value) else value
+
+        columns = ["MISS (%)", "FALARM (%)", "ERROR (%)"]
+        matErrors, matSBDERs = _getMatErrors(self.timesOutside, self.timesInside, self.collars)
+        labels = ["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000) for collar in self.collars]
+        sbderLabels = ["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000)
+                       for collar in _getSBDERCollars(self.collars)]
+        return {'mapSpkrs': {spkr: [getValue(value) for value in values] for spkr, values in self.mapSpkrs.items()},
+                'dfErrors': {label: dict(zip(columns + ["DER (%)"], map(getValue, errors)))
+                             for label, errors in zip(labels, matErrors)},
+                'dfSBDERs': {label: dict(zip(columns + ["SBDER (%)"], map(getValue, errors)))
+                             for label, errors in zip(sbderLabels, matSBDERs)}}
+
+    def toDataFrames(self):
+        """
+        Returns dfErrors and dfSBDERs, in the same form as from getAllErrors(...).
+        """
+        matErrors, dfErrors, matSBDERs, dfSBDERs = _getErrorsFromTimes(self.timesOutside, self.timesInside,
+                                                                       self.collars)
+        return dfErrors, dfSBDERs
+
+
+def getScoringResult(oracleRttmFile, diarizedRttmFile, collars, columnar=False, mapping='greedy', uemFile=None,
+                     report=None, timeScale=None):
+    """
+    Single function that takes the input RTTM files and list of collars and gives the mapping and the aggregate times
+    as a ScoringResult, doing everything getAllErrors(...) does except making dataframes, so that it runs without
+    importing pandas.  The inputs are the same as for getAllErrors(...).
+
+    Outputs:
+    - result: ScoringResult with the collars, mapSpkrs, timesOutside and timesInside
+    """
+
+    with _getStage(report, 'getSegs') as sizes:
+        # Speakers are interned into integer IDs as they are parsed and carried through scoring as IDs
+        spkrIds = [{}, {}]
+        if isinstance(oracleRttmFile, PreparedReference):
+            oracleSegs = oracleRttmFile
+            collars = oracleRttmFile.getCollars(collars)
+            timeScale = oracleRttmFile.timeScale
+            spkrIds[0] = None
+        else:
+            oracleSegs = getSegs(oracleRttmFile, True, timeScale=timeScale, spkrIds=spkrIds[0])
+            sizes['oracleSegs'] = len(oracleSegs)
+        diarizedSegs = getSegs(diarizedRttmFile, False, timeScale=timeScale, spkrIds=spkrIds[1])
+        sizes['diarizedSegs'] = len(diarizedSegs)
+        uem = None if uemFile is None else _getPooledUem(uemFile, timeScale)
+
+    mapSpkrs, timesOutside, timesInside = getRecTimes(oracleSegs, diarizedSegs, collars, columnar, mapping, uem,
+                                                      report, timeScale, spkrIds)
+    return ScoringResult([list(collar) for collar in collars], mapSpkrs, timesOutside, timesInside)
+
+
+def getAllErrors(oracleRttmFile, diarizedRttmFile, collars, columnar=False, mapping='greedy', uemFile=None,
+                 report=None, timeScale=None):
+    """
+    Single function that takes the input RTTM files and list of collars and gives the errors dataframe as well as the
+    segment boundary errors dataframe.
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm", or a
+                      PreparedReference from prepareReference(oracleRttmFile, collars)
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/AMI_20050204-1206.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]", which may be None
+               when oracleRttmFile is a PreparedReference to use the collars it was prepared with
+    - columnar: a Boolean option to run the pipeline on SegTables rather than lists of segment dictionaries, which
+                gives the same results with vectorized scoring and memory that grows with the speakers active in
+                each segment rather than with the number of speakers, default "False"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions in it, with the regions of all its
+               recordings taken together as the RTTM files are, default "None" to score everything
+    - report: a ScoringReport to record the time, memory and sizes of each stage in, default "None"
+    - timeScale: None to score in seconds, or a number of ticks per second, e.g. 1000, to score with the times held
+                 as whole ticks from parsing onward so that every sum is exact and the percentages are only worked
+                 out at the end, taken from the PreparedReference if there is one, default "None"
+    Outputs:
+    - dfErrors: a dataframe of the errors, form: "	            MISS	FALARM	ERROR	DER
+                                                    [0, 0]	    20.15	0.91	8.09	29.14
+                                                    [50, 50]	18.40	0.46	7.63	26.48
+                                                    [100, 100]	16.86	0.32	7.16	24.34
+                                                    [150, 150]	15.46	0.28	6.72	22.45
+                                                    [200, 200]	14.16	0.24	6.37	20.78
+                                                    [250, 250]	13.12	0.22	6.05	19.39"
+    - dfSBDERs: a dataframe of the errors, form: "	            MISS	FALARM	ERROR	DER
+                                                    [50, 50]	43.94	7.00	14.24	65.18
+                                                    [100, 100]	42.19	4.88	14.29	61.36
+                                                    [150, 150]	40.76	3.68	14.09	58.54
+                                                    [200, 200]	39.64	3.07	13.66	56.36
+                                                    [250, 250]	38.39	2.69	13.35	54.43"
+    
+    """
+
+    result = getScoringResult(oracleRttmFile, diarizedRttmFile, collars, columnar, mapping, uemFile, report, timeScale)
+    with _getStage(report, 'getErrors', collars=len(result.collars)):
+        dfErrors, dfSBDERs = result.toDataFrames()
+    
+    return result.mapSpkrs, dfErrors, dfSBDERs
+
+
+def getRecTimes(oracleSegs, diarizedSegs, collars, columnar=False, mapping='greedy', uem=None, report=None,
+                timeScale=None, spkrIds=None):
+    """
+    This function runs the whole process for the segments of one recording and returns the mapped speakers and the
+    aggregate times for each collar, rather than percentages, so that recordings can be added together.
+
+    Inputs:
+    - oracleSegs: list of ground truth segments from getSegs(rttmFile, True) or getRecSegs(rttmFile, True), or a
+                  PreparedReference holding the ground truth work already done for these collars
+    - diarizedSegs: list of diarization system segments from getSegs(rttmFile, False) or getRecSegs(rttmFile, False)
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - columnar: a Boolean option to run the pipeline on SegTables rather than lists of segment dictionaries,
+                default "False"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uem: sorted, non-overlapping list of the regions of the recording to score, from getUem(uemFile), with
+           everything outside them dropped before the speakers are mapped, default "None" to score everything
+    - report: a ScoringReport to record the time, memory and sizes of each stage in, default "None"
+    - timeScale: None if the segments and UEM regions are in seconds, or the number of ticks per second if they are
+                 whole ticks from getSegs(rttmFile, oracle, timeScale=timeScale), taken from the PreparedReference if
+                 there is one, default "None"
+    - spkrIds: the pair of dictionaries (oracleSpkrIds, diarizedSpkrIds) the speakers of oracleSegs and diarizedSegs
+               were interned into with getSegs(rttmFile, oracle, spkrIds=...), either of which may be None for
+               segments holding names, default "None" for both to hold names.  The list pipeline carries the
+               speakers through as integer IDs, interning any names once at the start.
+
+    Outputs:
+    - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
+                the mapped speaker, the mapped speaker time in seconds and the percentage of time correctly mapped to
+                that speaker, by name
+    - timesOutside: NumPy array size len(collars) x 4 of the ground truth, missed, false alarm and speaker error
+                    times in seconds outside the collars, or in whole ticks as int64 with a timeScale
+    - timesInside: NumPy array size len(collars) x 4 of the same times within the collars
+    """
+    oracleSpkrIds, diarizedSpkrIds = (None, None) if spkrIds is None else spkrIds
+    if isinstance(oracleSegs, PreparedReference):
+        timeScale = oracleSegs.timeScale
+    with _getStage(report, 'getComboSplitSegs') as sizes:
+        diarizedSegs, diarizedNames = _getPipelineSegs(diarizedSegs, 'dname', diarizedSpkrIds, columnar)
+        if isinstance(oracleSegs, PreparedReference):
+            oracleSplitSegs, oracleNames = _getPipelineSegs(oracleSegs.getOracleSplitSegs(columnar), 'oname', None,
+                                                            columnar)
+            _, comboSplitSegs = getComboSplitSegs(oracleSplitSegs, diarizedSegs)
+        else:
+            oracleSegs, oracleNames = _getPipelineSegs(oracleSegs, 'oname', oracleSpkrIds, columnar)
+            oracleSplitSegs, comboSplitSegs = getComboSplitSegs(oracleSegs, diarizedSegs)
+        spkrNames = None if columnar else (oracleNames, diarizedNames)
+        sizes['oracleSplitSegs'] = len(oracleSplitSegs)
+        sizes['comboSplitSegs'] = len(comboSplitSegs)
+
+    with _getStage(report, 'getNewSegsIgnore', collars=len(collars)) as sizes:
+        if isinstance(oracleSegs, PreparedReference):
+            newSegsIgnore = oracleSegs.getNewSegsIgnore(collars)
+        else:
+            segsIgnore = getSegsIgnore(oracleSplitSegs, _getScaledCollars(collars, timeScale))
+            newSegsIgnore = getNewSegsIgnore(segsIgnore, collars)
+        sizes['segsIgnore'] = sum(len(segsIgnore) for segsIgnore in newSegsIgnore)
+
+    with _getStage(report, 'getMapSpkrs', mapping=mapping) as sizes:
+        comboSplitSegs, mapSpkrs = _getMappedComboSplitSegs(comboSplitSegs, mapping, uem, spkrNames)
+        sizes['oracleSpkrs'] = len(mapSpkrs)
+
+    with _getStage(report, 'getCollarTimes', comboSplitSegs=len(comboSplitSegs), collars=len(collars)):
+        timesOutside, timesInside = getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs)
+
+    if spkrNames is not None:
+        mapSpkrs = {oracleNames[spkr]: [None if dSpkr is None else diarizedNames[dSpkr], topTime, percent]
+                    for spkr, (dSpkr, topTime, percent) in mapSpkrs.items()}
+    return _getUnscaledMapSpkrs(mapSpkrs, timeScale), timesOutside, timesInside
+
+
+def _getPipelineSegs(segs, name_type, spkrIds, columnar):
+    """
+    Returns the segments of one side in the form getRecTimes(...) works on, with the list of names of the speaker IDs.
+    With columnar, that is a SegTable labelled by name.  Otherwise it is a list of segments holding integer speaker
+    IDs, from spkrIds if the segments were interned into it while parsing, or else interned here once so that the
+    rest of the pipeline never has to look names up.
+    """
+    if columnar:
+        table = segs if isinstance(segs, SegTable) else SegTable.fromSegs(segs)
+        if spkrIds is not None:
+            names = list(spkrIds)
+            lst_type = 'lstOracleSpkrs' if name_type == 'oname' else 'lstDiarizedSpkrs'
+            setattr(table, lst_type, [names[spkr] for spkr in getattr(table, lst_type)])
+        return table, None
+    if spkrIds is None:
+        spkrIds = {}
+        otherType = 'dname' if name_type == 'oname' else 'oname'
+        segs = [{'tbeg': seg['tbeg'], 'tend': seg['tend'],
+                 'name': {name_type: [spkrIds.setdefault(spkr, len(spkrIds)) for spkr in seg['name'][name_type]],
+                          otherType: seg['name'][otherType]}} for seg in segs]
+    return segs, list(spkrIds)
+
+
+def _getScaledCollars(collars, timeScale):
+    """
+    Returns the collars in whole ticks of 1/timeScale seconds, or as they are if timeScale is None.
+    """
+    if timeScale is None:
+        return collars
+    return [[_getTicks(collar[0], timeScale), _getTicks(collar[1], timeScale)] for collar in collars]
+
+
+def _getUnscaledMapSpkrs(mapSpkrs, timeScale):
+    """
+    Returns mapSpkrs with the mapped speaker times in seconds if they were worked out in ticks.
+    """
+    if timeScale is None:
+        return mapSpkrs
+    return {spkr: [dSpkr, topTime / timeScale, percent] for spkr, (dSpkr, topTime, percent) in mapSpkrs.items()}
+
+
+def _getMappedComboSplitSegs(comboSplitSegs, mapping, uem, spkrNames=None):
+    """
+    Cuts the combined split segments to the UEM if there is one and maps the speakers, returning the combined split
+    segments and mapSpkrs.  For a list of segments holding integer speaker IDs, spkrNames is the pair of lists of
+    ground truth and diarization system names of the IDs, and mapSpkrs is in IDs.
+    """
+    if uem is not None:
+        # Collars still come from all the ground truth boundaries, only the scored segments are cut to the UEM
+        comboSplitSegs = getRevisedComboSplitSegs(comboSplitSegs, getUemIgnore(uem))
+
+    if spkrNames is None:
+        lstOracleSpkrs = getSpkrs(comboSplitSegs, 'oname')
+        lstDiarizedSpkrs = getSpkrs(comboSplitSegs, 'dname')
+    else:
+        # IDs sorted as getSpkrs(...) sorts the names, with ties in order of first appearance
+        lstOracleSpkrs, lstDiarizedSpkrs = (
+            sorted(sorted({spkr for seg in comboSplitSegs for spkr in seg['name'][name_type]}),
+                   key=lambda spkr: names[spkr][-2:])
+            for name_type, names in zip(('oname', 'dname'), spkrNames))
+    spkrTimes = getSpkrTimesArray(lstOracleSpkrs, lstDiarizedSpkrs, comboSplitSegs)
+    mapSpkrs = getArrayMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs, spkrTimes, mapping)
+
+    return comboSplitSegs, mapSpkrs
+
+
+class PreparedReference:
+    """
+    This class holds the work on the ground truth that does not depend on the diarization system output, namely the
+    ground truth split segments from getSplitSegs(segs) and the merged segments to ignore for each collar from
+    getNewSegsIgnore(segsIgnore, collars), so that one ground truth can be scored against many diarization system
+    outputs without repeating it.  It can be pickled, e.g. to send it to worker processes.
+
+    Attributes:
+    - rttmFile: path to and filename of the ground truth RTTM file, or None if prepared from segments
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - columnar: a Boolean showing whether oracleSplitSegs is a SegTable
+    - oracleSplitSegs: ground truth split segments, as a list of segments or a SegTable
+    - newSegsIgnore: list of the merged segments to ignore for each collar
+    - timeScale: None if the times are in seconds, or the number of ticks per second if they are whole ticks
+    """
+
+    def __init__(self, oracleSegs, collars, columnar=False, rttmFile=None, timeScale=None):
+        if columnar:
+            oracleSegs = SegTable.fromSegs(oracleSegs)
+        self.rttmFile = rttmFile
+        self.collars = [list(collar) for collar in collars]
+        self.columnar = columnar
+        self.timeScale = timeScale
+        self.oracleSplitSegs = getSplitSegs(oracleSegs)
+        self.newSegsIgnore = getNewSegsIgnore(getSegsIgnore(self.oracleSplitSegs,
+                                                            _getScaledCollars(self.collars, timeScale)), self.collars)
+
+    def getCollars(self, collars=None):
+        """
+        Returns the collars prepared for, checking that they match the collars asked for if any.
+        """
+        if collars is not None and [list(collar) for collar in collars] != self.collars:
+            raise ValueError("Collars {} do not match the collars {} the reference was prepared with."
+                             .format(collars, self.collars))
+        return self.collars
+
+    def getNewSegsIgnore(self, collars=None):
+        """
+        Returns the merged segments to ignore for each collar, checking the collars as getCollars(collars) does.
+        """
+        self.getCollars(collars)
+        return self.newSegsIgnore
+
+    def getOracleSplitSegs(self, columnar=False):
+        """
+        Returns the ground truth split segments as a SegTable if columnar, or as a list of segments otherwise.
+        """
+        if columnar == self.columnar:
+            return self.oracleSplitSegs
+        if columnar:
+            return SegTable.fromSegs(self.oracleSplitSegs)
+        return self.oracleSplitSegs.toSegs()
+
+
+_preparedReferenceCache = collections.OrderedDict()
+_preparedReferenceCacheSize = 16
+
+
+def prepareReference(oracleRttmFile, collars, columnar=False, timeScale=None):
+    """
+    This function returns a PreparedReference for a ground truth RTTM file and list of collars, which can be passed
+    to getAllErrors(...) in place of the ground truth RTTM file.  The last few references prepared are kept in a
+    least recently used cache keyed by the file, its modification time and size, the collars, columnar and timeScale, so asking
+    again for the same reference is free while a long-running process never holds more than
+    _preparedReferenceCacheSize of them.
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - columnar: a Boolean option to keep the ground truth split segments as a SegTable, default "False"
+    - timeScale: None to keep the times in seconds, or a number of ticks per second to keep them as whole ticks, as
+                 for getSegs(...), default "None"
+
+    Outputs:
+    - reference: PreparedReference for the ground truth RTTM file and collars
+    """
+    import os
+    stat = os.stat(str(oracleRttmFile))
+    key = (os.path.abspath(str(oracleRttmFile)), stat.st_mtime_ns, stat.st_size,
+           tuple(tuple(collar) for collar in collars), bool(columnar), timeScale)
+    if key in _preparedReferenceCache:
+        _preparedReferenceCache.move_to_end(key)
+        return _preparedReferenceCache[key]
+    reference = PreparedReference(getSegs(oracleRttmFile, True, timeScale=timeScale), collars, columnar,
+                                  oracleRttmFile, timeScale)
+    _preparedReferenceCache[key] = reference
+    while len(_preparedReferenceCache) > _preparedReferenceCacheSize:
+        _preparedReferenceCache.popitem(last=False)
+    return reference
+
+
+def getCollarCurve(oracleRttmFile, diarizedRttmFile, collarSizes=None, mapping='greedy', uemFile=None,
+                   timeScale=None):
+    """
+    Single function that takes the input RTTM files and gives the errors for a fine sweep of collar sizes, as
+    getAllErrors(oracleRttmFile, diarizedRttmFile, collars) would for collars [c, c], for about the cost of scoring a
+    single collar.  See getCollarCurveTimes(...).
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm", or a
+                      PreparedReference from prepareReference(oracleRttmFile, collars)
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/AMI_20050204-1206.rttm"
+    - collarSizes: list of collar sizes in seconds, each used as both the start and the end collar, default "None"
+                   for every 5 ms from 0 to 500 ms
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions in it, as for getAllErrors(...),
+               default "None" to score everything
+    - timeScale: None to score in seconds, or a number of ticks per second to score in whole ticks, as for
+                 getAllErrors(...), default "None"
+
+    Outputs:
+    - mapSpkrs: a dictionary that with the ground truth speakers as the key and their values as a 1 x 3 list showing
+                the mapped speaker, the mapped speaker time and the percentage of time correctly mapped to that speaker
+    - dfErrors: a dataframe of the errors for each collar size, in the same form as from getAllErrors(...)
+    - dfSBDERs: a dataframe of the errors within the collars for each collar size, in the same form as from
+                getAllErrors(...)
+    """
+    if collarSizes is None:
+        collarSizes = [i / 1000 for i in range(0, 501, 5)]
+    collars = [[collarSize, collarSize] for collarSize in collarSizes]
+
+    if isinstance(oracleRttmFile, PreparedReference):
+        timeScale = oracleRttmFile.timeScale
+    diarizedSegs = SegTable.fromSegs(getSegs(diarizedRttmFile, False, timeScale=timeScale))
+    if isinstance(oracleRttmFile, PreparedReference):
+        oracleSplitSegs = oracleRttmFile.getOracleSplitSegs(True)
+        _, comboSplitSegs = getComboSplitSegs(oracleSplitSegs, diarizedSegs)
+    else:
+        oracleSplitSegs, comboSplitSegs = getComboSplitSegs(
+            SegTable.fromSegs(getSegs(oracleRttmFile, True, timeScale=timeScale)), diarizedSegs)
+    uem = None if uemFile is None else _getPooledUem(uemFile, timeScale)
+
+    comboSplitSegs, mapSpkrs = _getMappedComboSplitSegs(comboSplitSegs, mapping, uem)
+    timesOutside, timesInside = getCollarCurveTimes(comboSplitSegs, oracleSplitSegs, mapSpkrs,
+                                                    [collar[0] for collar in _getScaledCollars(collars, timeScale)])
+    mapSpkrs = _getUnscaledMapSpkrs(mapSpkrs, timeScale)
+    dfErrors = _getDfErrors([_getErrorRates(*times) for times in timesOutside.tolist()], collars, "DER (%)")
+    dfSBDERs = _getDfErrors([_getErrorRates(*times) for collar, times in zip(collars, timesInside.tolist())
+                             if collar[0] != 0 and collar[1] != 0], _getSBDERCollars(collars), "SBDER (%)")
+
+    return mapSpkrs, dfErrors, dfSBDERs
+
+
+class OnlineScorer:
+    """
+    This class keeps a running DER while the diarization system segments of a recording arrive in order of start
+    time, e.g. from live diarization, rather than scoring the growing output again with getAllErrors(...) each time.
+    As no later segment can start before the latest start time seen, the watermark, everything before it is final.
+    Each update splits only the time between the last watermark and the new one into combined segments and cuts
+    them to the collars.  The ground truth, MISS and FALARM times do not depend on the mapping, so they are running
+    totals, while the time of segments with speakers on both sides is kept for each combination of speakers, along
+    with the speaker overlap times, so that ERROR can be looked up from the mapping.  Neither updates nor remapping
+    go back over the segments already scored.
+
+    The speaker mapping is worked out again from all the overlap times so far with getMapSpkrs(...) whenever
+    remapInterval seconds more have been scored, or can be frozen.  After finish(), with the mapping worked out again
+    at the end, the errors are the same as from getAllErrors(...) up to floating point rounding.
+
+    Created with OnlineScorer(oracleRttmFile, collars, mapping='greedy', remapInterval=60, mapSpkrs=None), where
+    oracleRttmFile is a ground truth RTTM file or a PreparedReference, collars may be None for the collars of a
+    PreparedReference and mapSpkrs is a fixed mapping to use throughout.
+
+    Attributes:
+    - reference: the PreparedReference for the ground truth and collars
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...)
+    - remapInterval: seconds of scored time between working out the mapping again, with 0 for every update
+    - frozen: a Boolean showing whether the mapping is kept as it is
+    - mapSpkrs: the current speaker mapping, in the same form as from getMapSpkrs(...)
+    - watermark: time in seconds up to which everything has been scored, read only
+    """
+
+    def __init__(self, oracleRttmFile, collars, mapping='greedy', remapInterval=60, mapSpkrs=None):
+        import numpy as np
+        if isinstance(oracleRttmFile, PreparedReference):
+            self.reference = oracleRttmFile
+        else:
+            self.reference = prepareReference(oracleRttmFile, collars, True)
+        self.collars = self.reference.getCollars(collars)
+        self.mapping = mapping
+        self.remapInterval = remapInterval
+        self.frozen = mapSpkrs is not None
+        self.mapSpkrs = mapSpkrs if self.frozen else {}
+        self._watermark = float('-inf')
+        self._oracleSplitSegs = self.reference.getOracleSplitSegs(True)
+        self._timeScale = self.reference.timeScale
+        dtype = np.float64 if self._timeScale is None else np.int64
+        # Converted once, as every update looks up the segments to ignore
+        self._newSegsIgnore = [_getIgnoreArray(segsIgnore, dtype) for segsIgnore in self.reference.getNewSegsIgnore()]
+        self._pendingSegs = []
+        self._timesOutside = np.zeros((len(self.collars), 4), dtype=dtype)
+        self._timesInside = np.zeros((len(self.collars), 4), dtype=dtype)
+        self._patterns = []
+        self._patternIndex = {}
+        self._patternOutside = []
+        self._patternInside = []
+        self._spkrTimes = {}
+        self._oracleSpkrs = {}
+        self._diarizedSpkrs = {}
+        self._unmappedTime = 0
+
+    def addSegs(self, diarizedSegs):
+        """
+        Adds diarization system segments, in the same form as from getSegs(rttmFile, False), scores everything up to
+        the latest start time and works the mapping out again if it is due.  Raises ValueError if a segment starts
+        before a segment already added.
+        """
+        for seg in diarizedSegs:
+            tbeg = seg['tbeg'] if self._timeScale is None else _getTicks(seg['tbeg'], self._timeScale)
+            tend = seg['tend'] if self._timeScale is None else _getTicks(seg['tend'], self._timeScale)
+            if self._pendingSegs:
+                latest = self._pendingSegs[-1]['tbeg']
+                latestSeconds = latest if self._timeScale is None else latest / self._timeScale
+            else:
+                latest, latestSeconds = self._watermark, self.watermark
+            if tbeg < latest:
+                raise ValueError("Segments must be added in order of start time, but {} starts before {}."
+                                 .format(seg['tbeg'], latestSeconds))
+            self._pendingSegs.append({'tbeg': tbeg, 'tend': tend, 'name': seg['name']})
+        if self._pendingSegs:
+            self._scoreUntil(self._pendingSegs[-1]['tbeg'])
+
+    def finish(self):
+        """
+        Scores everything left, including ground truth time after the last diarization system segment, and works out
+        the mapping again unless it is frozen.
+        """
+        self._scoreUntil(float('inf'))
+        if not self.frozen:
+            self.remap()
+
+    def freeze(self):
+        """
+        Keeps the current speaker mapping from now on.
+        """
+        self.frozen = True
+
+    def remap(self):
+        """
+        Works out the speaker mapping again from the speaker overlap times of everything scored so far.
+        """
+        import numpy as np
+        lstOracleSpkrs = sorted(self._oracleSpkrs, key=lambda x:x[-2:])
+        lstDiarizedSpkrs = sorted(self._diarizedSpkrs, key=lambda x:x[-2:])
+        spkrTimes = np.zeros((len(lstOracleSpkrs), len(lstDiarizedSpkrs)))
+        oIndex = {spkr: i for i, spkr in enumerate(lstOracleSpkrs)}
+        dIndex = {spkr: i for i, spkr in enumerate(lstDiarizedSpkrs)}
+        for (oSpkr, dSpkr), time in self._spkrTimes.items():
+            spkrTimes[oIndex[oSpkr], dIndex[dSpkr]] = time
+        self.mapSpkrs = _getUnscaledMapSpkrs(getArrayMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs, spkrTimes,
+                                                              self.mapping), self._timeScale)
+        self._unmappedTime = 0
+
+    def getTimes(self):
+        """
+        Returns the ground truth, missed, false alarm and speaker error times so far outside and within the collars
+        with the current mapping, as from getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs), in a time
+        proportional to the number of speaker combinations seen rather than to the length of the recording.
+        """
+        import numpy as np
+        timesOutside = self._timesOutside.copy()
+        timesInside = self._timesInside.copy()
+        if self._patterns:
+            # A combination is a speaker error unless a ground truth speaker's mapped speaker is in it
+            errors = np.array([not any(spkr in self.mapSpkrs and self.mapSpkrs[spkr][0] in dnames for spkr in onames)
+                               for onames, dnames in self._patterns], dtype=timesOutside.dtype)
+            timesOutside[:, 3] = errors @ np.array(self._patternOutside)
+            timesInside[:, 3] = errors @ np.array(self._patternInside)
+        return timesOutside, timesInside
+
+    def getErrors(self):
+        """
+        Returns mapSpkrs, dfErrors and dfSBDERs for everything scored so far, in the same form as from
+        getAllErrors(...), with NaN for a collar without any ground truth time yet.
+        """
+        if not self.frozen and not self.mapSpkrs:
+            self.remap()
+        timesOutside, timesInside = self.getTimes()
+        matErrors = [_getErrorRates(*times) if times[0] else [float('nan')] * 4 for times in timesOutside.tolist()]
+        matSBDERs = [_getErrorRates(*times) if times[0] else [float('nan')] * 4
+                     for collar, times in zip(self.collars, timesInside.tolist()) if collar[0] != 0 and collar[1] != 0]
+        return (self.mapSpkrs, _getDfErrors(matErrors, self.collars, "DER (%)"),
+                _getDfErrors(matSBDERs, _getSBDERCollars(self.collars), "SBDER (%)"))
+
+    @property
+    def watermark(self):
+        """
+        Time in seconds up to which everything has been scored.
+        """
+        if self._timeScale is None or abs(self._watermark) == float('inf'):
+            return self._watermark
+        return self._watermark / self._timeScale
+
+    def _scoreUntil(self, watermark):
+        """
+        Splits and scores the time from the last watermark to the new one.
+        """
+        import numpy as np
+        lo = self._watermark
+        hi = watermark
+        if hi <= lo:
+            return
+
+        # Ground truth split segments and diarization system segments cut to the new stretch of time
+        oracle = self._oracleSplitSegs
+        oracle = oracle.take(np.arange(np.searchsorted(oracle.tend, lo, 'right'), np.searchsorted(oracle.tbeg, hi, 'left')))
+        if lo != float('-inf'):
+            oracle.tbeg = np.maximum(oracle.tbeg, lo)
+        if hi != float('inf'):
+            oracle.tend = np.minimum(oracle.tend, hi)
+        diarizedSegs = [{'tbeg': max(seg['tbeg'], lo), 'tend': min(seg['tend'], hi), 'name': seg['name']}
+                        for seg in self._pendingSegs if seg['tend'] > lo and seg['tbeg'] < hi]
+        self._pendingSegs = [seg for seg in self._pendingSegs if seg['tend'] > hi]
+        self._watermark = hi
+
+        _, table = getComboSplitSegs(oracle, SegTable.fromSegs(diarizedSegs))
+        table = table.take(table.tend > table.tbeg)
+        if len(table) == 0:
+            return
+
+        # Durations of each segment outside and within the collars
+        durationsOutside = np.zeros((len(table), len(self.collars)), dtype=self._timesOutside.dtype)
+        durationsInside = np.zeros((len(table), len(self.collars)), dtype=self._timesOutside.dtype)
+        for index, segsIgnore in enumerate(self._newSegsIgnore):
+            for durations, (rows, pieceBeg, pieceEnd) in zip((durationsOutside, durationsInside),
+                                                             _getCollarPieces(table.tbeg, table.tend, segsIgnore)):
+                np.add.at(durations[:, index], rows, pieceEnd - pieceBeg)
+
+        # Ground truth, MISS and FALARM times do not depend on the mapping, so they are simply added up
+        weights = _getSegWeights(table, {})
+        weights = np.stack([weights[:, 0], weights[:, 1] + weights[:, 2], weights[:, 3]], axis=1)
+        self._timesOutside[:, :3] += durationsOutside.T @ weights
+        self._timesInside[:, :3] += durationsInside.T @ weights
+
+        # Segments with speakers on both sides are kept by speaker combination for ERROR and the mapping
+        rounded = np.round(table.tend - table.tbeg, 3).tolist()
+        both = np.nonzero((table.oname.getRowTotals() > 0) & (table.dname.getRowTotals() > 0))[0]
+        bothTable = table.take(both)
+        for row, onames, dnames in zip(both.tolist(), bothTable.oname.getNames(table.lstOracleSpkrs),
+                                       bothTable.dname.getNames(table.lstDiarizedSpkrs)):
+            key = (frozenset(onames), frozenset(dnames))
+            if key not in self._patternIndex:
+                self._patternIndex[key] = len(self._patterns)
+                self._patterns.append(key)
+                self._patternOutside.append(np.zeros(len(self.collars), dtype=self._timesOutside.dtype))
+                self._patternInside.append(np.zeros(len(self.collars), dtype=self._timesOutside.dtype))
+            index = self._patternIndex[key]
+            self._patternOutside[index] += durationsOutside[row]
+            self._patternInside[index] += durationsInside[row]
+            for oSpkr in onames:
+                for dSpkr in dnames:
+                    self._spkrTimes[oSpkr, dSpkr] = self._spkrTimes.get((oSpkr, dSpkr), 0) + rounded[row]
+        self._oracleSpkrs.update(dict.fromkeys(getSpkrs(table, 'oname')))
+        self._diarizedSpkrs.update(dict.fromkeys(getSpkrs(table, 'dname')))
+
+        self._unmappedTime += (table.tend - table.tbeg).sum().item()
+        scale = 1 if self._timeScale is None else self._timeScale
+        if not self.frozen and self._unmappedTime >= self.remapInterval * scale:
+            self.remap()
+
+
+def _getStretches(tbeg, tend):
+    """
+    Returns the segments merged into sorted, non-overlapping stretches, as their start times, end times and the time
+    covered before each of them, for _getCoverage(...).
+    """
+    import numpy as np
+    order = np.argsort(tbeg, kind='stable')
+    tbeg = tbeg[order]
+    tend = np.maximum.accumulate(tend[order])
+    # A new stretch starts wherever a segment starts after every segment before it has ended
+    starts = np.concatenate([[True], tbeg[1:] > tend[:-1]]) if len(tbeg) else np.zeros(0, dtype=bool)
+    first = np.nonzero(starts)[0]
+    stretchBeg = tbeg[first]
+    stretchEnd = tend[np.concatenate([first[1:] - 1, [len(tbeg) - 1]]).astype(int)] if len(first) else tend[:0]
+    covered = np.concatenate([np.zeros(1, dtype=tend.dtype), np.cumsum(stretchEnd - stretchBeg)])
+    return stretchBeg, stretchEnd, covered
+
+
+def _getCoverage(stretches, points):
+    """
+    Returns the time covered by at least one of the segments up to each of the points, from the stretches of the
+    segments from _getStretches(...).
+    """
+    import numpy as np
+    stretchBeg, stretchEnd, covered = stretches
+    if len(stretchBeg) == 0:
+        return np.zeros(len(points), dtype=covered.dtype)
+    index = np.searchsorted(stretchBeg, points, 'right') - 1
+    last = np.maximum(index, 0)
+    partial = np.clip(points - stretchBeg[last], 0, stretchEnd[last] - stretchBeg[last])
+    return np.where(index >= 0, covered[last] + partial, 0)
+
+
+def getSystemTimes(reference, lstDiarizedSegs, mapping='greedy', uem=None):
+    """
+    This function scores many diarization system outputs against one ground truth in a single pass over the ground
+    truth timeline.  The ground truth split segments, cut at every boundary of the segments to ignore for a collar
+    and of the UEM, give a list of cells in which the ground truth speakers, the collar and the UEM do not change,
+    and these are worked out once for all the systems.  Within a cell only how much of it each system covers
+    matters: the time covered by any of its speakers gives MISS and FALARM, and the time covered by the speakers mapped
+    to the cell's ground truth speakers gives ERROR.  These are read off running totals of each system's segments at
+    the cell boundaries, so a system is never cut to the collars.  The speakers are mapped from the combined split
+    segments of each system, exactly as getRecTimes(...) maps them, as the overlap times are made of durations rounded
+    to 3 decimal places and ties between them have to break the same way.  The mapping is then the same as from
+    getRecTimes(...) for each system, and the times are the same up to floating point rounding, or exactly with whole
+    ticks.
+
+    Inputs:
+    - reference: PreparedReference from prepareReference(oracleRttmFile, collars, columnar=True)
+    - lstDiarizedSegs: list of the diarization system segments of each system, each from getSegs(rttmFile, False)
+                       in the units of the reference
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uem: sorted, non-overlapping list of the regions to score, from getUem(uemFile), default "None" to score
+           everything
+
+    Outputs:
+    - lstMapSpkrs: list of the mapSpkrs of each system, in the same form as from getMapSpkrs(...)
+    - timesOutside: NumPy array size len(lstDiarizedSegs) x len(collars) x 4 of the ground truth, missed, false alarm
+                    and speaker error times outside the collars, in seconds, or in whole ticks as int64 with a
+                    timeScale
+    - timesInside: NumPy array size len(lstDiarizedSegs) x len(collars) x 4 of the same times within the collars
+    """
+    import numpy as np
+    collars = reference.getCollars()
+    oracle = reference.getOracleSplitSegs(True)
+    dtype = np.float64 if reference.timeScale is None else np.int64
+    tables = [SegTable.fromSegs(segs) for segs in lstDiarizedSegs]
+
+    # Cells run from the earliest to the latest time of any segment, so all the FALARM time is inside them
+    allTimes = np.concatenate([oracle.tbeg, oracle.tend] + [table.tbeg for table in tables] +
+                              [table.tend for table in tables]).astype(dtype)
+    lo, hi = (allTimes.min(), allTimes.max()) if len(allTimes) else (0, 0)
+    bounds = np.concatenate([oracle.tbeg, oracle.tend, [lo, hi]]).astype(dtype)
+    uemIgnore = None if uem is None else _getIgnoreArray(getUemIgnore(uem), dtype)
+    oCounts = oracle.oname.getRowTotals()
+    patterns, patternIndex = oracle.oname.getPatterns()
+
+    def getCells(segsIgnore):
+        ignores = [ignore for ignore in (segsIgnore, uemIgnore) if ignore is not None]
+        points = np.unique(np.concatenate([bounds] + [np.clip(ignore, lo, hi).ravel() for ignore in ignores]))
+        tbeg = points[:-1]
+        rows = np.searchsorted(oracle.tend, tbeg, 'right')
+        inOracle = rows < len(oracle)
+        inOracle[inOracle] = oracle.tbeg[rows[inOracle]] <= tbeg[inOracle]
+        rows = np.where(inOracle, rows, -1)
+        inside = []
+        for ignore in (segsIgnore, uemIgnore):
+            if ignore is None or len(ignore) == 0:
+                inside.append(np.zeros(len(tbeg), dtype=bool))
+                continue
+            index = np.searchsorted(ignore[:, 0], tbeg, 'right') - 1
+            inside.append((index >= 0) & (tbeg < ignore[np.maximum(index, 0), 1]))
+        # Cells grouped by the ground truth speakers present in them, for the time covered by the mapped speakers
+        cellPatterns = np.where(rows >= 0, patternIndex[np.maximum(rows, 0)], -1)
+        order = np.argsort(cellPatterns, kind='stable')
+        splits = np.searchsorted(cellPatterns[order], np.arange(len(patterns) + 1))
+        groups = [order[splits[pattern]:splits[pattern + 1]] for pattern in range(len(patterns))]
+        return points, rows, inside[0], ~inside[1], groups
+
+    collarCells = [getCells(segsIgnore) for segsIgnore in
+                   (_getIgnoreArray(segsIgnore, dtype) for segsIgnore in reference.getNewSegsIgnore())]
+
+    lstMapSpkrs = []
+    timesOutside = np.zeros((len(tables), len(collars), 4), dtype=dtype)
+    timesInside = np.zeros((len(tables), len(collars), 4), dtype=dtype)
+    for system, table in enumerate(tables):
+        # The speakers are mapped from the combined split segments as getRecTimes(...) maps them, so that every
+        # duration is rounded the same way and ties between overlap times break the same way
+        _, comboSplitSegs = getComboSplitSegs(oracle, table)
+        _, mapSpkrs = _getMappedComboSplitSegs(comboSplitSegs, mapping, uem)
+        dIndex = {spkr: i for i, spkr in enumerate(table.lstDiarizedSpkrs)}
+        lstMapSpkrs.append(_getUnscaledMapSpkrs(mapSpkrs, reference.timeScale))
+
+        # Diarized speakers mapped to the ground truth speakers present in each group of cells
+        patternCols = []
+        for present in patterns:
+            patternCols.append(tuple(sorted({dIndex[mapSpkrs[spkr][0]] for spkr in
+                                             (oracle.lstOracleSpkrs[col] for col in present) if spkr in mapSpkrs
+                                             and mapSpkrs[spkr][0] in dIndex})))
+        allStretches = _getStretches(table.tbeg, table.tend)
+        colStretches = {}
+        for index, (points, rows, inCollar, inUem, groups) in enumerate(collarCells):
+            lengths = np.diff(points)
+            covered = np.diff(_getCoverage(allStretches, points))
+            # Time covered by the speakers mapped to the ground truth speakers of each cell
+            hits = np.zeros(len(lengths), dtype=dtype)
+            colCells = {}
+            for cols, cells in zip(patternCols, groups):
+                if cols and len(cells):
+                    colCells.setdefault(cols, []).append(cells)
+            for cols, cells in colCells.items():
+                cells = np.concatenate(cells)
+                if cols not in colStretches:
+                    segRows = np.unique(table.dname.rows[np.isin(table.dname.spkrs, cols)])
+                    colStretches[cols] = _getStretches(table.tbeg[segRows], table.tend[segRows])
+                hits[cells] = np.diff(_getCoverage(colStretches[cols], np.stack([points[cells], points[cells + 1]],
+                                                                                 axis=1)), axis=1)[:, 0]
+            cellCounts = np.where(rows >= 0, oCounts[np.maximum(rows, 0)], 0)
+            for times, cells in ((timesOutside[system, index], inUem & ~inCollar),
+                                 (timesInside[system, index], inUem & inCollar)):
+                spoken = cells & (cellCounts > 0)
+                times[0] = (cellCounts[cells] * lengths[cells]).sum()
+                times[1] = ((lengths - covered)[spoken].sum() +
+                            (np.maximum(cellCounts - 1, 0)[spoken] * lengths[spoken]).sum())
+                times[2] = covered[cells & (cellCounts == 0)].sum()
+                times[3] = (covered - hits)[spoken].sum()
+
+    return lstMapSpkrs, timesOutside, timesInside
+
+
+def getSystemErrors(oracleRttmFile, diarizedRttmFiles, collars, mapping='greedy', uemFile=None, timeScale=None):
+    """
+    Single function that scores many diarization system outputs against one ground truth RTTM file, e.g. for a
+    leaderboard, doing the ground truth work only once, see getSystemTimes(...).  As with getAllErrors(...), all the
+    lines of each RTTM file are taken as one recording.
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm", or a
+                      PreparedReference from prepareReference(oracleRttmFile, collars, columnar=True)
+    - diarizedRttmFiles: list of paths to and filenames of speaker diarization generated RTTM files, named in the
+                         output by the paths as given, or a dictionary of them keyed by system name,
+                         form: "{'DiarTk': 'results/AMI_20050204-1206.rttm', ...}"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]", which may be None
+               when oracleRttmFile is a PreparedReference to use the collars it was prepared with
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions in it, as for getAllErrors(...),
+               default "None" to score everything
+    - timeScale: None to score in seconds, or a number of ticks per second to score in whole ticks, as for
+                 getAllErrors(...), taken from the PreparedReference if there is one, default "None"
+
+    Outputs:
+    - allMapSpkrs: dictionary with the system names as the keys and the mapSpkrs of each system as the values
+    - dfSystemErrors: a dataframe of the errors indexed by system and collar, with the SBDER within the collars as a
+                      last column, NaN without a collar, form: "
+                                                  MISS (%)  FALARM (%)  ERROR (%)  DER (%)  SBDER (%)
+                      System  Collars [-ms, +ms]
+                      DiarTk  [0, 0]                  8.74        0.35      10.94    20.03        NaN
+                              [250, 250]              2.09        0.00       6.70     8.79      40.62"
+    """
+    import pandas as pd
+    if isinstance(oracleRttmFile, PreparedReference):
+        reference = oracleRttmFile
+        timeScale = reference.timeScale
+    else:
+        reference = prepareReference(oracleRttmFile, collars, True, timeScale)
+    collars = reference.getCollars(collars)
+    if not isinstance(diarizedRttmFiles, dict):
+        diarizedRttmFiles = {str(diarizedRttmFile): diarizedRttmFile for diarizedRttmFile in diarizedRttmFiles}
+    uem = None if uemFile is None else _getPooledUem(uemFile, timeScale)
+
+    lstDiarizedSegs = [getSegs(diarizedRttmFile, False, timeScale=timeScale)
+                       for diarizedRttmFile in diarizedRttmFiles.values()]
+    lstMapSpkrs, timesOutside, timesInside = getSystemTimes(reference, lstDiarizedSegs, mapping, uem)
+
+    rows = []
+    for system, systemOutside, systemInside in zip(diarizedRttmFiles, timesOutside.tolist(), timesInside.tolist()):
+        for collar, times, collarTimes in zip(collars, systemOutside, systemInside):
+            rates = [float('nan')] * 4 if times[0] == 0 else _getErrorRates(*times)
+            sbder = float('nan')
+            if collar[0] != 0 and collar[1] != 0 and collarTimes[0] != 0:
+                sbder = _getErrorRates(*collarTimes)[3]
+            rows.append([system, "[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000)] + rates + [sbder])
+    dfSystemErrors = pd.DataFrame(rows, columns=["System", "Collars [-ms, +ms]", "MISS (%)", "FALARM (%)",
+                                                 "ERROR (%)", "DER (%)", "SBDER (%)"])
+    return dict(zip(diarizedRttmFiles, lstMapSpkrs)), dfSystemErrors.set_index(["System", "Collars [-ms, +ms]"])
+
+
+def _getFrames(times, frameStep):
+    """
+    Returns the index of the frame of frameStep seconds that each time falls at, with a frame counted as in a segment
+    if its centre is.
+    """
+    import numpy as np
+    return np.floor(np.round(np.asarray(times, dtype=np.float64)/frameStep, 6) + 0.5).astype(np.int64)
+
+
+def _getFrameStretches(first, last, rows, start, end):
+    """
+    Merges the segments of each row, going from frame first up to frame last and clipped to frames start to end, into
+    sorted, non-overlapping stretches, once for the whole recording.  The stretches of the rows are laid end to end
+    as keys of row*(end - start + 1) plus the frame from start, so that _getFrameBits(...) can find those of each
+    chunk with a binary search.
+    """
+    import numpy as np
+    span = end - start + 1
+    first = np.clip(first, start, end) - start
+    last = np.clip(last, start, end) - start
+    active = last > first
+    offsets = rows[active].astype(np.int64)*span
+    keyBeg, keyEnd, _ = _getStretches(offsets + first[active], offsets + last[active])
+    return keyBeg, keyEnd, span
+
+
+def _getFrameBits(stretches, nRows, start, chunkStart, nFrames):
+    """
+    Returns the frames chunkStart to chunkStart + nFrames of each row as packed bits, set where any of the stretches
+    from _getFrameStretches(first, last, rows, start, end) is active.  Only the stretches that reach into the chunk
+    are looked at, and the bits are set on the packed bytes directly, the whole bytes of the stretches as alternating
+    runs of 0 and 255 and the partial bytes at either end with masks.
+    """
+    import numpy as np
+    keyBeg, keyEnd, span = stretches
+    nBytes = (nFrames + 7) // 8
+    rowKeys = np.arange(nRows, dtype=np.int64)*span + (chunkStart - start)
+    owner, index = _getRaggedIndex(np.searchsorted(keyEnd, rowKeys, 'right'),
+                                   np.searchsorted(keyBeg, rowKeys + nFrames, 'left'))
+    rowBytes = owner*nBytes
+    frameBeg = np.maximum(keyBeg[index] - rowKeys[owner], 0)
+    frameEnd = np.minimum(keyEnd[index] - rowKeys[owner], nFrames)
+
+    # The stretches are sorted and apart, so their whole bytes are sorted runs that at most touch
+    fullBeg = rowBytes + np.minimum((frameBeg + 7) // 8, frameEnd // 8)
+    fullEnd = rowBytes + frameEnd // 8
+    points = np.concatenate([[0], np.stack([fullBeg, fullEnd], axis=1).ravel(), [nRows*nBytes]])
+    values = np.zeros(len(points) - 1, dtype=np.uint8)
+    values[1::2] = 255
+    bits = np.repeat(values, np.diff(points))
+
+    # Frames are bits from the most significant down, as with np.packbits
+    headMask = (0xFF >> (frameBeg % 8)).astype(np.uint8)
+    tailMask = ((0xFF00 >> (frameEnd % 8)) & 0xFF).astype(np.uint8)
+    oneByte = frameBeg // 8 == frameEnd // 8
+    head = ~oneByte & (frameBeg % 8 != 0)
+    tail = ~oneByte & (frameEnd % 8 != 0)
+    np.bitwise_or.at(bits, np.concatenate([rowBytes[oneByte] + frameBeg[oneByte] // 8,
+                                           rowBytes[head] + frameBeg[head] // 8, fullEnd[tail]]),
+                     np.concatenate([headMask[oneByte] & tailMask[oneByte], headMask[head], tailMask[tail]]))
+    return bits.reshape(nRows, nBytes)
+
+
+def _getBitCount(bits):
+    """
+    Returns the number of set bits along the last axis of packed bits.
+    """
+    import numpy as np
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    return np.unpackbits(bits, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def getFrameTimes(oracleArrays, diarizedArrays, collars, frameStep=0.01, mapping='greedy', uem=None,
+                  chunkFrames=2**16):
+    """
+    This function is a frame-based alternative to getRecTimes(...) for very dense diarization system outputs, e.g.
+    frame-wise neural diarization with many tiny segments, where the combined split segments get very large.  Each
+    speaker, the scored regions and the collars are put on a grid of frames of frameStep seconds as packed bits, one
+    bit per frame, and the overlap times, MISS, FALARM and ERROR are counted with bitwise operations on whole rows.
+    The recording is done chunkFrames frames at a time, once for the overlap times for getMapSpkrs(...) and again for
+    the errors, so memory does not grow with the length of the recording.  The segments of the speakers, the scored
+    regions and each collar are merged once, each chunk finds its own with a binary search, and the bits are set on
+    the packed bytes without unpacking them, so the time does not grow with the number of chunks times the number of
+    segments.
+
+    A frame counts as in a segment if its centre is, so each segment boundary moves by up to half a frame and the
+    times are an approximation, see getFrameDiscrepancy(...) for how far they are from getRecTimes(...).  Speakers
+    are counted once per frame however many of their segments overlap it.  The collars are taken around every start
+    and end time of the ground truth segments, as getSegsIgnore(...) does around the ground truth split segments.
+
+    Inputs:
+    - oracleArrays: ground truth segments as from getRttmArrays(oracleRttmFile, cache)
+    - diarizedArrays: diarization system segments as from getRttmArrays(diarizedRttmFile, cache)
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - frameStep: frame length in seconds, default "0.01"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uem: sorted, non-overlapping list of the regions to score, from getUem(uemFile), default "None" to score
+           everything
+    - chunkFrames: number of frames to work on at a time, rounded down to a multiple of 8, default "65536"
+
+    Outputs:
+    - mapSpkrs: dictionary with the ground truth speakers as the keys and the mapped diarization system speaker, the
+                overlap time and its percentage as the values, as from getMapSpkrs(...)
+    - timesOutside: NumPy array size len(collars) x 4 of the ground truth, missed, false alarm and speaker error
+                    times outside the collars, in seconds
+    - timesInside: NumPy array size len(collars) x 4 of the same times within the collars
+    """
+    import numpy as np
+    chunkFrames = max(8, chunkFrames // 8 * 8)
+    oFirst, oLast = _getFrames(oracleArrays['tbeg'], frameStep), _getFrames(oracleArrays['tend'], frameStep)
+    dFirst, dLast = _getFrames(diarizedArrays['tbeg'], frameStep), _getFrames(diarizedArrays['tend'], frameStep)
+    oRows = oracleArrays['spkr'].astype(np.int64)
+    dRows = diarizedArrays['spkr'].astype(np.int64)
+    nOracle, nDiarized = len(oracleArrays['spkrs']), len(diarizedArrays['spkrs'])
+
+    allFrames = np.concatenate([oFirst, oLast, dFirst, dLast])
+    start, end = (int(allFrames.min()), int(allFrames.max())) if len(allFrames) else (0, 0)
+    if uem is None:
+        uFirst, uLast = np.array([start]), np.array([end])
+    else:
+        uFirst, uLast = _getFrames([region[0] for region in uem], frameStep), _getFrames([region[1] for region in uem],
+                                                                                          frameStep)
+    bounds = np.unique(np.concatenate([oracleArrays['tbeg'], oracleArrays['tend']]))
+    # Every set of segments is merged into stretches once, and each chunk only looks up its own stretches
+    oneRow = np.zeros(len(bounds), dtype=np.int64)
+    collarStretches = [_getFrameStretches(_getFrames(bounds - collar[0], frameStep),
+                                          _getFrames(bounds + collar[1], frameStep), oneRow, start, end)
+                       for collar in collars]
+    scoredStretches = _getFrameStretches(uFirst, uLast, np.zeros(len(uFirst), dtype=np.int64), start, end)
+    oStretches = _getFrameStretches(oFirst, oLast, oRows, start, end)
+    dStretches = _getFrameStretches(dFirst, dLast, dRows, start, end)
+
+    def iterChunks():
+        for chunkStart in range(start, end, chunkFrames):
+            nFrames = min(chunkFrames, end - chunkStart)
+            scoredBits = _getFrameBits(scoredStretches, 1, start, chunkStart, nFrames)
+            oBits = _getFrameBits(oStretches, nOracle, start, chunkStart, nFrames) & scoredBits
+            dBits = _getFrameBits(dStretches, nDiarized, start, chunkStart, nFrames) & scoredBits
+            yield chunkStart, nFrames, scoredBits[0], oBits, dBits
+
+    # First pass for the overlap frames of each pair of speakers, one ground truth speaker at a time so that there is
+    # no nOracle x nDiarized x chunk temporary
+    spkrFrames = np.zeros((nOracle, nDiarized), dtype=np.int64)
+    oFrames = np.zeros(nOracle, dtype=np.int64)
+    dFrames = np.zeros(nDiarized, dtype=np.int64)
+    for _, _, _, oBits, dBits in iterChunks():
+        for o in range(nOracle):
+            spkrFrames[o] += _getBitCount(oBits[o] & dBits)
+        oFrames += _getBitCount(oBits)
+        dFrames += _getBitCount(dBits)
+    lstOracleSpkrs = sorted([spkr for spkr, n in zip(oracleArrays['spkrs'].tolist(), oFrames.tolist()) if n > 0],
+                            key=lambda x:x[-2:])
+    lstDiarizedSpkrs = sorted([spkr for spkr, n in zip(diarizedArrays['spkrs'].tolist(), dFrames.tolist()) if n > 0],
+                              key=lambda x:x[-2:])
+    oIndex = {spkr: i for i, spkr in enumerate(oracleArrays['spkrs'].tolist())}
+    dIndex = {spkr: i for i, spkr in enumerate(diarizedArrays['spkrs'].tolist())}
+    spkrTimes = np.round(spkrFrames*frameStep, 3)
+    mapSpkrs = getArrayMapSpkrs(lstOracleSpkrs, lstDiarizedSpkrs,
+                                spkrTimes[[oIndex[spkr] for spkr in lstOracleSpkrs]][:, [dIndex[spkr] for spkr in
+                                                                                        lstDiarizedSpkrs]], mapping)
+    mapped = [(oIndex[spkr], dIndex[value[0]]) for spkr, value in mapSpkrs.items() if value[0] in dIndex]
+
+    # Second pass for the errors, with the same masks for every collar
+    framesOutside = np.zeros((len(collars), 4), dtype=np.int64)
+    framesInside = np.zeros((len(collars), 4), dtype=np.int64)
+    for chunkStart, nFrames, scoredBits, oBits, dBits in iterChunks():
+        oAny = np.bitwise_or.reduce(oBits, axis=0)
+        dAny = np.bitwise_or.reduce(dBits, axis=0)
+        hit = np.zeros_like(scoredBits)
+        for o, d in mapped:
+            hit |= oBits[o] & dBits[d]
+        for index, stretches in enumerate(collarStretches):
+            collarBits = _getFrameBits(stretches, 1, start, chunkStart, nFrames)[0]
+            for frames, mask in ((framesOutside[index], scoredBits & ~collarBits),
+                                 (framesInside[index], scoredBits & collarBits)):
+                total = _getBitCount(oBits & mask).sum()
+                frames += [total, _getBitCount(oAny & ~dAny & mask) + total - _getBitCount(oAny & mask),
+                           _getBitCount(dAny & ~oAny & mask), _getBitCount(oAny & dAny & ~hit & mask)]
+
+    return mapSpkrs, framesOutside*frameStep, framesInside*frameStep
+
+
+def getFrameErrors(oracleRttmFile, diarizedRttmFile, collars, frameStep=0.01, mapping='greedy', uemFile=None,
+                   chunkFrames=2**16):
+    """
+    Single function that takes the input RTTM files and list of collars and gives the errors dataframe as well as the
+    segment boundary errors dataframe, as getAllErrors(...) does, but scored on frames with getFrameTimes(...).
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm"
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/AMI_20050204-1206.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - frameStep: frame length in seconds, default "0.01"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions in it, as for getAllErrors(...),
+               default "None" to score everything
+    - chunkFrames: number of frames to work on at a time, default "65536"
+
+    Outputs:
+    - mapSpkrs: dictionary of the speaker mapping, as from getMapSpkrs(...)
+    - dfErrors: a dataframe of the errors, in the same form as from getAllErrors(...)
+    - dfSBDERs: a dataframe of the segment boundary errors, in the same form as from getAllErrors(...)
+    """
+    uem = None if uemFile is None else _getPooledUem(uemFile)
+    mapSpkrs, timesOutside, timesInside = getFrameTimes(getRttmArrays(oracleRttmFile, None),
+                                                        getRttmArrays(diarizedRttmFile, None), collars, frameStep,
+                                                        mapping, uem, chunkFrames)
+    matErrors, dfErrors, matSBDERs, dfSBDERs = _getErrorsFromTimes(timesOutside, timesInside, collars)
+    return mapSpkrs, dfErrors, dfSBDERs
+
+
+def getFrameDiscrepancy(oracleRttmFile, diarizedRttmFile, collars, frameStep=0.01, mapping='greedy', uemFile=None,
+                        chunkFrames=2**16):
+    """
+    This function scores the same RTTM files with getFrameTimes(...) and with the exact segment-based getRecTimes(...)
+    and gives both sets of errors and how far apart they are, to check whether a frame length is fine enough for a
+    set of files before scoring with frames.
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm"
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/AMI_20050204-1206.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - frameStep: frame length in seconds, default "0.01"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions in it, as for getAllErrors(...),
+               default "None" to score everything
+    - chunkFrames: number of frames to work on at a time, default "65536"
+
+    Outputs:
+    - dfDiscrepancy: a dataframe indexed by collar of the errors from frames, from segments and the difference between
+                     them in percentage points, with the SBDER within the collars as NaN without a collar, form: "
+                                               Frames                ...      Difference
+                                             MISS (%) ... SBDER (%)  ...   MISS (%) ... SBDER (%)
+                     Collars [-ms, +ms]
+                     [0, 0]                      8.75 ...       NaN  ...       0.01 ...       NaN
+                     [250, 250]                  2.08 ...     40.59  ...      -0.01 ...     -0.03"
+    """
+    import pandas as pd
+    uem = None if uemFile is None else _getPooledUem(uemFile)
+    frameTimes = getFrameTimes(getRttmArrays(oracleRttmFile, None), getRttmArrays(diarizedRttmFile, None), collars,
+                               frameStep, mapping, uem, chunkFrames)[1:]
+    eventTimes = getRecTimes(getSegs(oracleRttmFile, True), getSegs(diarizedRttmFile, False), collars, True, mapping,
+                             uem)[1:]
+    columns = ["MISS (%)", "FALARM (%)", "ERROR (%)", "DER (%)", "SBDER (%)"]
+    index = pd.Index(["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000) for collar in collars],
+                     name="Collars [-ms, +ms]")
+    dfs = {}
+    for engine, (timesOutside, timesInside) in (("Frames", frameTimes), ("Events", eventTimes)):
+        rows = []
+        for collar, times, collarTimes in zip(collars, timesOutside.tolist(), timesInside.tolist()):
+            rates = [float('nan')] * 4 if times[0] == 0 else _getErrorRates(*times)
+            sbder = float('nan')
+            if collar[0] != 0 and collar[1] != 0 and collarTimes[0] != 0:
+                sbder = _getErrorRates(*collarTimes)[3]
+            rows.append(rates + [sbder])
+        dfs[engine] = pd.DataFrame(rows, index=index, columns=columns)
+    dfs["Difference"] = (dfs["Frames"] - dfs["Events"]).round(2)
+    return pd.concat(dfs, axis=1)
+
+
+def getCorpusTimes(oracleRecSegs, diarizedRecSegs, collars, columnar=False, mapping='greedy', uem=None,
+                   report=None, timeScale=None, spkrIds=None):
+    """
+    This function scores every recording in a test set separately with getRecTimes(oracleSegs, diarizedSegs, collars)
+    and keeps the aggregate times of each recording.  Only recordings in the ground truth are scored, the way
+    md-eval.pl does; a recording missing from the diarization system output counts as all missed.
+
+    Inputs:
+    - oracleRecSegs: dictionary of ground truth segments for each recording from getRecSegs(rttmFile, True)
+    - diarizedRecSegs: dictionary of diarization system segments for each recording from getRecSegs(rttmFile, False)
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - columnar: a Boolean option to run the pipeline on SegTables, default "False"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uem: dictionary of the regions to score of each recording from getUem(uemFile), where a recording missing from
+           it is not scored at all, default "None" to score everything
+    - report: a ScoringReport to record the time, memory and sizes of each stage of each recording in, default "None"
+    - timeScale: None if the segments and UEM regions are in seconds, or the number of ticks per second if they are
+                 whole ticks, default "None"
+    - spkrIds: the pair of dictionaries (oracleSpkrIds, diarizedSpkrIds) the speakers were interned into with
+               getRecSegs(rttmFile, oracle, spkrIds=...), as for getRecTimes(...), default "None" for names
+
+    Outputs:
+    - lstRecs: sorted list of recording IDs scored, form: "['AMI_20050204-1206', 'AMI_20050209-1400', ...]"
+    - allMapSpkrs: dictionary with the recording IDs as the keys and the mapSpkrs of each recording as the values
+    - timesOutside: NumPy array size len(lstRecs) x len(collars) x 4 of the ground truth, missed, false alarm and
+                    speaker error times in seconds outside the collars, or in whole ticks as int64 with a timeScale
+    - timesInside: NumPy array size len(lstRecs) x len(collars) x 4 of the same times within the collars
+    """
+    import numpy as np
+    lstRecs = sorted(oracleRecSegs)
+    allMapSpkrs = {}
+    dtype = np.float64 if timeScale is None else np.int64
+    timesOutside = np.zeros((len(lstRecs), len(collars), 4), dtype=dtype)
+    timesInside = np.zeros((len(lstRecs), len(collars), 4), dtype=dtype)
+    for index, rec in enumerate(lstRecs):
+        allMapSpkrs[rec], timesOutside[index], timesInside[index] = getRecTimes(oracleRecSegs[rec],
+                                                                                diarizedRecSegs.get(rec, []),
+                                                                                collars, columnar, mapping,
+                                                                                None if uem is None else uem.get(rec, []),
+                                                                                report, timeScale, spkrIds)
+    return lstRecs, allMapSpkrs, timesOutside, timesInside
+
+
+def _getDfRecErrors(lstRecs, times, collars, derColumn):
+    """
+    Puts the aggregate times of each recording and collar into a dataframe of percentages indexed by recording and
+    collar, leaving recordings without any ground truth time in a collar as NaN.
+    """
+    import pandas as pd
+    rows = []
+    for rec, recTimes in zip(lstRecs, times.tolist()):
+        for collar, (totalTime, missedTime, falarmTime, errorTime) in zip(collars, recTimes):
+            if totalTime == 0:
+                rates = [float('nan')] * 4
+            else:
+                rates = _getErrorRates(totalTime, missedTime, falarmTime, errorTime)
+            rows.append([rec, "[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000)] + rates)
+    dfRecErrors = pd.DataFrame(rows, columns=["Recording", "Collars [-ms, +ms]", "MISS (%)", "FALARM (%)", "ERROR (%)",
+                                              derColumn])
+    return dfRecErrors.set_index(["Recording", "Collars [-ms, +ms]"])
+
+
+def getCorpusErrors(oracleRttmFile, diarizedRttmFile, collars, columnar=False, mapping='greedy', uemFile=None,
+                    report=None, timeScale=None):
+    """
+    Single function that takes ground truth and diarization system RTTM files holding any number of recordings,
+    scores each recording on its own timeline and with its own speaker mapping, and adds up the times over all the
+    recordings to give pooled corpus-level errors the way md-eval.pl reports them, as well as the errors of each
+    recording.
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/test_set.rttm"
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/test_set.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - columnar: a Boolean option to run the pipeline on SegTables, default "False"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions of each recording in it, default "None"
+               to score everything
+    - report: a ScoringReport to record the time, memory and sizes of each stage in, default "None"
+    - timeScale: None to score in seconds, or a number of ticks per second to score in whole ticks, as for
+                 getAllErrors(...), default "None"
+
+    Outputs:
+    - allMapSpkrs: dictionary with the recording IDs as the keys and the mapSpkrs of each recording as the values
+    - dfErrors: a dataframe of the pooled errors, in the same form as from getAllErrors(...)
+    - dfSBDERs: a dataframe of the pooled errors within the collars, in the same form as from getAllErrors(...)
+    - dfRecErrors: a dataframe of the errors of each recording, indexed by recording and collar
+    - dfRecSBDERs: a dataframe of the errors within the collars of each recording, indexed by recording and collar
+    """
+    with _getStage(report, 'getSegs') as sizes:
+        spkrIds = ({}, {})
+        oracleRecSegs = getRecSegs(oracleRttmFile, True, timeScale=timeScale, spkrIds=spkrIds[0])
+        diarizedRecSegs = getRecSegs(diarizedRttmFile, False, timeScale=timeScale, spkrIds=spkrIds[1])
+        uem = None if uemFile is None else getUem(uemFile, timeScale)
+        sizes['recordings'] = len(oracleRecSegs)
+        sizes['oracleSegs'] = sum(len(segs) for segs in oracleRecSegs.values())
+        sizes['diarizedSegs'] = sum(len(segs) for segs in diarizedRecSegs.values())
+
+    lstRecs, allMapSpkrs, timesOutside, timesInside = getCorpusTimes(oracleRecSegs, diarizedRecSegs, collars, columnar,
+                                                                     mapping, uem, report, timeScale, spkrIds)
+    with _getStage(report, 'getErrors', recordings=len(lstRecs), collars=len(collars)):
+        return _getCorpusErrorsFromTimes(lstRecs, allMapSpkrs, timesOutside, timesInside, collars)
+
+
+def _getCorpusErrorsFromTimes(lstRecs, allMapSpkrs, timesOutside, timesInside, collars):
+    """
+    Turns the times of each recording from getCorpusTimes(...) into the outputs of getCorpusErrors(...).
+    """
+    matErrors, dfErrors, matSBDERs, dfSBDERs = _getErrorsFromTimes(timesOutside.sum(axis=0), timesInside.sum(axis=0),
+                                                                   collars)
+    dfRecErrors = _getDfRecErrors(lstRecs, timesOutside, collars, "DER (%)")
+    dfRecSBDERs = _getDfRecErrors(lstRecs, timesInside, collars, "SBDER (%)")
+
+    return allMapSpkrs, dfErrors, dfSBDERs, dfRecErrors, dfRecSBDERs
+
+
+def _getResampledRates(totals):
+    """
+    Turns ground truth, missed, false alarm and speaker error times, in the last axis, into MISS, FALARM, ERROR and
+    DER percentages, leaving NaN where there is no ground truth time.
+    """
+    import numpy as np
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = 100*totals[..., 1:]/totals[..., :1]
+    return np.concatenate([rates, rates.sum(axis=-1, keepdims=True)], axis=-1)
+
+
+def _getDfStatistics(collars, statistics):
+    """
+    Puts a dictionary of NumPy arrays size len(collars) x 4 of MISS, FALARM, ERROR and DER statistics into a
+    dataframe indexed by collar and statistic.
+    """
+    import pandas as pd
+    rows = []
+    for index, collar in enumerate(collars):
+        for name, values in statistics.items():
+            rows.append(["[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000), name] + values[index].tolist())
+    dfStatistics = pd.DataFrame(rows, columns=["Collars [-ms, +ms]", "Statistic", "MISS (%)", "FALARM (%)",
+                                               "ERROR (%)", "DER (%)"])
+    return dfStatistics.set_index(["Collars [-ms, +ms]", "Statistic"])
+
+
+def getBootstrapIntervals(times, collars, nResamples=10000, confidence=0.95, seed=None, blockSize=1000):
+    """
+    This function gives bootstrap confidence intervals for the pooled errors of a test set from the times of each
+    recording, without scoring anything again.  Each resample draws the recordings with replacement, held as a row of
+    how many times each recording is drawn, so a block of resamples is a matrix and its pooled times are one matrix
+    product with the times of each recording.
+
+    Inputs:
+    - times: NumPy array size number of recordings x len(collars) x 4 of the ground truth, missed, false alarm and
+             speaker error times of each recording, e.g. timesOutside from getCorpusTimes(...) or
+             getParallelTimes(...), or timesInside for the errors within the collars
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - nResamples: number of bootstrap resamples, default "10000"
+    - confidence: confidence level of the intervals, default "0.95"
+    - seed: seed for numpy.random.default_rng(seed), default "None"
+    - blockSize: number of resamples to draw at a time, to bound the memory used, default "1000"
+
+    Outputs:
+    - dfIntervals: a dataframe of the pooled errors and the percentile bootstrap interval around them, indexed by
+                   collar and statistic, form: "
+                                                   MISS (%)  FALARM (%)  ERROR (%)  DER (%)
+                   Collars [-ms, +ms] Statistic
+                   [0, 0]             Estimate        20.15        0.91       8.09    29.14
+                                      Lower           18.72        0.80       7.31    27.46
+                                      Upper           21.60        1.03       8.90    30.85"
+    """
+    import numpy as np
+    times = np.asarray(times, dtype=np.float64)
+    nRecs = len(times)
+    rng = np.random.default_rng(seed)
+    estimate = _getResampledRates(times.sum(axis=0))
+    rates = []
+    for start in range(0, nResamples, blockSize):
+        size = min(blockSize, nResamples - start)
+        draws = rng.integers(0, nRecs, size=(size, nRecs)) + nRecs*np.arange(size)[:, None]
+        weights = np.bincount(draws.ravel(), minlength=size*nRecs).reshape(size, nRecs)
+        rates.append(_getResampledRates(np.tensordot(weights.astype(np.float64), times, axes=1)))
+    rates = np.concatenate(rates)
+    lower, upper = np.nanpercentile(rates, [50*(1 - confidence), 50*(1 + confidence)], axis=0)
+    return _getDfStatistics(collars, {"Estimate": estimate.round(2), "Lower": lower.round(2),
+                                      "Upper": upper.round(2)})
+
+
+def getPairedTest(timesA, timesB, collars, nResamples=10000, seed=None, blockSize=1000):
+    """
+    This function gives a paired permutation test of whether two diarization systems differ in their pooled errors
+    on a test set, from the times of each recording for each system, without scoring anything again.  Under the null
+    hypothesis the two systems are interchangeable on each recording, so each resample swaps the times of the two
+    systems on a random set of recordings, held as a row of 0s and 1s, and a block of resamples is again a matrix
+    product with the times of each recording.  The p-value is two-sided, counting resamples with a difference at least
+    as large as the one seen.
+
+    Inputs:
+    - timesA: NumPy array size number of recordings x len(collars) x 4 of the times of each recording for system A,
+              as for getBootstrapIntervals(times, collars)
+    - timesB: NumPy array of the same times for system B, for the same recordings in the same order
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - nResamples: number of permutation resamples, default "10000"
+    - seed: seed for numpy.random.default_rng(seed), default "None"
+    - blockSize: number of resamples to draw at a time, to bound the memory used, default "1000"
+
+    Outputs:
+    - dfTest: a dataframe of the errors of system A minus those of system B in percentage points and the p-value of
+              each, indexed by collar and statistic, form: "
+                                                   MISS (%)  FALARM (%)  ERROR (%)  DER (%)
+              Collars [-ms, +ms] Statistic
+              [0, 0]             Difference        -0.41        0.02      -1.37    -1.76
+                                 p-value           0.2107      0.8133     0.0003   0.0011"
+    """
+    import numpy as np
+    timesA = np.asarray(timesA, dtype=np.float64)
+    timesB = np.asarray(timesB, dtype=np.float64)
+    if timesA.shape != timesB.shape:
+        raise ValueError("Times of shapes {} and {} are not of the same recordings and collars."
+                         .format(timesA.shape, timesB.shape))
+    nRecs = len(timesA)
+    rng = np.random.default_rng(seed)
+    difference = _getResampledRates(timesA.sum(axis=0)) - _getResampledRates(timesB.sum(axis=0))
+    totalA = timesA.sum(axis=0)
+    totalB = timesB.sum(axis=0)
+    swapped = timesB - timesA
+    counts = np.zeros(difference.shape, dtype=np.int64)
+    for start in range(0, nResamples, blockSize):
+        swaps = rng.integers(0, 2, size=(min(blockSize, nResamples - start), nRecs)).astype(np.float64)
+        change = np.tensordot(swaps, swapped, axes=1)
+        resampled = _getResampledRates(totalA + change) - _getResampledRates(totalB - change)
+        # Small tolerance so that resamples equal to the one seen are counted despite rounding
+        counts += (np.abs(resampled) >= np.abs(difference) - 1e-9).sum(axis=0)
+    pValues = (counts + 1)/(nResamples + 1)
+    return _getDfStatistics(collars, {"Difference": difference.round(2), "p-value": pValues.round(4)})
+
+
+@dataclasses.dataclass
+class ErrorTimeline:
+    """
+    This class holds every elementary segment of one recording with the errors in it, so that a change in DER can be
+    traced to the segments and speakers behind it.  The elementary segments are the combined split segments after the
+    UEM cut and the speaker mapping, cut again at every boundary of the segments to ignore of every collar, so each one
+    is either wholly within or wholly outside each collar.  Everything is held as NumPy arrays with one row per
+    elementary segment, as in a SegTable, and pandas is only imported to make dataframes.
+
+    The times of each segment are the same as getCollarTimes(comboSplitSegs, newSegsIgnore, mapSpkrs) adds up, so
+    the times of the segments outside the collars of a collar add up to its timesOutside.  The error class only names
+    the main error: a segment with mapped speech in it is "correct" even if it still has MISS time for ground truth
+    speakers beyond the first in an overlap.
+
+    Attributes:
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[[0, 0], [0.25, 0.25]]"
+    - mapSpkrs: dictionary of the speaker mapping, in the same form as from getMapSpkrs(...)
+    - tbeg: float64 array of segment start times, or int64 if they are whole ticks
+    - tend: float64 array of segment end times, or int64 if they are whole ticks
+    - errorClass: int8 array of the index of each segment's error class in errorClasses
+    - totalTime: array of the ground truth time of each segment, counting each ground truth speaker
+    - missedTime: array of the missed time of each segment
+    - falarmTime: array of the false alarm time of each segment
+    - errorTime: array of the speaker error time of each segment
+    - inCollar: Boolean array size len(tbeg) x len(collars) of whether each segment is within each collar
+    - oname: SpkrCounts of the ground truth speakers in each segment, with columns labelled by lstOracleSpkrs
+    - dname: SpkrCounts of the diarization system speakers in each segment, with columns labelled by lstDiarizedSpkrs
+    - lstOracleSpkrs: list of ground truth speakers labelling the columns of oname
+    - lstDiarizedSpkrs: list of diarization system speakers labelling the columns of dname
+    - timeScale: None if the times are in seconds, or the number of ticks per second if they are whole ticks
+    """
+    errorClasses: typing.ClassVar[tuple] = ('correct', 'miss', 'falarm', 'confusion')
+
+    collars: list
+    mapSpkrs: dict
+    tbeg: object
+    tend: object
+    errorClass: object
+    totalTime: object
+    missedTime: object
+    falarmTime: object
+    errorTime: object
+    inCollar: object
+    oname: object
+    dname: object
+    lstOracleSpkrs: list
+    lstDiarizedSpkrs: list
+    timeScale: object = None
+
+    def __len__(self):
+        return len(self.tbeg)
+
+    def getOracleSpkrTimes(self):
+        """
+        Returns a NumPy array size len(collars) x len(lstOracleSpkrs) x 4 of the time of each ground truth speaker and
+        its share of the missed, false alarm and speaker error times outside each collar.  The times of a segment
+        are shared between its ground truth speakers by how many times each is active in it, so the times of all the
+        speakers add up to timesOutside.  No false alarm time is shared out, as there is no ground truth speaker in
+        false alarm segments.
+        """
+        import numpy as np
+        times = np.stack([self.totalTime, self.missedTime, self.falarmTime, self.errorTime], axis=1)
+        return self._getSharedTimes(self.oname, times)
+
+    def getDiarizedSpkrTimes(self):
+        """
+        Returns a NumPy array size len(collars) x len(lstDiarizedSpkrs) x 4 of the time of each diarization system
+        speaker and its share of the missed, false alarm and speaker error times outside each collar, shared out as in
+        getOracleSpkrTimes().  No missed time is shared out, as there is no diarization system speaker in missed
+        segments.
+        """
+        import numpy as np
+        counts = self.dname.getRowTotals()
+        times = np.stack([(self.tend - self.tbeg)*counts, self.missedTime*(counts > 0), self.falarmTime,
+                          self.errorTime], axis=1)
+        return self._getSharedTimes(self.dname, times)
+
+    def _getSharedTimes(self, counts, times):
+        """
+        Shares out the times size len(tbeg) x 4 of each segment outside each collar between the speakers of counts.
+        """
+        import numpy as np
+        shares = counts.counts / np.maximum(counts.getRowTotals(), 1)[counts.rows]
+        sharedTimes = np.zeros((len(self.collars), counts.nSpkrs, 4))
+        for index, inCollar in enumerate(self.inCollar.T):
+            outside = ~inCollar[counts.rows]
+            for col in range(4):
+                sharedTimes[index, :, col] = np.bincount(counts.spkrs[outside], minlength=counts.nSpkrs,
+                                                         weights=shares[outside]*times[counts.rows[outside], col])
+        return sharedTimes
+
+    def getArrays(self):
+        """
+        Returns the timeline as a dictionary of NumPy arrays that can be saved with numpy.savez(...) and read back with
+        ErrorTimeline.fromArrays(arrays).
+        """
+        import numpy as np
+        arrays = {name: getattr(self, name) for name in ('tbeg', 'tend', 'errorClass', 'totalTime', 'missedTime',
+                                                           'falarmTime', 'errorTime', 'inCollar')}
+        for name in ('oname', 'dname'):
+            counts = getattr(self, name)
+            arrays.update({name + 'Rows': counts.rows, name + 'Spkrs': counts.spkrs, name + 'Counts': counts.counts})
+        arrays.update(collars=np.array(self.collars, dtype=np.float64).reshape(-1, 2),
+                      lstOracleSpkrs=np.array(self.lstOracleSpkrs, dtype=str),
+                      lstDiarizedSpkrs=np.array(self.lstDiarizedSpkrs, dtype=str),
+                      mapOracleSpkrs=np.array(list(self.mapSpkrs), dtype=str),
+                      mapDiarizedSpkrs=np.array(["" if value[0] is None else value[0]
+                                                 for value in self.mapSpkrs.values()], dtype=str),
+                      mapTimes=np.array([value[1:] for value in self.mapSpkrs.values()],
+                                        dtype=np.float64).reshape(-1, 2),
+                      timeScale=np.array(np.nan if self.timeScale is None else self.timeScale))
+        return arrays
+
+    @classmethod
+    def fromArrays(cls, arrays):
+        """
+        Builds a timeline from a dictionary of NumPy arrays from getArrays(), e.g. as read back with numpy.load(...).
+        """
+        import math
+        mapSpkrs = {spkr: [dSpkr or None, topTime, percent] for spkr, dSpkr, (topTime, percent) in
+                    zip(arrays['mapOracleSpkrs'].tolist(), arrays['mapDiarizedSpkrs'].tolist(),
+                        arrays['mapTimes'].tolist())}
+        timeScale = float(arrays['timeScale'])
+        lstOracleSpkrs = arrays['lstOracleSpkrs'].tolist()
+        lstDiarizedSpkrs = arrays['lstDiarizedSpkrs'].tolist()
+        oname, dname = (SpkrCounts(arrays[name + 'Rows'], arrays[name + 'Spkrs'], arrays[name + 'Counts'],
+                                   len(arrays['tbeg']), len(lstSpkrs))
+                        for name, lstSpkrs in (('oname', lstOracleSpkrs), ('dname', lstDiarizedSpkrs)))
+        return cls(arrays['collars'].tolist(), mapSpkrs, *(arrays[name] for name in
+                                                           ('tbeg', 'tend', 'errorClass', 'totalTime', 'missedTime',
+                                                            'falarmTime', 'errorTime', 'inCollar')),
+                   oname, dname, lstOracleSpkrs, lstDiarizedSpkrs, None if math.isnan(timeScale) else timeScale)
+
+    def toDataFrame(self):
+        """
+        Returns the timeline as a dataframe with one row per elementary segment and the times in seconds, with the
+        error class and the speakers of each segment as categories, form: "
+             Start Time  End Time Error Class  ...  Oracle Speaker(s)  Diarized Speaker(s)  In Collar [250, 250]
+        0       1270.14   1270.39      falarm  ...                     spkr_0                               True
+        1       1270.39   1270.64     correct  ...  FEE029             spkr_0                               True"
+        """
+        import numpy as np
+        import pandas as pd
+        scale = 1 if self.timeScale is None else self.timeScale
+        columns = {"Start Time": self.tbeg / scale, "End Time": self.tend / scale,
+                   "Error Class": pd.Categorical.from_codes(self.errorClass, self.errorClasses),
+                   "Total Time": self.totalTime / scale, "Missed Time": self.missedTime / scale,
+                   "False Alarm Time": self.falarmTime / scale, "Error Time": self.errorTime / scale}
+        for name, counts, lstSpkrs in (("Oracle Speaker(s)", self.oname, self.lstOracleSpkrs),
+                                       ("Diarized Speaker(s)", self.dname, self.lstDiarizedSpkrs)):
+            # One label for each combination of speakers rather than one for each segment
+            patterns, codes = counts.getPatterns()
+            labels = [",".join(lstSpkrs[spkr] for spkr in pattern) for pattern in patterns]
+            columns[name] = pd.Categorical.from_codes(codes, labels) if len(counts) else []
+        for collar, inCollar in zip(self.collars, self.inCollar.T):
+            columns["In Collar [{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000)] = inCollar
+        return pd.DataFrame(columns)
+
+    def toSpkrDataFrames(self):
+        """
+        Returns dfOracleSpkrErrors and dfDiarizedSpkrErrors, the times from getOracleSpkrTimes() and
+        getDiarizedSpkrTimes() as dataframes indexed by speaker and collar, with the time of each speaker in seconds
+        and its MISS, FALARM and ERROR as percentages of all the ground truth time, so that adding them up over the
+        speakers gives the errors from getAllErrors(...), form: "
+                                              Time (s)  MISS (%)  FALARM (%)  ERROR (%)
+        Speaker Collars [-ms, +ms]
+        FEE029  [0, 0]                          244.35      2.11        0.00       4.09"
+        """
+        import pandas as pd
+        scale = 1 if self.timeScale is None else self.timeScale
+        totals = self.getOracleSpkrTimes()[:, :, 0].sum(axis=1)
+        dfs = []
+        for lstSpkrs, times in ((self.lstOracleSpkrs, self.getOracleSpkrTimes()),
+                                (self.lstDiarizedSpkrs, self.getDiarizedSpkrTimes())):
+            rows = []
+            for spkrIndex, spkr in enumerate(lstSpkrs):
+                for collar, collarTimes, total in zip(self.collars, times[:, spkrIndex].tolist(), totals.tolist()):
+                    rates = [round(100*time/total, 2) if total else float('nan') for time in collarTimes[1:]]
+                    rows.append([spkr, "[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000),
+                                 round(collarTimes[0] / scale, 3)] + rates)
+            dfs.append(pd.DataFrame(rows, columns=["Speaker", "Collars [-ms, +ms]", "Time (s)", "MISS (%)",
+                                                   "FALARM (%)", "ERROR (%)"]).set_index(["Speaker",
+                                                                                          "Collars [-ms, +ms]"]))
+        return dfs[0], dfs[1]
+
+
+def getRecErrorTimeline(oracleSegs, diarizedSegs, collars, mapping='greedy', uem=None, timeScale=None):
+    """
+    This function runs the whole process for the segments of one recording, as getRecTimes(...) does with
+    columnar=True, but keeps every elementary segment and its errors as an ErrorTimeline rather than adding them up.
+
+    Inputs:
+    - oracleSegs: list of ground truth segments from getSegs(rttmFile, True) or getRecSegs(rttmFile, True), or a
+                  PreparedReference holding the ground truth work already done for these collars
+    - diarizedSegs: list of diarization system segments from getSegs(rttmFile, False) or getRecSegs(rttmFile, False)
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uem: sorted, non-overlapping list of the regions of the recording to score, from getUem(uemFile), default "None"
+           to score everything
+    - timeScale: None if the segments and UEM regions are in seconds, or the number of ticks per second if they are
+                 whole ticks, taken from the PreparedReference if there is one, default "None"
+
+    Outputs:
+    - timeline: ErrorTimeline of the elementary segments of the recording
+    """
+    import numpy as np
+    diarizedSegs = SegTable.fromSegs(diarizedSegs)
+    if isinstance(oracleSegs, PreparedReference):
+        timeScale = oracleSegs.timeScale
+        collars = oracleSegs.getCollars(collars)
+        newSegsIgnore = oracleSegs.getNewSegsIgnore(collars)
+        _, comboSplitSegs = getComboSplitSegs(oracleSegs.getOracleSplitSegs(True), diarizedSegs)
+    else:
+        oracleSplitSegs, comboSplitSegs = getComboSplitSegs(SegTable.fromSegs(oracleSegs), diarizedSegs)
+        newSegsIgnore = getNewSegsIgnore(getSegsIgnore(oracleSplitSegs, _getScaledCollars(collars, timeScale)),
+                                         collars)
+    table, mapSpkrs = _getMappedComboSplitSegs(comboSplitSegs, mapping, uem)
+    ignores = [_getIgnoreArray(segsIgnore, table.tbeg.dtype) for segsIgnore in newSegsIgnore]
+
+    # Cut every segment at the boundaries of the segments to ignore that fall inside it
+    cuts = np.unique(np.concatenate([ignore.ravel() for ignore in ignores] + [table.tbeg[:0]]))
+    owner, index = _getRaggedIndex(np.searchsorted(cuts, table.tbeg, 'right'), np.searchsorted(cuts, table.tend, 'left'))
+    rows = np.concatenate([np.arange(len(table)), owner])
+    tbeg = np.concatenate([table.tbeg, cuts[index]])
+    order = np.lexsort((tbeg, rows))
+    rows, tbeg = rows[order], tbeg[order]
+    tend = table.tend[rows].copy()
+    sameRow = rows[1:] == rows[:-1]
+    tend[:-1][sameRow] = tbeg[1:][sameRow]
+
+    inCollar = np.zeros((len(rows), len(ignores)), dtype=bool)
+    for col, ignore in enumerate(ignores):
+        if len(ignore):
+            position = np.searchsorted(ignore[:, 0], tbeg, 'right') - 1
+            inCollar[:, col] = (position >= 0) & (tbeg < ignore[np.maximum(position, 0), 1])
+
+    weights = _getSegWeights(table, mapSpkrs)[rows]
+    durations = tend - tbeg
+    oCounts = table.oname.getRowTotals()[rows]
+    dCounts = table.dname.getRowTotals()[rows]
+    errorClass = np.zeros(len(rows), dtype=np.int8)
+    errorClass[(oCounts > 0) & (dCounts == 0)] = 1
+    errorClass[(oCounts == 0) & (dCounts > 0)] = 2
+    errorClass[weights[:, 4] > 0] = 3
+
+    return ErrorTimeline([list(collar) for collar in collars], _getUnscaledMapSpkrs(mapSpkrs, timeScale), tbeg, tend,
+                         errorClass, durations*weights[:, 0], durations*(weights[:, 1] + weights[:, 2]),
+                         durations*weights[:, 3], durations*weights[:, 4], inCollar,
+                         table.oname.take(rows), table.dname.take(rows), table.lstOracleSpkrs, table.lstDiarizedSpkrs, timeScale)
+
+
+def getErrorTimeline(oracleRttmFile, diarizedRttmFile, collars, mapping='greedy', uemFile=None, timeScale=None):
+    """
+    Single function that takes the input RTTM files and list of collars and gives the ErrorTimeline of all the lines
+    of each file taken as one recording, as getAllErrors(...) scores them, see getRecErrorTimeline(...).
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/AMI_20050204-1206.rttm", or a
+                      PreparedReference from prepareReference(oracleRttmFile, collars, columnar=True)
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/AMI_20050204-1206.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions in it, default "None" to score everything
+    - timeScale: None to score in seconds, or a number of ticks per second to score in whole ticks, as for
+                 getAllErrors(...), default "None"
+
+    Outputs:
+    - timeline: ErrorTimeline of the elementary segments
+    """
+    if isinstance(oracleRttmFile, PreparedReference):
+        oracleSegs = oracleRttmFile
+        timeScale = oracleRttmFile.timeScale
+    else:
+        oracleSegs = getSegs(oracleRttmFile, True, timeScale=timeScale)
+    uem = None if uemFile is None else _getPooledUem(uemFile, timeScale)
+    return getRecErrorTimeline(oracleSegs, getSegs(diarizedRttmFile, False, timeScale=timeScale), collars, mapping,
+                               uem, timeScale)
+
+
+def writeErrorTimelines(oracleRttmFile, diarizedRttmFile, collars, outputFile, mapping='greedy', uemFile=None,
+                        timeScale=None, fileFormat=None):
+    """
+    This function scores every recording in the RTTM files separately, as getCorpusErrors(...) does, and writes the
+    ErrorTimeline of each to one file as soon as it is made, so only one recording is held at a time.  A ".npz" file
+    has the arrays from ErrorTimeline.getArrays() of each recording under "<recording ID>/", and can be read back with
+    readErrorTimelines(inputFile).  A ".parquet" file has the rows of ErrorTimeline.toDataFrame() of every recording
+    with a "Recording" column, written one recording per row group, and needs pandas and pyarrow.
+
+    Inputs:
+    - oracleRttmFile: path to and filename of ground truth RTTM file, form: "inputs/test_set.rttm"
+    - diarizedRttmFile: path to and filename of speaker diarization generated RTTM file, form: "results/test_set.rttm"
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - outputFile: path to and filename of the file to write, form: "results/timeline.npz"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions of each recording in it, default "None"
+               to score everything
+    - timeScale: None to score in seconds, or a number of ticks per second to score in whole ticks, default "None"
+    - fileFormat: "npz" or "parquet", default "None" to go by the extension of outputFile
+
+    Outputs:
+    - lstRecs: sorted list of recording IDs written, form: "['AMI_20050204-1206', 'AMI_20050209-1400', ...]"
+    """
+    import os
+    import zipfile
+    import numpy as np
+    fileFormat = (fileFormat or os.path.splitext(str(outputFile))[1].lstrip('.')).lower()
+    if fileFormat not in ('npz', 'parquet'):
+        raise ValueError("fileFormat must be 'npz' or 'parquet', not {!r}.".format(fileFormat))
+    oracleRecSegs = getRecSegs(oracleRttmFile, True, timeScale=timeScale)
+    diarizedRecSegs = getRecSegs(diarizedRttmFile, False, timeScale=timeScale)
+    uem = None if uemFile is None else getUem(uemFile, timeScale)
+    lstRecs = sorted(oracleRecSegs)
+
+    def iterTimelines():
+        for rec in lstRecs:
+            yield rec, getRecErrorTimeline(oracleRecSegs[rec], diarizedRecSegs.get(rec, []), collars, mapping,
+                                           None if uem is None else uem.get(rec, []), timeScale)
+
+    if fileFormat == 'npz':
+        with zipfile.ZipFile(str(outputFile), 'w', compression=zipfile.ZIP_DEFLATED) as npz:
+            for rec, timeline in iterTimelines():
+                for name, array in timeline.getArrays().items():
+                    with npz.open("{}/{}.npy".format(rec, name), 'w', force_zip64=True) as f:
+                        np.lib.format.write_array(f, np.asarray(array), allow_pickle=False)
+        return lstRecs
+
+    import pyarrow
+    import pyarrow.parquet
+    writer = None
+    try:
+        for rec, timeline in iterTimelines():
+            df = timeline.toDataFrame()
+            df.insert(0, "Recording", rec)
+            # Plain strings so that every row group has the same schema, Parquet encodes repeated ones compactly anyway
+            df = df.astype({"Error Class": str, "Oracle Speaker(s)": str, "Diarized Speaker(s)": str})
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(str(outputFile), table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return lstRecs
+
+
+def readErrorTimelines(inputFile):
+    """
+    This function reads the ErrorTimeline of each recording back from a ".npz" file from writeErrorTimelines(...).
+
+    Inputs:
+    - inputFile: path to and filename of the file to read, form: "results/timeline.npz"
+
+    Outputs:
+    - timelines: dictionary with the recording IDs as the keys and the ErrorTimeline of each recording as the values
+    """
+    import numpy as np
+    arrays = collections.defaultdict(dict)
+    with np.load(str(inputFile), allow_pickle=False) as npz:
+        for key in npz.files:
+            rec, name = key.rsplit('/', 1)
+            arrays[rec][name] = npz[key]
+    return {rec: ErrorTimeline.fromArrays(recArrays) for rec, recArrays in arrays.items()}
+
+
+def getDirPairs(oracleDir, diarizedDir):
+    """
+    This function pairs up the ground truth and diarization system RTTM files in two folders by filename.
+
+    Inputs:
+    - oracleDir: path to the folder of ground truth RTTM files, form: "inputs/"
+    - diarizedDir: path to the folder of diarization system RTTM files, form: "results/"
+
+    Outputs:
+    - pairs: sorted list of (ground truth file, diarization system file) pairs for the RTTM files in oracleDir, with
+             None for the diarization system file if there is no file of the same name in diarizedDir
+    """
+    import os
+    pairs = []
+    for filename in sorted(os.listdir(oracleDir)):
+        if filename.lower().endswith('.rttm'):
+            diarizedRttmFile = os.path.join(diarizedDir, filename)
+            pairs.append((os.path.join(oracleDir, filename),
+                          diarizedRttmFile if os.path.isfile(diarizedRttmFile) else None))
+    return pairs
+
+
+def _getRecIds(rttmFile):
+    """
+    Returns the recording IDs in an RTTM file without building any segments.
+    """
+    return sorted({record.file for record in iterRttm(rttmFile)})
+
+
+_recSegsCache = {}
+
+
+def _getCachedRecSegs(rttmFile, oracle, timeScale=None):
+    """
+    Returns getRecSegs(rttmFile, oracle, timeScale=timeScale, spkrIds=spkrIds) and the spkrIds the speakers were
+    interned into, parsing each file only once per process so that a file holding many recordings is not parsed again
+    for every recording scored from it.
+    """
+    if rttmFile is None:
+        return {}, {}
+    key = (rttmFile, oracle, timeScale)
+    if key not in _recSegsCache:
+        if len(_recSegsCache) >= 8:
+            del _recSegsCache[next(iter(_recSegsCache))]
+        spkrIds = {}
+        _recSegsCache[key] = getRecSegs(rttmFile, oracle, timeScale=timeScale, spkrIds=spkrIds), spkrIds
+    return _recSegsCache[key]
+
+
+def _getRecTimesTask(task):
+    """
+    Scores one recording, or one recording and collar, in a worker process for getParallelErrors(...).
+    """
+    oracleRttmFile, diarizedRttmFile, rec, collars, columnar, mapping, uem, timeScale = task
+    oracleRecSegs, oracleSpkrIds = _getCachedRecSegs(oracleRttmFile, True, timeScale)
+    diarizedRecSegs, diarizedSpkrIds = _getCachedRecSegs(diarizedRttmFile, False, timeScale)
+    return getRecTimes(oracleRecSegs[rec], diarizedRecSegs.get(rec, []), collars, columnar, mapping, uem,
+                       timeScale=timeScale, spkrIds=(oracleSpkrIds, diarizedSpkrIds))
+
+
+def getParallelErrors(pairs, collars, nProcs=None, columnar=False, splitCollars=False, mapping='greedy',
+                      uemFile=None, timeScale=None):
+    """
+    This function does the same as getCorpusErrors(oracleRttmFile, diarizedRttmFile, collars) for a whole list of
+    RTTM file pairs, spreading the recordings over a pool of processes.  Each recording is scored as a separate task,
+    and with splitCollars each collar of each recording is too, which helps when there are few long recordings and
+    many collars.  The results are put back together in a fixed order so they do not depend on how the work was
+    scheduled.
+
+    Inputs:
+    - pairs: list of (ground truth RTTM file, diarization system RTTM file) pairs, each of which may hold any number
+             of recordings, or a pair of folders (oracleDir, diarizedDir) to be matched up with getDirPairs(...)
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+    - nProcs: number of worker processes, default "None" for one per CPU, with 1 scoring in the current process
+    - columnar: a Boolean option to run the pipeline on SegTables, default "False"
+    - splitCollars: a Boolean option to score each collar of each recording as a separate task, default "False"
+    - mapping: either "greedy" or "optimal" speaker mapping, see getMapSpkrs(...), default "greedy"
+    - uemFile: path to and filename of a UEM file to only score the regions of each recording in it, default "None"
+               to score everything
+    - timeScale: None to score in seconds, or a number of ticks per second to score in whole ticks, which makes the
+                 pooled times exactly the same however the recordings are added up, default "None"
+
+    Outputs:
+    - allMapSpkrs: dictionary with the recording IDs as the keys and the mapSpkrs of each recording as the values
+    - dfErrors: a dataframe of the pooled errors, in the same form as from getAllErrors(...)
+    - dfSBDERs: a dataframe of the pooled errors within the collars, in the same form as from getAllErrors(...)
+    - dfRecErrors: a dataframe of the errors of each recording, indexed by recording and collar
+    - dfRecSBDERs: a dataframe of the errors within the collars of each recording, indexed by recording and collar
+    """
+    lstRecs, allMapSpkrs, timesOutside, timesInside = getParallelTimes(pairs, collars, nProcs, columnar, splitCollars,
+                                                                       mapping, uemFile, timeScale)
+    return _getCorpusErrorsFromTimes(lstRecs, allMapSpkrs, timesOutside, timesInside, collars)
+
+
+def getParallelTimes(pairs, collars, nProcs=None, columnar=False, splitCollars=False, mapping='greedy', uemFile=None,
+                     timeScale=None):
+    """
+    This function scores the recordings of a list of RTTM file pairs in a pool of processes, as
+    getParallelErrors(pairs, collars) does, but returns the aggregate times of each recording rather than percentages,
+    in the same form as from getCorpusTimes(...).
+
+    Inputs:
+    - pairs, collars, nProcs, columnar, splitCollars, mapping, uemFile, timeScale: as for getParallelErrors(...)
+
+    Outputs:
+    - lstRecs: sorted list of recording IDs scored, form: "['AMI_20050204-1206', 'AMI_20050209-1400', ...]"
+    - allMapSpkrs: dictionary with the recording IDs as the keys and the mapSpkrs of each recording as the values
+    - timesOutside: NumPy array size len(lstRecs) x len(collars) x 4 of the ground truth, missed, false alarm and
+                    speaker error times outside the collars, in seconds, or in whole ticks as int64 with a timeScale
+    - timesInside: NumPy array size len(lstRecs) x len(collars) x 4 of the same times within the collars
+    """
+    import os
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+
+    if len(pairs) == 2 and all(isinstance(x, str) and os.path.isdir(x) for x in pairs):
+        pairs = getDirPairs(*pairs)
+
+    uem = None if uemFile is None else getUem(uemFile, timeScale)
+
+    lstRecs = []
+    tasks = []
+    for oracleRttmFile, diarizedRttmFile in pairs:
+        for rec in _getRecIds(oracleRttmFile):
+            if rec in lstRecs:
+                raise ValueError("Recording {} is in more than one ground truth RTTM file.".format(rec))
+            lstRecs.append(rec)
+            recUem = None if uem is None else uem.get(rec, [])
+            if splitCollars:
+                tasks.extend((oracleRttmFile, diarizedRttmFile, rec, [collar], columnar, mapping, recUem, timeScale)
+                             for collar in collars)
+            else:
+                tasks.append((oracleRttmFile, diarizedRttmFile, rec, collars, columnar, mapping, recUem, timeScale))
+
+    _recSegsCache.clear()
+    if nProcs == 1:
+        results = [_getRecTimesTask(task) for task in tasks]
+    else:
+        nProcs = nProcs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=nProcs) as executor:
+            results = list(executor.map(_getRecTimesTask, tasks, chunksize=max(1, len(tasks) // (4*nProcs))))
+    _recSegsCache.clear()
+
+    # Results come back in task order, so the recordings and collars line up with lstRecs and collars
+    allMapSpkrs = {}
+    dtype = np.float64 if timeScale is None else np.int64
+    timesOutside = np.zeros((len(lstRecs), len(collars), 4), dtype=dtype)
+    timesInside = np.zeros((len(lstRecs), len(collars), 4), dtype=dtype)
+    nTasks = len(collars) if splitCollars else 1
+    for index, rec in enumerate(lstRecs):
+        recResults = results[index*nTasks:(index + 1)*nTasks]
+        allMapSpkrs[rec] = recResults[0][0]
+        timesOutside[index] = np.concatenate([result[1] for result in recResults])
+        timesInside[index] = np.concatenate([result[2] for result in recResults])
+
+    # Recordings are reported in sorted order, as from getCorpusErrors(...)
+    order = sorted(range(len(lstRecs)), key=lambda i: lstRecs[i])
+    lstRecs = [lstRecs[i] for i in order]
+    allMapSpkrs = {rec: allMapSpkrs[rec] for rec in lstRecs}
+    return lstRecs, allMapSpkrs, timesOutside[order], timesInside[order]
+
+
+def getResultRows(lstRecs, timesOutside, timesInside, collars):
+    """
+    This function turns the aggregate times of each recording into a flat list of results, one row for each
+    recording and collar followed by the pooled rows for each collar, without building any dataframes.
+
+    Inputs:
+    - lstRecs: list of recording IDs, form: "['AMI_20050204-1206', 'AMI_20050209-1400', ...]"
+    - timesOutside: NumPy array size len(lstRecs) x len(collars) x 4 of the times outside the collars, from
+                    getCorpusTimes(...) or getParallelTimes(...)
+    - timesInside: NumPy array size len(lstRecs) x len(collars) x 4 of the times within the collars
+    - collars: list of start collar sizes and end collar sizes in seconds, form "[0.25, 0.25]"
+
+    Outputs:
+    - rows: list of dictionaries, with "ALL" as the recording of the pooled rows and None where there is nothing to
+            score, e.g. the SBDER without a collar, form: "[{'Recording': 'AMI_20050204-1206',
+            'Collars [-ms, +ms]': '[250, 250]', 'MISS (%)': 13.12, 'FALARM (%)': 0.22, 'ERROR (%)': 6.05,
+            'DER (%)': 19.39, 'SBDER (%)': 54.43}, ...]"
+    """
+    rows = []
+    recTimes = list(zip(lstRecs, timesOutside.tolist(), timesInside.tolist()))
+    recTimes.append(("ALL", timesOutside.sum(axis=0).tolist(), timesInside.sum(axis=0).tolist()))
+    for rec, recOutside, recInside in recTimes:
+        for collar, times, collarTimes in zip(collars, recOutside, recInside):
+            rates = [None] * 4 if times[0] == 0 else _getErrorRates(*times)
+            sbder = None
+            if collar[0] != 0 and collar[1] != 0 and collarTimes[0] != 0:
+                sbder = _getErrorRates(*collarTimes)[3]
+            rows.append({'Recording': rec,
+                         'Collars [-ms, +ms]': "[{:.0f}, {:.0f}]".format(collar[0]*1000, collar[1]*1000),
+                         'MISS (%)': rates[0], 'FALARM (%)': rates[1], 'ERROR (%)': rates[2], 'DER (%)': rates[3],
+                         'SBDER (%)': sbder})
+    return rows
+
+
+def writeResults(rows, outputFile=None, fileFormat=None):
+    """
+    This function writes the rows from getResultRows(...) as CSV, JSON or Parquet.  Only Parquet needs pandas, so
+    CSV and JSON can be written without importing it.
+
+    Inputs:
+    - rows: list of dictionaries from getResultRows(...)
+    - outputFile: path to and filename of the file to write, default "None" for the standard output
+    - fileFormat: "csv", "json" or "parquet", default "None" to go by the extension of outputFile, or CSV if there
+                  is none
+
+    Raises ValueError if the format is not known, or is Parquet without an outputFile.
+    """
+    import os
+    import sys
+    if fileFormat is None:
+        extension = os.path.splitext(str(outputFile))[1].lstrip('.').lower() if outputFile else ''
+        fileFormat = extension if extension in ('csv', 'json', 'parquet') else 'csv'
+    if fileFormat not in ('csv', 'json', 'parquet'):
+        raise ValueError("Output format must be 'csv', 'json' or 'parquet', not {!r}.".format(fileFormat))
+
+    if fileFormat == 'parquet':
+        if outputFile is None:
+            raise ValueError("Parquet output needs an output file.")
+        import pandas as pd
+        pd.DataFrame(rows, columns=list(rows[0]) if rows else None).to_parquet(outputFile, index=False)
+        return
+
+    f = sys.stdout if outputFile is None else open(str(outputFile), "w", newline="")
+    try:
+        if fileFormat == 'json':
+            import json
+            json.dump(rows, f, indent=1)
+            f.write("\n")
+        else:
+            import csv
+            writer = csv.writer(f)
+            if rows:
+                writer.writerow(list(rows[0]))
+            for row in rows:
+                writer.writerow(["" if value is None else value for value in row.values()])
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+def _getListPairs(listFile):
+    """
+    Reads a list file of "oracleRttmFile [diarizedRttmFile]" lines, skipping blank lines and comments starting with
+    "#", into (ground truth file, diarization system file) pairs, with None where there is no diarization system file.
+    """
+    pairs = []
+    with open(str(listFile), "r") as f:
+        for lineNum, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if len(fields) > 2:
+                raise ValueError("{}:{}: list lines must have 1 or 2 fields, not {}.".format(listFile, lineNum,
+                                                                                            len(fields)))
+            pairs.append((fields[0], fields[1] if len(fields) == 2 else None))
+    return pairs
+
+
+def _getCollarArg(text):
+    """
+    Reads a collar from the command line, either one size in seconds for both sides or "start,end".
+    """
+    import argparse
+    try:
+        collar = [float(x) for x in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid collar {!r}".format(text)) from None
+    if len(collar) == 1:
+        collar *= 2
+    if len(collar) != 2 or min(collar) < 0:
+        raise argparse.ArgumentTypeError("invalid collar {!r}".format(text))
+    return collar
+
+
+def getServiceErrors(request, root=None):
+    """
+    This function scores one request to the scoring service, a dictionary decoded from JSON, against a ground truth
+    RTTM file on the server.  The ground truth is prepared with prepareReference(oracleRttmFile, collars), so it is
+    only parsed and split the first time it is asked for with each set of collars while the process stays up.  With a
+    root, the reference and UEM paths are taken relative to it and must not lead outside it, so a request cannot
+    read any other file on the server.
+
+    Inputs:
+    - request: dictionary, form: "{'reference': 'inputs/AMI_20050204-1206.rttm',
+               'hypothesis': 'SPEAKER AMI_20050204-1206 1 1270.39 4.49 <NA> <NA> spkr_0 <NA> <NA>\n...',
+               'collars': [[0, 0], [0.25, 0.25]], 'mapping': 'greedy', 'uem': None, 'columnar': False,
+               'timeScale': None}", where only reference and hypothesis are needed.  The hypothesis may instead be
+               given as 'segments', a list of [start time, duration, speaker] in seconds, each collar may be one
+               size for both sides, columnar must be true or false and timeScale a positive whole number or None
+    - root: folder that the reference and UEM files must be in, form: "inputs", default "None" for any path
+
+    Outputs:
+    - response: dictionary that can be encoded as JSON, form: "{'mapSpkrs': {'FEE029': ['spkr_0', 194.48, 79.6], ...},
+                'dfErrors': {'[0, 0]': {'MISS (%)': 20.15, 'FALARM (%)': 0.91, 'ERROR (%)': 8.09, 'DER (%)': 29.14},
+                ...}, 'dfSBDERs': {'[250, 250]': {...}}}"
+
+    Raises ValueError if the request is not in the right form.
+    """
+    import io
+    if not isinstance(request, dict) or 'reference' not in request:
+        raise ValueError("The request must be a JSON object with a reference.")
+    if 'hypothesis' in request:
+        diarizedRttm = request['hypothesis']
+    elif 'segments' in request:
+        diarizedRttm = "".join("SPEAKER request 1 {!r} {!r} <NA> <NA> {} <NA> <NA>\n".format(float(tbeg), float(tdur),
+                                                                                           spkr)
+                               for tbeg, tdur, spkr in request['segments'])
+    else:
+        raise ValueError("The request must have a hypothesis or segments.")
+    if not isinstance(diarizedRttm, str):
+        raise ValueError("The hypothesis must be the text of an RTTM file.")
+    collars = _getServiceCollars(request.get('collars', [[0, 0], [0.25, 0.25]]))
+    oracleRttmFile = _getServicePath(request['reference'], root, "reference")
+    uemFile = None if request.get('uem') is None else _getServicePath(request['uem'], root, "uem")
+    columnar = request.get('columnar', False)
+    if not isinstance(columnar, bool):
+        raise ValueError("The columnar flag must be true or false, not {!r}.".format(columnar))
+    timeScale = request.get('timeScale')
+    if timeScale is not None and (not isinstance(timeScale, int) or isinstance(timeScale, bool) or timeScale <= 0):
+        raise ValueError("The timeScale must be a positive whole number of ticks per second or null, not {!r}."
+                         .format(timeScale))
+
+    reference = prepareReference(oracleRttmFile, collars, columnar, timeScale)
+    result = getScoringResult(reference, io.StringIO(diarizedRttm), collars, columnar, request.get('mapping', 'greedy'),
+                              uemFile)
+    return result.toDict()
+
+
+def _getServiceCollars(collars):
+    """
+    Checks the collars of a scoring service request, each one size or a pair of start and end sizes in seconds, and
+    returns them as pairs.  Raises ValueError if they are not all non-negative numbers.
+    """
+    def isSize(size):
+        return isinstance(size, (int, float)) and not isinstance(size, bool) and size >= 0
+
+    if not isinstance(collars, list) or not collars:
+        raise ValueError("The collars must be a non-empty list.")
+    pairs = []
+    for collar in collars:
+        if isSize(collar):
+            pairs.append([collar, collar])
+        elif isinstance(collar, list) and len(collar) == 2 and all(isSize(size) for size in collar):
+            pairs.append(list(collar))
+        else:
+            raise ValueError("Each collar must be a non-negative size or a pair of them in seconds, not {!r}."
+                             .format(collar))
+    return pairs
+
+
+def _getServicePath(path, root, field):
+    """
+    Returns the path to a file named in a scoring service request, relative to root if there is one.  Raises
+    ValueError if it is not a string or, with a root, leads outside the root.
+    """
+    import os
+    if not isinstance(path, str):
+        raise ValueError("The {} must be a path.".format(field))
+    if root is None:
+        return path
+    root = os.path.realpath(str(root))
+    fullPath = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, fullPath]) != root:
+        raise ValueError("The {} must be inside the scoring service root.".format(field))
+    return fullPath
+
+
+def getScoringServer(host='127.0.0.1', port=0, root=None, maxRequestBytes=64 << 20):
+    """
+    This function returns an HTTP server for scoring many diarization system outputs from a long-running process,
+    e.g. a training loop, without paying for starting Python, importing NumPy and pandas and parsing the ground truth
+    every time.  POST /score takes a JSON request for getServiceErrors(request, root) and returns its response as
+    JSON, or {"error": ...} with status 400 if the request cannot be scored or 413 if it is larger than
+    maxRequestBytes, and GET /health returns the number of prepared references held.  Requests are handled one at a
+    time, as scoring is bound by the CPU.  There is no authentication, so the reference and UEM files a request can
+    name are kept to the root folder.
+
+    Inputs:
+    - host: address to listen on, default "127.0.0.1" so that only the same machine can reach it
+    - port: port to listen on, default "0" for any free port, which is then server.server_address[1]
+    - root: folder that the reference and UEM files of the requests must be in, default "None" for the current
+            working directory when the server is made
+    - maxRequestBytes: largest request body to read, default "64 << 20" (64 MiB)
+
+    Outputs:
+    - server: http.server.HTTPServer, to be run with server.serve_forever() and stopped with server.shutdown()
+    """
+    import http.server
+    import json
+    import os
+    root = os.path.realpath(os.getcwd() if root is None else str(root))
+
+    class ScoringRequestHandler(http.server.BaseHTTPRequestHandler):
+
+        def sendJson(self, status, body):
+            data = json.dumps(body, allow_nan=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != '/health':
+                return self.sendJson(404, {'error': "Unknown path {}.".format(self.path)})
+            self.sendJson(200, {'status': 'ok', 'references': len(_preparedReferenceCache)})
+
+        def do_POST(self):
+            if self.path != '/score':
+                return self.sendJson(404, {'error': "Unknown path {}.".format(self.path)})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                return self.sendJson(400, {'error': "Bad Content-Length."})
+            if length > maxRequestBytes:
+                # The body is left unread, so the connection cannot be used again
+                self.close_connection = True
+                return self.sendJson(413, {'error': "The request is larger than {} bytes.".format(maxRequestBytes)})
+            try:
+                response = getServiceErrors(json.loads(self.rfile.read(length)), root)
+            except Exception as e:
+                return self.sendJson(400, {'error': "{}: {}".format(type(e).__name__, e)})
+            self.sendJson(200, response)
+
+        def log_message(self, format, *args):
+            pass
+
+    return http.server.HTTPServer((host, port), ScoringRequestHandler)
+
+
+def main(argv=None):
+    """
+    Scores ground truth and diarization system RTTM files from the command line and writes the MISS, FALARM, ERROR,
+    DER and SBDER of each recording and pooled over all of them for each collar, e.g.
+
+        python pyDERCalc.py ref.rttm sys.rttm --collars 0 0.25 --format json
+        python pyDERCalc.py --list pairs.txt --jobs 8 --output results.parquet
+
+or with --serve runs the scoring service from getScoringServer(host, port, root) until interrupted, e.g.
+
+        python pyDERCalc.py --serve 8765 --root inputs
+
+    Returns 0 on success and 1 if the input files cannot be read or the output cannot be written.
+    """
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(prog="pyDERCalc", description="Score speaker diarization RTTM files.")
+    parser.add_argument("oracleRttmFile", nargs="?", help="ground truth RTTM file")
+    parser.add_argument("diarizedRttmFile", nargs="?", help="diarization system RTTM file")
+    parser.add_argument("--list", metavar="FILE",
+                        help="file of 'oracleRttmFile diarizedRttmFile' lines to score instead of a single pair")
+    parser.add_argument("--collars", type=_getCollarArg, nargs="+", default=[[0, 0], [0.25, 0.25]],
+                        help="collar sizes in seconds, each one size or 'start,end' (default: 0 0.25)")
+    parser.add_argument("--mapping", choices=["greedy", "optimal"], default="greedy",
+                        help="speaker mapping (default: greedy)")
+    parser.add_argument("--uem", metavar="FILE", help="UEM file of the regions to score")
+    parser.add_argument("--columnar", action="store_true", help="run the pipeline on SegTables")
+    parser.add_argument("--time-scale", type=int, metavar="N", help="score in whole ticks of 1/N seconds, e.g. 1000")
+    parser.add_argument("--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--format", choices=["csv", "json", "parquet"],
+                        help="output format (default: from the output file extension, or csv)")
+    parser.add_argument("--output", metavar="FILE", help="file to write the results to (default: standard output)")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="run the scoring service on this port instead")
+    parser.add_argument("--host", default="127.0.0.1", help="address for the scoring service (default: 127.0.0.1)")
+    parser.add_argument("--root", default=".",
+                        help="folder the scoring service may read references and UEM files from (default: .)")
+    args = parser.parse_args(argv)
+
+    if args.serve is not None:
+        server = getScoringServer(args.host, args.serve, args.root)
+        print("Scoring on http://{}:{}/score".format(*server.server_address[:2]), file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    if args.list is None and (args.oracleRttmFile is None or args.diarizedRttmFile is None):
+        parser.error("give a ground truth and a diarization system RTTM file, or --list")
+    if args.list is not None and args.oracleRttmFile is not None:
+        parser.error("give either RTTM files or --list, not both")
+
+    try:
+        pairs = _getListPairs(args.list) if args.list else [(args.oracleRttmFile, args.diarizedRttmFile)]
+        lstRecs, _, timesOutside, timesInside = getParallelTimes(pairs, args.collars, args.jobs, args.columnar,
+                                                                 mapping=args.mapping, uemFile=args.uem,
+                                                                 timeScale=args.time_scale)
+        writeResults(getResultRows(lstRecs, timesOutside, timesInside, args.collars), args.output, args.format)
+    except (ImportError, OSError, ValueError) as e:
+        print("pyDERCalc: error: {}".format(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
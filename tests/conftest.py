@@ -0,0 +1,70 @@
+# pyDERCalc is a single module at the top of the repository rather than an installed package, so the tests import it
+# from there.  The AMI recording, its known errors and the synthetic recordings of benchmark.py are shared by the
+# test modules
+
+import json
+import os
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import benchmark  # noqa: E402
+
+AMI_REF = os.path.join(REPO, "AMI_20050204-1206_GroundTruth.rttm")
+AMI_HYP = os.path.join(REPO, "AMI_20050204-1206_DiarTkOutput.rttm")
+COLLARS = [[0, 0], [0.05, 0.05], [0.25, 0.25], [0.1, 0.3]]
+# MISS, FALARM, ERROR and DER of the AMI recording with greedy mapping, and SBDER within the collars
+AMI_ERRORS = {"[0, 0]": [8.74, 0.35, 10.94, 20.03], "[50, 50]": [6.98, 0.00, 9.92, 16.90],
+              "[250, 250]": [2.09, 0.00, 6.70, 8.79], "[100, 300]": [2.93, 0.00, 7.32, 10.25]}
+AMI_SBDERS = {"[50, 50]": 50.36, "[250, 250]": 40.62, "[100, 300]": 42.42}
+
+
+def writeRttm(path, rec, segs):
+    with open(path, "w") as f:
+        for tbeg, tdur, spkr in segs:
+            f.write("SPEAKER {} 1 {:.3f} {:.3f} <NA> <NA> {} <NA> <NA>\n".format(rec, tbeg, tdur, spkr))
+    return str(path)
+
+
+def getDers(dfErrors):
+    return dfErrors.iloc[:, -1].tolist()
+
+
+@pytest.fixture(scope="session")
+def synthetic(tmp_path_factory):
+    """
+    The synthetic recordings of benchmark.py with the md-eval.pl DERs saved for them.
+    """
+    with open(os.path.join(REPO, "benchmark_baseline.json")) as f:
+        baseline = json.load(f)
+    folder = tmp_path_factory.mktemp("bench")
+    cases = {}
+    for hours in (0.1, 1):
+        key = "{:g}h_4spkrs_0overlap_4clusters".format(hours)
+        oracleRttmFile = str(folder / "ref_{}.rttm".format(key))
+        diarizedRttmFile = str(folder / "hyp_{}.rttm".format(key))
+        benchmark.generateRttms(oracleRttmFile, diarizedRttmFile, hours, 4, 0, None)
+        cases[key] = (oracleRttmFile, diarizedRttmFile, baseline[key])
+    return cases
+
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory, synthetic):
+    """
+    The AMI recording and the 0.1 hour synthetic recording in one pair of RTTM files, and a UEM file for both.
+    """
+    folder = tmp_path_factory.mktemp("corpus")
+    oracleRttmFile, diarizedRttmFile = str(folder / "ref.rttm"), str(folder / "hyp.rttm")
+    synthRef, synthHyp, _ = synthetic["0.1h_4spkrs_0overlap_4clusters"]
+    for outputFile, inputFiles in ((oracleRttmFile, (AMI_REF, synthRef)), (diarizedRttmFile, (AMI_HYP, synthHyp))):
+        with open(outputFile, "w") as f:
+            for inputFile in inputFiles:
+                with open(inputFile) as g:
+                    f.write(g.read())
+    uemFile = str(folder / "all.uem")
+    with open(uemFile, "w") as f:
+        f.write("AMI_20050204-1206 1 1300.0 1900.5\nAMI_20050204-1206 1 2000.0 2400.0\nSYNTH_0.1h_0 1 10.0 300.0\n")
+    return oracleRttmFile, diarizedRttmFile, uemFile
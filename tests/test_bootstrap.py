@@ -0,0 +1,25 @@
+# Tests of the bootstrap intervals and the paired permutation test
+
+import pytest
+
+import pyDERCalc
+from conftest import COLLARS
+
+
+def testBootstrapAndPermutation(corpus):
+    oracleRttmFile, diarizedRttmFile, _ = corpus
+    _, _, timesOutside, _ = pyDERCalc.getParallelTimes([(oracleRttmFile, diarizedRttmFile)], COLLARS)
+    dfIntervals = pyDERCalc.getBootstrapIntervals(timesOutside, COLLARS, nResamples=500, seed=0)
+    estimate = dfIntervals.xs("Estimate", level="Statistic")
+    assert (dfIntervals.xs("Lower", level="Statistic") <= estimate).all().all()
+    assert (estimate <= dfIntervals.xs("Upper", level="Statistic")).all().all()
+    assert dfIntervals.equals(pyDERCalc.getBootstrapIntervals(timesOutside, COLLARS, nResamples=500, seed=0))
+    # A single recording drawn again and again gives no spread at all
+    dfIntervals = pyDERCalc.getBootstrapIntervals(timesOutside[:1], COLLARS, nResamples=100, seed=0)
+    assert (dfIntervals.xs("Lower", level="Statistic") == dfIntervals.xs("Upper", level="Statistic")).all().all()
+
+    dfTest = pyDERCalc.getPairedTest(timesOutside, timesOutside, COLLARS, nResamples=200, seed=0)
+    assert (dfTest.xs("Difference", level="Statistic") == 0).all().all()
+    assert (dfTest.xs("p-value", level="Statistic") == 1).all().all()
+    with pytest.raises(ValueError):
+        pyDERCalc.getPairedTest(timesOutside, timesOutside[:1], COLLARS)
@@ -0,0 +1,20 @@
+# Tests of the command-line scorer
+
+import csv
+import subprocess
+import sys
+
+from conftest import AMI_HYP, AMI_REF, REPO
+
+
+def testCliCsvWithoutPandas(tmp_path):
+    # pandas is blocked from importing, so scoring and writing CSV must not need it
+    outputFile = tmp_path / "results.csv"
+    code = ("import sys; sys.modules['pandas'] = None; import pyDERCalc; "
+            "sys.exit(pyDERCalc.main(sys.argv[1:]))")
+    subprocess.run([sys.executable, "-c", code, AMI_REF, AMI_HYP, "--collars", "0", "0.25", "--output",
+                    str(outputFile)], cwd=REPO, check=True)
+    with open(outputFile, newline="") as f:
+        pooled = {row[1]: row[2:] for row in csv.reader(f) if row[0] == "ALL"}
+    assert pooled["[0, 0]"][:4] == ["8.74", "0.35", "10.94", "20.03"]
+    assert pooled["[250, 250]"][3:] == ["8.79", "40.62"]
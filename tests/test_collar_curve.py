@@ -0,0 +1,16 @@
+# Tests of the collar sweep against scoring each collar on its own
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, getDers
+
+
+def testCollarCurve():
+    collarSizes = [0, 0.05, 0.25]
+    mapSpkrs, dfErrors, dfSBDERs = pyDERCalc.getCollarCurve(AMI_REF, AMI_HYP, collarSizes, timeScale=1000)
+    expected = pyDERCalc.getAllErrors(AMI_REF, AMI_HYP, [[size, size] for size in collarSizes], timeScale=1000)
+    assert dfErrors.equals(expected[1])
+    assert dfSBDERs.equals(expected[2])
+    # Without a zero collar, every SBDER row is labelled by its own collar
+    dfSBDERs = pyDERCalc.getCollarCurve(AMI_REF, AMI_HYP, [0.25])[2]
+    assert dict(zip(dfSBDERs.index, getDers(dfSBDERs))) == {"[250, 250]": 40.62}
+    assert list(pyDERCalc.getScoringResult(AMI_REF, AMI_HYP, [[0.25, 0.25]]).toDict()["dfSBDERs"]) == ["[250, 250]"]
@@ -0,0 +1,17 @@
+# Tests of scoring RTTM files with many recordings in them
+
+import pyDERCalc
+from conftest import AMI_ERRORS, COLLARS, getDers
+
+
+def testCorpusErrors(corpus):
+    oracleRttmFile, diarizedRttmFile, uemFile = corpus
+    for uem in (None, uemFile):
+        expected = pyDERCalc.getCorpusErrors(oracleRttmFile, diarizedRttmFile, COLLARS, uemFile=uem)
+        result = pyDERCalc.getCorpusErrors(oracleRttmFile, diarizedRttmFile, COLLARS, True, uemFile=uem)
+        assert result[0] == expected[0]
+        assert all(df.equals(expectedDf) for df, expectedDf in zip(result[1:], expected[1:]))
+
+    # Each recording of the corpus is scored as if it were alone
+    dfRecErrors = pyDERCalc.getCorpusErrors(oracleRttmFile, diarizedRttmFile, COLLARS)[3]
+    assert getDers(dfRecErrors.loc["AMI_20050204-1206"]) == [errors[3] for errors in AMI_ERRORS.values()]
@@ -0,0 +1,16 @@
+# Tests of the frame-based scoring engine against the event-based pipeline
+
+import pyDERCalc
+from conftest import AMI_ERRORS, AMI_HYP, AMI_REF, COLLARS, getDers
+
+
+def testFrameErrors():
+    # With 1 ms frames every boundary of the AMI files falls on a frame edge, so frames give the same errors
+    dfErrors = pyDERCalc.getFrameErrors(AMI_REF, AMI_HYP, COLLARS, 0.001)[1]
+    assert getDers(dfErrors) == [errors[3] for errors in AMI_ERRORS.values()]
+    arrays = (pyDERCalc.getRttmArrays(AMI_REF, None), pyDERCalc.getRttmArrays(AMI_HYP, None))
+    chunked = [pyDERCalc.getFrameTimes(*arrays, COLLARS, 0.01, chunkFrames=chunkFrames)
+               for chunkFrames in (8, 1000, 2**16)]
+    for result in chunked[1:]:
+        assert result[0] == chunked[0][0]
+        assert (result[1] == chunked[0][1]).all() and (result[2] == chunked[0][2]).all()
@@ -0,0 +1,42 @@
+# Tests of the greedy and optimal one-to-one speaker mappings
+
+import warnings
+
+import numpy as np
+import pytest
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, COLLARS, getDers, writeRttm
+
+
+def testOptimalMapping(tmp_path):
+    # Greedy maps both ground truth speakers to x, which overlaps each of them most, while the one-to-one mapping
+    # gives x to B and y to A for the largest total overlap
+    oracleRttmFile = writeRttm(tmp_path / "ref.rttm", "rec", [(0, 10, "A"), (10, 10, "B")])
+    diarizedRttmFile = writeRttm(tmp_path / "hyp.rttm", "rec", [(0, 6, "x"), (6, 4, "y"), (10, 7, "x"), (17, 3, "y")])
+    greedy = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, [[0, 0]], mapping="greedy")
+    optimal = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, [[0, 0]], mapping="optimal")
+    assert {spkr: value[0] for spkr, value in greedy[0].items()} == {"A": "x", "B": "x"}
+    assert {spkr: value[0] for spkr, value in optimal[0].items()} == {"A": "y", "B": "x"}
+    assert getDers(greedy[1]) == [35.0]
+    assert getDers(optimal[1]) == [45.0]
+    with pytest.raises(ValueError):
+        pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, [[0, 0]], mapping="best")
+
+
+def testAmiOptimalMapping():
+    greedy = pyDERCalc.getAllErrors(AMI_REF, AMI_HYP, COLLARS, mapping="greedy")
+    optimal = pyDERCalc.getAllErrors(AMI_REF, AMI_HYP, COLLARS, mapping="optimal")
+    mapped = [value[0] for value in optimal[0].values() if value[0] is not None]
+    assert len(mapped) == len(set(mapped))
+    assert getDers(optimal[1]) == getDers(greedy[1])
+
+
+@pytest.mark.parametrize("mapping", ["greedy", "optimal"])
+def testUnmappedSpeaker(mapping):
+    # B overlaps no diarization system speaker, so both mappings leave it unmapped, without a division by zero
+    spkrTimes = np.array([[3.0, 1.0], [0.0, 0.0]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        mapSpkrs = pyDERCalc.getArrayMapSpkrs(["A", "B"], ["x", "y"], spkrTimes, mapping)
+    assert mapSpkrs == {"A": ["x", 3.0, 75.0], "B": [None, 0.0, 0.0]}
@@ -0,0 +1,35 @@
+# Tests of the online scorer against scoring the whole file at once
+
+import pytest
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, COLLARS, getDers
+
+
+def testOnlineScorer():
+    reference = pyDERCalc.prepareReference(AMI_REF, COLLARS)
+    scorer = pyDERCalc.OnlineScorer(reference, None, remapInterval=120)
+    segs = pyDERCalc.getSegs(AMI_HYP, False)
+    for start in range(0, len(segs), 25):
+        scorer.addSegs(segs[start:start + 25])
+    scorer.finish()
+    mapSpkrs, dfErrors, dfSBDERs = scorer.getErrors()
+    expected = pyDERCalc.getAllErrors(AMI_REF, AMI_HYP, COLLARS)
+    assert {spkr: value[0] for spkr, value in mapSpkrs.items()} == {spkr: value[0] for spkr, value in
+                                                                    expected[0].items()}
+    assert getDers(dfErrors) == getDers(expected[1])
+    assert list(dfSBDERs.index) == list(expected[2].index)
+    with pytest.raises(ValueError):
+        scorer.addSegs(segs[:1])
+
+
+@pytest.mark.parametrize("timeScale", [None, 16000])
+def testOnlineScorerOrder(timeScale):
+    # The error names the start time in seconds that the segment was checked against
+    scorer = pyDERCalc.OnlineScorer(pyDERCalc.prepareReference(AMI_REF, COLLARS, timeScale=timeScale), None)
+    seg = {"tbeg": 1300.25, "tend": 1301.0, "name": {"oname": [], "dname": ["x"]}}
+    with pytest.raises(ValueError, match="1300.0 starts before 1300.25"):
+        scorer.addSegs([seg, dict(seg, tbeg=1300.0)])
+    scorer.addSegs([seg])
+    with pytest.raises(ValueError, match="1299.5 starts before 1300.25"):
+        scorer.addSegs([dict(seg, tbeg=1299.5)])
@@ -0,0 +1,21 @@
+# Tests of the process-pool scorer against scoring the corpus in this process
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, COLLARS
+
+
+def testParallelErrors(corpus):
+    oracleRttmFile, diarizedRttmFile, uemFile = corpus
+    for uem in (None, uemFile):
+        expected = pyDERCalc.getCorpusErrors(oracleRttmFile, diarizedRttmFile, COLLARS, uemFile=uem)
+        for splitCollars in (False, True):
+            result = pyDERCalc.getParallelErrors([(oracleRttmFile, diarizedRttmFile)], COLLARS, 2,
+                                                 splitCollars=splitCollars, uemFile=uem)
+            assert result[0] == expected[0]
+            assert all(df.equals(expectedDf) for df, expectedDf in zip(result[1:], expected[1:]))
+
+    # Each recording of the corpus is scored as if it were alone
+    lstRecs, _, timesOutside, timesInside = pyDERCalc.getParallelTimes([(oracleRttmFile, diarizedRttmFile)], COLLARS)
+    result = pyDERCalc.getScoringResult(AMI_REF, AMI_HYP, COLLARS)
+    assert (timesOutside[lstRecs.index("AMI_20050204-1206")] == result.timesOutside).all()
+    assert (timesInside[lstRecs.index("AMI_20050204-1206")] == result.timesInside).all()
@@ -0,0 +1,21 @@
+# Tests of pyDERCalc against the DERs known for the bundled AMI recording and the md-eval.pl DERs saved in
+# benchmark_baseline.json
+
+import pytest
+
+import pyDERCalc
+from conftest import AMI_ERRORS, AMI_HYP, AMI_REF, AMI_SBDERS, COLLARS, getDers
+
+
+def testAmiErrors():
+    mapSpkrs, dfErrors, dfSBDERs = pyDERCalc.getAllErrors(AMI_REF, AMI_HYP, COLLARS)
+    assert dfErrors.to_dict(orient="split")["data"] == list(AMI_ERRORS.values())
+    assert dict(zip(dfSBDERs.index, getDers(dfSBDERs))) == AMI_SBDERS
+    assert set(mapSpkrs) == {"FEE029", "FEE030", "MEE031", "FEE032"}
+
+
+@pytest.mark.parametrize("key", ["0.1h_4spkrs_0overlap_4clusters", "1h_4spkrs_0overlap_4clusters"])
+def testSyntheticBaseline(synthetic, key):
+    oracleRttmFile, diarizedRttmFile, baseline = synthetic[key]
+    collars = [[collar, collar] for collar in baseline["collars"]]
+    assert getDers(pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, collars)[1]) == baseline["ders"]
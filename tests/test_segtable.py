@@ -0,0 +1,16 @@
+# Tests of the columnar SegTable path against the list of dictionaries path
+
+import pytest
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, COLLARS
+
+
+@pytest.mark.parametrize("mapping", ["greedy", "optimal"])
+def testListColumnarParity(synthetic, mapping):
+    for oracleRttmFile, diarizedRttmFile in [(AMI_REF, AMI_HYP)] + [case[:2] for case in synthetic.values()]:
+        listResult = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, COLLARS, False, mapping)
+        columnarResult = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, COLLARS, True, mapping)
+        assert listResult[0] == columnarResult[0]
+        assert listResult[1].equals(columnarResult[1])
+        assert listResult[2].equals(columnarResult[2])
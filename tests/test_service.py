@@ -0,0 +1,70 @@
+# Tests of the scoring service over HTTP
+
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF
+
+
+@pytest.fixture
+def server(tmp_path):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    with open(AMI_REF) as f:
+        (inputs / "ref.rttm").write_text(f.read())
+    (tmp_path / "secret.rttm").write_text("not for the service\n")
+    server = pyDERCalc.getScoringServer(root=str(inputs), maxRequestBytes=1 << 16)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, body):
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    try:
+        connection.request("POST", "/score", body if isinstance(body, bytes) else json.dumps(body).encode())
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def testServiceErrors(server):
+    segments = [[seg["tbeg"], round(seg["tend"] - seg["tbeg"], 3), seg["name"]["dname"][0]]
+                for seg in pyDERCalc.getSegs(AMI_HYP, False)]
+    status, response = post(server, {"reference": "ref.rttm", "segments": segments, "collars": [0, [0.25, 0.25]]})
+    assert status == 200
+    assert response["dfErrors"]["[250, 250]"]["DER (%)"] == 8.79
+    assert list(response["dfSBDERs"]) == ["[250, 250]"]
+
+    for collars in ([[0.1]], "0.25", [-0.1], [[0, "a"]], [True]):
+        status, response = post(server, {"reference": "ref.rttm", "segments": segments[:5], "collars": collars})
+        assert status == 400 and "collar" in response["error"]
+    for reference in ("../secret.rttm", os.path.abspath(AMI_REF)):
+        status, response = post(server, {"reference": reference, "segments": segments[:5]})
+        assert status == 400 and "root" in response["error"]
+    for field, value in (("timeScale", 0), ("timeScale", 1000.5), ("timeScale", True), ("timeScale", "1000"),
+                         ("columnar", 1), ("columnar", "true")):
+        status, response = post(server, {"reference": "ref.rttm", "segments": segments[:5], field: value})
+        assert status == 400 and field in response["error"]
+    status, response = post(server, {"reference": "ref.rttm", "segments": segments, "collars": [0.25],
+                                     "timeScale": 1000, "columnar": True})
+    assert status == 200 and response["dfErrors"]["[250, 250]"]["DER (%)"] == 8.79
+    assert post(server, b"{not json")[0] == 400
+    status, response = post(server, {"reference": "ref.rttm", "hypothesis": "x" * (1 << 16)})
+    assert status == 413
+
+
+def testServiceUnmapped(server):
+    # Ground truth speakers that no diarization system speaker overlaps are left unmapped rather than given a NaN
+    # percentage, which JSON cannot hold
+    status, response = post(server, {"reference": "ref.rttm", "segments": [[0, 1, "a"]]})
+    assert status == 200
+    assert all(value == [None, 0.0, 0.0] for value in response["mapSpkrs"].values())
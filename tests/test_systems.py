@@ -0,0 +1,27 @@
+# Tests of scoring many diarization systems against one ground truth in a single sweep
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, COLLARS, writeRttm
+
+
+def testSystemErrors():
+    allMapSpkrs, dfSystemErrors = pyDERCalc.getSystemErrors(AMI_REF, {"DiarTk": AMI_HYP}, COLLARS)
+    mapSpkrs, dfErrors, dfSBDERs = pyDERCalc.getAllErrors(AMI_REF, AMI_HYP, COLLARS)
+    assert allMapSpkrs["DiarTk"] == mapSpkrs
+    assert dfSystemErrors.loc["DiarTk"].iloc[:, :4].values.tolist() == dfErrors.values.tolist()
+
+
+def testSystemErrorsTie(tmp_path):
+    # x and y each overlap A for 2.8 seconds, but the float sum of x's two durations is 2.8000000000000003 and y's
+    # single duration is 2.7999999999999998, so only durations rounded as getAllErrors(...) rounds them tie and
+    # break to x, the first diarization system speaker
+    oracleRttmFile = writeRttm(tmp_path / "ref.rttm", "rec", [(0, 30, "A")])
+    diarizedRttmFile = writeRttm(tmp_path / "hyp.rttm", "rec", [(0.13, 1.18, "x"), (1.62, 1.62, "x"),
+                                                                 (3.55, 2.8, "y")])
+    for timeScale in (None, 1000):
+        mapSpkrs, dfErrors, _ = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, [[0, 0]],
+                                                       timeScale=timeScale)
+        allMapSpkrs, dfSystemErrors = pyDERCalc.getSystemErrors(oracleRttmFile, [diarizedRttmFile], [[0, 0]],
+                                                                timeScale=timeScale)
+        assert allMapSpkrs[diarizedRttmFile] == mapSpkrs == {"A": ["x", 2.8, 50.0]}
+        assert dfSystemErrors.loc[diarizedRttmFile].iloc[:, :4].values.tolist() == dfErrors.values.tolist()
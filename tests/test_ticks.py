@@ -0,0 +1,28 @@
+# Tests of scoring in whole ticks against scoring in seconds
+
+import numpy as np
+
+import pyDERCalc
+from conftest import AMI_ERRORS, AMI_HYP, AMI_REF, COLLARS, writeRttm
+
+
+def testTicksAndSeconds(corpus):
+    oracleRttmFile, diarizedRttmFile, uemFile = corpus
+    seconds = pyDERCalc.getCorpusErrors(oracleRttmFile, diarizedRttmFile, COLLARS, uemFile=uemFile)
+    for timeScale in (1000, 16000):
+        ticks = pyDERCalc.getCorpusErrors(oracleRttmFile, diarizedRttmFile, COLLARS, uemFile=uemFile,
+                                          timeScale=timeScale)
+        assert all(df.equals(secondsDf) for df, secondsDf in zip(ticks[1:], seconds[1:]))
+    result = pyDERCalc.getScoringResult(AMI_REF, AMI_HYP, COLLARS, timeScale=1000)
+    assert result.timesOutside.dtype == np.int64
+    assert result.getErrors() == list(AMI_ERRORS.values())
+
+
+def testTicksFromDurations(tmp_path):
+    # Ticks finer than milliseconds come from the times as written, not from end times rounded to milliseconds
+    rttmFile = writeRttm(tmp_path / "ref.rttm", "rec", [])
+    with open(rttmFile, "w") as f:
+        f.write("SPEAKER rec 1 0.0004 0.0004 <NA> <NA> A <NA> <NA>\n")
+    for cache in (None, str(tmp_path)):
+        segs = pyDERCalc.getSegs(rttmFile, True, cache=cache, timeScale=16000)
+        assert (segs[0]["tbeg"], segs[0]["tend"]) == (6, 13)
@@ -0,0 +1,29 @@
+# Tests of the error attribution timeline against the pooled errors
+
+import numpy as np
+
+import pyDERCalc
+from conftest import AMI_HYP, AMI_REF, COLLARS
+
+
+def testErrorTimeline(tmp_path, corpus):
+    timeline = pyDERCalc.getErrorTimeline(AMI_REF, AMI_HYP, COLLARS)
+    result = pyDERCalc.getScoringResult(AMI_REF, AMI_HYP, COLLARS)
+    times = np.stack([timeline.totalTime, timeline.missedTime, timeline.falarmTime, timeline.errorTime], axis=1)
+    for index in range(len(COLLARS)):
+        assert np.allclose(times[~timeline.inCollar[:, index]].sum(axis=0), result.timesOutside[index])
+    # False alarm time has no ground truth speaker to be shared out to
+    assert np.allclose(timeline.getOracleSpkrTimes().sum(axis=1)[:, [0, 1, 3]], result.timesOutside[:, [0, 1, 3]])
+
+    readBack = pyDERCalc.ErrorTimeline.fromArrays(timeline.getArrays())
+    assert readBack.mapSpkrs == timeline.mapSpkrs
+    assert readBack.lstOracleSpkrs == timeline.lstOracleSpkrs
+    for name in ("tbeg", "tend", "errorClass", "totalTime", "missedTime", "falarmTime", "errorTime", "inCollar"):
+        assert (getattr(readBack, name) == getattr(timeline, name)).all()
+
+    oracleRttmFile, diarizedRttmFile, _ = corpus
+    outputFile = str(tmp_path / "timelines.npz")
+    lstRecs = pyDERCalc.writeErrorTimelines(oracleRttmFile, diarizedRttmFile, COLLARS, outputFile)
+    timelines = pyDERCalc.readErrorTimelines(outputFile)
+    assert sorted(timelines) == lstRecs
+    assert (timelines["AMI_20050204-1206"].tend == timeline.tend).all()
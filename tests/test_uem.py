@@ -0,0 +1,16 @@
+# Tests of scoring only the regions of a UEM file
+
+import pyDERCalc
+from conftest import writeRttm
+
+
+def testUem(tmp_path):
+    oracleRttmFile = writeRttm(tmp_path / "ref.rttm", "rec", [(0, 10, "A")])
+    diarizedRttmFile = writeRttm(tmp_path / "hyp.rttm", "rec", [(5, 10, "x")])
+    uemFile = tmp_path / "rec.uem"
+    uemFile.write_text("rec 1 0 10\n")
+    everything = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, [[0, 0]])[1]
+    assert everything.to_dict(orient="split")["data"] == [[50.0, 50.0, 0.0, 100.0]]
+    for columnar in (False, True):
+        scored = pyDERCalc.getAllErrors(oracleRttmFile, diarizedRttmFile, [[0, 0]], columnar, uemFile=str(uemFile))[1]
+        assert scored.to_dict(orient="split")["data"] == [[50.0, 0.0, 0.0, 50.0]]